@@ -8,6 +8,7 @@ import osgeo as _
 import cv2 as _
 
 from buzzard._footprint import Footprint
+from buzzard._footprint_array import FootprintArray
 from buzzard._datasource import (
     DataSource,
     open_raster,
@@ -20,10 +21,13 @@ from buzzard._datasource import (
 from buzzard._gdal_file_raster import GDALFileRaster
 from buzzard._gdal_mem_raster import GDALMemRaster
 from buzzard._numpy_raster import NumpyRaster
+from buzzard._shared_numpy_raster import SharedNumpyRaster
 from buzzard._gdal_file_vector import GDALFileVector
 from buzzard._gdal_memory_vector import GDALMemoryVector
+from buzzard._proxy_descriptor import ProxyDescriptor
 
 from buzzard._env import Env, env
+from buzzard._a_proxy_raster_remap_cache import remap_cache_info, clear_remap_cache
 import buzzard.srs
 import buzzard.algo
 
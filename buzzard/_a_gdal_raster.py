@@ -1,27 +1,37 @@
 import os
 
 import numpy as np
+import affine
 
 from osgeo import gdal
 
 from buzzard._a_stored_raster import ABackStoredRaster
 from buzzard._tools import conv
+from buzzard._footprint import Footprint
+from buzzard._env import env
 from buzzard import _tools
 
+# Above this number of rectangles in a mask, a masked write is performed with a read-merge-write of
+# the window that contains the mask
+_MAX_MASKED_WRITES = 16
+
 class ABackGDALRaster(ABackStoredRaster):
     """Abstract class defining the common implementation of all GDAL rasters"""
 
     # get_data implementation ******************************************************************* **
     def get_data(self, fp, band_ids, dst_nodata, interpolation):
-        samplefp = self.build_sampling_footprint(fp, interpolation)
+        if self.warping:
+            return self.get_warped_data(fp, band_ids, dst_nodata, interpolation)
+        ovr = self.overview_of_footprint(fp, band_ids, interpolation)
+        srcfp = self.fp if ovr is None else self.overviews[ovr][0]
+        samplefp = self.build_sampling_footprint(fp, interpolation, srcfp)
         if samplefp is None:
             return np.full(
                 np.r_[fp.shape, len(band_ids)],
                 dst_nodata,
                 self.dtype
             )
-        with self.acquire_driver_object() as gdal_ds:
-            array = self.sample_bands_driver(samplefp, band_ids, gdal_ds)
+        array = self.sample_bands(samplefp, band_ids, ovr)
         array = self.remap(
             samplefp,
             fp,
@@ -35,26 +45,106 @@ class ABackGDALRaster(ABackStoredRaster):
         array = array.astype(self.dtype, copy=False)
         return array
 
-    def sample_bands_driver(self, fp, band_ids, gdal_ds):
-        rtlx, rtly = self.fp.spatial_to_raster(fp.tl)
-        assert rtlx >= 0 and rtlx < self.fp.rsizex
-        assert rtly >= 0 and rtly < self.fp.rsizey
+    def overview_of_footprint(self, fp, band_ids, interpolation):
+        """Select the coarsest overview level whose pixels are not bigger than the pixels of `fp`,
+        return None if the full resolution raster should be read instead.
+        """
+        if not self.overviews or interpolation is None or not self.back_ds.allow_interpolation:
+            return None
+        if not all(isinstance(band_id, int) for band_id in band_ids):
+            return None
+        if fp.same_grid(self.fp):
+            return None
+        best = None
+        pxsize = fp.pxsize * (1 + 10 ** -env.significant)
+        for i, (ovrfp, _) in enumerate(self.overviews):
+            if (ovrfp.pxsize > pxsize).any():
+                continue
+            if best is None or ovrfp.pxsize.prod() > self.overviews[best][0].pxsize.prod():
+                best = i
+        return best
+
+    def sample_bands(self, fp, band_ids, ovr=None):
+        """Read the pixels of `fp` (that lies inside the source footprint of the overview level
+        `ovr` and on the same grid) from storage.
+        May be overriden to add a caching layer
+        """
+        with self.acquire_driver_object() as gdal_ds:
+            return self.sample_bands_driver(fp, band_ids, gdal_ds, ovr)
+
+    def sample_bands_driver(self, fp, band_ids, gdal_ds, ovr=None):
+        srcfp = self.fp if ovr is None else self.overviews[ovr][0]
+        rtlx, rtly = srcfp.spatial_to_raster(fp.tl)
+        assert rtlx >= 0 and rtlx < srcfp.rsizex
+        assert rtly >= 0 and rtly < srcfp.rsizey
 
         dstarray = np.empty(np.r_[fp.shape, len(band_ids)], self.dtype)
+        self.read_bands_driver(
+            int(rtlx), int(rtly), int(fp.rsizex), int(fp.rsizey), band_ids, gdal_ds, dstarray, ovr
+        )
+        return dstarray
+
+    def read_bands_driver(self, x, y, w, h, band_ids, gdal_ds, dstarray, ovr=None):
+        """Read a window of pixels to the band-last `dstarray` of shape (h, w, len(band_ids))
+
+        All the regular bands are read at once with a single RasterIO call writing straight to
+        `dstarray`, this way a pixel-interleaved file decodes each block only once. Mask bands and
+        overview bands are read one by one.
+        """
+        indices = [i for i, band_id in enumerate(band_ids) if isinstance(band_id, int)]
+
+        if len(indices) > 1 and ovr is None:
+            band_list = [band_ids[i] for i in indices]
+            steps = set(np.diff(indices).tolist())
+            if len(steps) == 1:
+                # The regular bands are evenly spaced in `dstarray`, read to a view of it
+                step = steps.pop()
+                buf = dstarray[..., indices[0]:indices[-1] + 1:step]
+                self._read_regular_bands_driver(x, y, w, h, band_list, gdal_ds, buf)
+            else:
+                buf = np.empty((h, w, len(indices)), self.dtype)
+                self._read_regular_bands_driver(x, y, w, h, band_list, gdal_ds, buf)
+                dstarray[..., indices] = buf
+            indices = set(indices)
+        else:
+            indices = set()
+
         for i, band_id in enumerate(band_ids):
+            if i in indices:
+                continue
             gdal_band = self._gdalband_of_band_id(gdal_ds, band_id)
-            a = gdal_band.ReadAsArray(
-                int(rtlx),
-                int(rtly),
-                int(fp.rsizex),
-                int(fp.rsizey),
-                buf_obj=dstarray[..., i],
-            )
+            if ovr is not None:
+                gdal_band = gdal_band.GetOverview(ovr)
+            a = gdal_band.ReadAsArray(x, y, w, h, buf_obj=dstarray[..., i])
             if a is None: # pragma: no cover
                 raise ValueError('Could not read array (gdal error: `{}`)'.format(
                     gdal.GetLastErrorMsg()
                 ))
-        return dstarray
+
+    def _read_regular_bands_driver(self, x, y, w, h, band_list, gdal_ds, buf):
+        """Read a window of the regular bands `band_list` to the band-last `buf`"""
+        try:
+            # GDAL derives the pixel, line and band spacings of the RasterIO call from the strides
+            # of `buf_obj`, the band-first view is filled in place
+            a = gdal_ds.ReadAsArray(
+                x, y, w, h, buf_obj=buf.transpose(2, 0, 1), band_list=band_list,
+            )
+        except TypeError: # pragma: no cover
+            # GDAL<3.5 has no `band_list` parameter in `Dataset.ReadAsArray`
+            itemsize = self.dtype.itemsize
+            a = gdal_ds.ReadRaster(
+                x, y, w, h, w, h, conv.gdt_of_any_equiv(self.dtype),
+                band_list=band_list,
+                buf_pixel_space=itemsize * len(band_list),
+                buf_line_space=itemsize * len(band_list) * w,
+                buf_band_space=itemsize,
+            )
+            if a is not None:
+                buf[...] = np.frombuffer(a, self.dtype).reshape(h, w, len(band_list))
+        if a is None: # pragma: no cover
+            raise ValueError('Could not read array (gdal error: `{}`)'.format(
+                gdal.GetLastErrorMsg()
+            ))
 
     # set_data implementation ******************************************************************* **
     def set_data(self, array, fp, band_ids, interpolation, mask):
@@ -88,21 +178,56 @@ class ABackGDALRaster(ABackStoredRaster):
         # Write ****************************************************************
         # TODO: Close all but 1 driver? Or let user do this
         with self.acquire_driver_object() as gdal_ds:
+            leftx, topy = self.fp.spatial_to_raster(fp.tl)
+            if mask is None:
+                rects = np.asarray([[0, fp.rsizey, 0, fp.rsizex]])
+            else:
+                rects = _tools.rects_of_matrix(mask)
+            if len(rects) > _MAX_MASKED_WRITES:
+                self._merge_write_driver(array, mask, int(leftx), int(topy), band_ids, gdal_ds)
+                return
+
             for i, band_id in enumerate(band_ids):
-                leftx, topy = self.fp.spatial_to_raster(fp.tl)
                 gdalband = self._gdalband_of_band_id(gdal_ds, band_id)
 
-                for sl in _tools.slices_of_matrix(mask):
-                    a = array[:, :, i][sl]
+                for ystart, yend, xstart, xend in rects.tolist():
+                    a = array[ystart:yend, xstart:xend, i]
                     assert a.ndim == 2
-                    x = int(sl[1].start + leftx)
-                    y = int(sl[0].start + topy)
+                    x = int(xstart + leftx)
+                    y = int(ystart + topy)
                     assert x >= 0
                     assert y >= 0
                     assert x + a.shape[1] <= self.fp.rsizex
                     assert y + a.shape[0] <= self.fp.rsizey
                     gdalband.WriteArray(a, x, y)
 
+    def _merge_write_driver(self, array, mask, x, y, band_ids, gdal_ds):
+        """Write the pixels of `array` where `mask` is True, by reading the window aligned on the
+        blocks of the raster that contains them, merging and writing it back.
+        Used when `mask` is too irregular to be written rectangle by rectangle.
+        """
+        # Crop to the bounding box of the mask
+        rows = np.flatnonzero(mask.any(axis=1))
+        cols = np.flatnonzero(mask.any(axis=0))
+        sl = slice(rows[0], rows[-1] + 1), slice(cols[0], cols[-1] + 1)
+        array, mask = array[sl], mask[sl]
+        x, y = x + sl[1].start, y + sl[0].start
+        h, w = mask.shape
+
+        # Align on blocks
+        bw, bh = self.block_size
+        x0, y0 = x // bw * bw, y // bh * bh
+        x1 = min(-(-(x + w) // bw) * bw, self.fp.rsizex)
+        y1 = min(-(-(y + h) // bh) * bh, self.fp.rsizey)
+
+        merged = np.empty((y1 - y0, x1 - x0, len(band_ids)), self.dtype)
+        self.read_bands_driver(x0, y0, x1 - x0, y1 - y0, band_ids, gdal_ds, merged)
+        sl = slice(y - y0, y - y0 + h), slice(x - x0, x - x0 + w)
+        merged[sl] = np.where(mask[..., None], array, merged[sl])
+        for i, band_id in enumerate(band_ids):
+            gdalband = self._gdalband_of_band_id(gdal_ds, band_id)
+            gdalband.WriteArray(merged[..., i], x0, y0)
+
     # fill implementation *********************************************************************** **
     def fill(self, value, band_ids):
         with self.acquire_driver_object() as gdal_ds:
@@ -138,6 +263,32 @@ class ABackGDALRaster(ABackStoredRaster):
         gdal_ds.FlushCache()
         return gdal_ds
 
+    def _overviews_of_infos(self, infos):
+        """Build the list of `(footprint, block_size)` of the overview levels from the list of
+        `(rsize, block_size)` returned by `_overview_infos_of_gdal_ds`, the footprints are in the
+        work coordinates like `self.fp`.
+        """
+        overviews = []
+        for rsize, block_size in infos:
+            aff = self.fp.affine * affine.Affine.scale(
+                self.fp.rsizex / rsize[0], self.fp.rsizey / rsize[1],
+            )
+            overviews.append((Footprint(gt=aff.to_gdal(), rsize=rsize), block_size))
+        return overviews
+
+    @staticmethod
+    def _overview_infos_of_gdal_ds(gdal_ds):
+        """Used on file opening"""
+        band = gdal_ds.GetRasterBand(1)
+        infos = []
+        for i in range(band.GetOverviewCount()):
+            ovr_band = band.GetOverview(i)
+            infos.append((
+                (ovr_band.XSize, ovr_band.YSize),
+                tuple(ovr_band.GetBlockSize()),
+            ))
+        return infos
+
     @staticmethod
     def _gdalband_of_band_id(gdal_ds, id):
         """Convert a band identifier to a gdal band"""
@@ -68,10 +68,12 @@ class AProxy(object):
                 # code...
         """
         def _close():
-            self._back.close()
-            self._ds._unregister(self)
-            del self._ds
-            del self._back
+            try:
+                self._back.close()
+            finally:
+                self._ds._unregister(self)
+                del self._ds
+                del self._back
 
         return _CloseRoutine(self, _close)
 
@@ -1,8 +1,15 @@
 import sys
+import collections
+import itertools
+
+import numpy as np
 
 from buzzard._a_proxy import AProxy, ABackProxy
 from buzzard._a_proxy_raster_remap import ABackProxyRasterRemapMixin
+from buzzard._a_proxy_raster_warp import ABackProxyRasterWarpMixin
+from buzzard._a_proxy_raster_points import ABackProxyRasterPointsMixin
 from buzzard._footprint import Footprint
+from buzzard._footprint_array import FootprintArray
 from buzzard import _tools
 
 class AProxyRaster(AProxy):
@@ -16,6 +23,7 @@ class AProxyRaster(AProxy):
     - Has a `band_schema` that defines per band attributes (like nodata)
     - Has a `dtype` (like np.float32)
     - Has a `get_data` method that allows to read pixels in their current state to numpy arrays
+    - Has a `sample_points` method that allows to read pixels at scattered spatial coordinates
     """
 
     @property
@@ -61,6 +69,10 @@ class AProxyRaster(AProxy):
         False in `DataSource` (default)). When remapping, the nodata values are not interpolated,
         they are correctly spread to the output.
 
+        If `fp` is coarser than the source raster and the raster has overviews (internal or
+        external `.ovr`), the pixels are read from the coarsest overview that is not coarser than
+        `fp`, only the remaining remapping is then performed.
+
         If `dst_nodata` is provided, nodata pixels are set to `dst_nodata`.
 
         The alpha bands are currently resampled like any other band, this behavior may change in
@@ -145,13 +157,168 @@ class AProxyRaster(AProxy):
             interpolation=interpolation,
         ).reshape(outshape)
 
+    def sample_points(self, xy, band=1, dst_nodata=None, interpolation='nearest'):
+        """Read the values of the raster at scattered spatial coordinates.
+
+        Only the blocks of the raster that contain the points are read (through the block cache of
+        the DataSource if enabled, see `block_cache_size` in DataSource), it is much cheaper than a
+        `get_data` on the bounding Footprint of sparse points.
+
+        The points outside of the raster are set to `dst_nodata`, and so are the points whose value
+        is computed from a nodata pixel.
+
+        Parameters
+        ----------
+        xy: sequence of numbers of shape (..., 2)
+            Spatial coordinates
+        band: band id or sequence of band id (see `Band Identifiers` in `get_data`)
+        dst_nodata: nbr or None
+            nodata value in output array
+            If None and raster.nodata is not None: raster.nodata is used
+            If None and raster.nodata is None: 0 is used
+        interpolation: one of {'nearest', 'bilinear'}
+            'nearest': Value of the pixel containing the point
+            'bilinear': Bilinear interpolation of the 4 pixel centers surrounding the point
+
+        Returns
+        -------
+        numpy.ndarray
+            of shape np.asarray(xy).shape[:-1] or np.asarray(xy).shape[:-1] + (B,)
+
+        Example
+        -------
+        >>> z = dem.sample_points(lidar_points[:, :2], interpolation='bilinear')
+
+        """
+        # Normalize and check xy parameter
+        xy = np.asarray(xy)
+        if xy.shape[-1] != 2: # pragma: no cover
+            raise ValueError('An array of shape (..., 2) was expected')
+
+        # Normalize and check band parameter
+        band_ids, is_flat = _tools.normalize_band_parameter(band, len(self), self.shared_band_id)
+        if is_flat:
+            outshape = xy.shape[:-1]
+        else:
+            outshape = xy.shape[:-1] + (len(band_ids),)
+        del band
+
+        # Normalize and check dst_nodata parameter
+        if dst_nodata is not None:
+            dst_nodata = self.dtype.type(dst_nodata)
+        elif self.nodata is not None:
+            dst_nodata = self.nodata
+        else:
+            dst_nodata = self.dtype.type(0)
+
+        # Check interpolation parameter
+        if interpolation not in self._back.SAMPLE_POINTS_INTERPOLATIONS: # pragma: no cover
+            raise ValueError('`interpolation` should be one of {}'.format(
+                set(self._back.SAMPLE_POINTS_INTERPOLATIONS)
+            ))
+
+        return self._back.sample_points(
+            xy=xy.reshape(-1, 2),
+            band_ids=band_ids,
+            dst_nodata=dst_nodata,
+            interpolation=interpolation,
+        ).reshape(outshape)
+
+    def get_data_async(self, fp=None, band=1, dst_nodata=None, interpolation='cv_area'):
+        """Schedule a `get_data` on the pool of threads of the DataSource
+        (see `Asynchronous reads and writes` in DataSource).
+
+        The parameters are the same as in `get_data`, the exceptions are raised by the `result`
+        method of the returned future.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            whose result is the numpy.ndarray returned by `get_data`
+
+        Example
+        -------
+        >>> futures = [
+        ...     rgb.get_data_async(fp=tile, band=-1)
+        ...     for tile in rgb.fp.tile((512, 512)).flat
+        ... ]
+        >>> arrays = [future.result() for future in futures]
+
+        From an asyncio event loop
+        >>> arr = await asyncio.wrap_future(rgb.get_data_async(fp=tile, band=-1))
+
+        """
+        return self._back.back_ds.async_executor.submit(
+            self.get_data,
+            fp=fp,
+            band=band,
+            dst_nodata=dst_nodata,
+            interpolation=interpolation,
+        )
+
+    def iter_data(self, fps, band=1, dst_nodata=None, interpolation='cv_area', prefetch=2):
+        """Iterate over the `get_data` of several Footprints, reading the next `prefetch` windows in
+        the pool of threads of the DataSource while the current one is processed by the caller.
+        (see `Asynchronous reads and writes` in DataSource).
+
+        Parameters
+        ----------
+        fps: iterable of Footprint or numpy.ndarray of Footprint or FootprintArray
+            Windows to read, in order (like the output of `Footprint.tile`). The arrays are
+            flattened.
+        band: band id or sequence of band id (see `get_data`)
+        dst_nodata: nbr or None (see `get_data`)
+        interpolation: one of {'cv_area', 'cv_nearest', 'cv_linear', 'cv_cubic', 'cv_lanczos4'} or None
+            Resampling method
+        prefetch: int >= 0
+            Number of windows read in advance
+
+        Yields
+        ------
+        (Footprint, numpy.ndarray)
+            The Footprints of `fps` and the outputs of `get_data`, in order
+
+        Example
+        -------
+        >>> for fp, arr in rgb.iter_data(rgb.fp.tile((512, 512)), band=-1, prefetch=4):
+        ...     train_step(arr)
+
+        """
+        prefetch = int(prefetch)
+        if prefetch < 0: # pragma: no cover
+            raise ValueError('`prefetch` should be greater than or equal to 0')
+        if isinstance(fps, np.ndarray):
+            fps = fps.flat
+        elif isinstance(fps, FootprintArray):
+            fps = fps.ravel()
+        fps = iter(fps)
+
+        futures = collections.deque()
+        def _submit(count):
+            for fp in itertools.islice(fps, count):
+                futures.append((fp, self.get_data_async(
+                    fp=fp, band=band, dst_nodata=dst_nodata, interpolation=interpolation,
+                )))
+
+        _submit(prefetch + 1)
+        try:
+            while futures:
+                fp, future = futures.popleft()
+                array = future.result()
+                _submit(1)
+                yield fp, array
+        finally:
+            for _, future in futures:
+                future.cancel()
+
     # Deprecation
     fp_origin = _tools.deprecation_pool.wrap_property(
         'fp_stored',
         '0.4.4'
     )
 
-class ABackProxyRaster(ABackProxy, ABackProxyRasterRemapMixin):
+class ABackProxyRaster(ABackProxy, ABackProxyRasterRemapMixin, ABackProxyRasterWarpMixin,
+                       ABackProxyRasterPointsMixin):
     """Implementation of AProxyRaster's specifications"""
 
     def __init__(self, band_schema, dtype, fp_stored, **kwargs):
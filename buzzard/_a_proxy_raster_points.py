@@ -0,0 +1,86 @@
+import numpy as np
+
+class ABackProxyRasterPointsMixin(object):
+    """Raster Mixin containing the point sampling subroutines
+
+    The pixels used by the points are grouped by block of the raster (see `block_size`), each block
+    touched is read once with `sample_bands` (so through the block cache of the DataSource if the
+    raster has one), and the values are gathered from it with numpy fancy indexing.
+    """
+
+    SAMPLE_POINTS_INTERPOLATIONS = frozenset(['nearest', 'bilinear'])
+
+    def sample_points(self, xy, band_ids, dst_nodata, interpolation):
+        """Read the values of the bands at the spatial coordinates `xy` of shape (N, 2)
+
+        Returns
+        -------
+        np.ndarray of shape (N, len(band_ids))
+        """
+        rxy = self._raster_coordinates_of_points(xy)
+        w, h = self.fp.rsize.tolist()
+        with np.errstate(invalid='ignore'):
+            inside = (rxy[:, 0] >= 0) & (rxy[:, 0] < w) & (rxy[:, 1] >= 0) & (rxy[:, 1] < h)
+        x, y = rxy[inside, 0], rxy[inside, 1]
+        array = np.full((len(rxy), len(band_ids)), dst_nodata, self.dtype)
+        if len(x) == 0:
+            return array
+
+        if interpolation == 'nearest':
+            values = self._gather_pixels(x.astype(int), y.astype(int), band_ids)
+            nodata_mask = None if self.nodata is None else values == self.nodata
+        else:
+            # Indices and weights of the 4 pixels whose centers surround the points, the pixels
+            # of the edges of the raster are replicated outward
+            x, y = x - 0.5, y - 0.5
+            x0, y0 = np.floor(x), np.floor(y)
+            tx, ty = (x - x0)[:, None], (y - y0)[:, None]
+            xs = np.c_[x0, x0 + 1, x0, x0 + 1].astype(int).clip(0, w - 1)
+            ys = np.c_[y0, y0, y0 + 1, y0 + 1].astype(int).clip(0, h - 1)
+            weights = np.c_[(1 - tx) * (1 - ty), tx * (1 - ty), (1 - tx) * ty, tx * ty]
+            neighbors = self._gather_pixels(xs.ravel(), ys.ravel(), band_ids).reshape(
+                len(x), 4, len(band_ids)
+            )
+            values = (neighbors * weights[..., None]).sum(axis=1)
+            if np.issubdtype(self.dtype, np.integer):
+                values = np.around(values)
+            if self.nodata is None:
+                nodata_mask = None
+            else:
+                nodata_mask = ((neighbors == self.nodata) & (weights[..., None] > 0)).any(axis=1)
+
+        if nodata_mask is not None:
+            values = values.astype(self.dtype, copy=False)
+            values[nodata_mask] = dst_nodata
+        array[inside] = values
+        return array
+
+    def _raster_coordinates_of_points(self, xy):
+        """Convert the spatial coordinates `xy` to continuous raster coordinates of `self.fp`"""
+        if self.warping:
+            xy = self.to_virtual(np.asarray(xy, np.float64))
+            x, y = ~self.fp_stored.affine * (xy[:, 0], xy[:, 1])
+            return np.c_[x, y]
+        return self.fp.spatial_to_raster(xy, dtype='float64', op=None)
+
+    def _gather_pixels(self, xs, ys, band_ids):
+        """Read the bands at the raster indices `xs` and `ys`, block by block"""
+        bw, bh = self.block_size
+        w, h = self.fp.rsize.tolist()
+        blockcountx = -(-w // bw)
+        block_indices = ys // bh * blockcountx + xs // bw
+        order = np.argsort(block_indices, kind='stable')
+        block_indices = block_indices[order]
+        starts = np.flatnonzero(np.r_[True, block_indices[1:] != block_indices[:-1]])
+        stops = np.r_[starts[1:], len(order)]
+
+        values = np.empty((len(xs), len(band_ids)), self.dtype)
+        for start, stop in zip(starts.tolist(), stops.tolist()):
+            by, bx = divmod(int(block_indices[start]), blockcountx)
+            x0, y0 = bx * bw, by * bh
+            block = self.sample_bands(
+                self.fp.clip(x0, y0, min(x0 + bw, w), min(y0 + bh, h)), band_ids,
+            )
+            indices = order[start:stop]
+            values[indices] = block[ys[indices] - y0, xs[indices] - x0]
+        return values
@@ -1,7 +1,18 @@
+import concurrent.futures
+
 import numpy as np
 import cv2
 
+from buzzard._footprint import Footprint
 from buzzard._tools import ANY
+from buzzard._env import env
+from buzzard._a_proxy_raster_remap_cache import MAPS_CACHE
+
+# Number of decimals of the relative affine transformations used as cache keys
+_KEY_DECIMALS = 9
+
+# Number of subdivisions of a pixel in the fixed-point coordinates of cv2 (`INTER_TAB_SIZE`)
+_INTER_TAB_SIZE = 32
 
 _EXN_FORMAT = """Illegal remap attempt between two Footprints that do not lie on the same grid.
 full raster    -> {src!s}
@@ -25,31 +36,52 @@ class ABackProxyRasterRemapMixin(object):
         'cv_lanczos4': cv2.INTER_LANCZOS4,
     }
 
-    def build_sampling_footprint(self, fp, interpolation):
-        if not fp.share_area(self.fp):
+    # Type and value of the remapped nodata masks. The smallest type such that a destination pixel
+    # is non-zero if any of the source pixels it is interpolated from is non-zero: cv2 interpolates
+    # the 8 bits images with integer weights that may round small contributions to 0, and the
+    # negative lobes of the cubic and lanczos kernels may only be represented with floats.
+    _NODATA_MASK_TYPES = {
+        'cv_area': (np.uint16, 65535),
+        'cv_nearest': (np.uint8, 1),
+        'cv_linear': (np.uint16, 65535),
+        'cv_cubic': (np.float32, 1),
+        'cv_lanczos4': (np.float32, 1),
+    }
+
+    def build_sampling_footprint(self, fp, interpolation, src_fp=None):
+        """Compute the Footprint to read from `src_fp` (self.fp by default) to be able to remap it to
+        `fp`, returns None if `fp` lies outside of `src_fp`"""
+        if src_fp is None:
+            src_fp = self.fp
+        if not fp.share_area(src_fp):
             return None
-        if fp.same_grid(self.fp):
-            fp = fp & self.fp
-            assert fp.same_grid(self.fp)
+        if fp.same_grid(src_fp):
+            fp = fp & src_fp
+            assert fp.same_grid(src_fp)
             return fp
         if not self.back_ds.allow_interpolation: # pragma: no cover
             raise ValueError(_EXN_FORMAT.format(
-                src=self.fp,
+                src=src_fp,
                 dst=fp,
                 tldiff=fp.tl - (
-                    self.fp.pxtbvec * np.around(~self.fp.affine * fp.tl)[1] +
-                    self.fp.pxlrvec * np.around(~self.fp.affine * fp.tl)[0]
-                ) - self.fp.tl,
+                    src_fp.pxtbvec * np.around(~src_fp.affine * fp.tl)[1] +
+                    src_fp.pxlrvec * np.around(~src_fp.affine * fp.tl)[0]
+                ) - src_fp.tl,
             ))
+        return self.dilate_sampling_footprint(fp, interpolation, src_fp)
+
+    @staticmethod
+    def dilate_sampling_footprint(fp, interpolation, src_fp):
+        """Dilate `fp` by the margin required by `interpolation` and clip it to `src_fp`"""
         if interpolation in {'cv_nearest'}:
-            dilate_size = 1 * self.fp.pxsizex / fp.pxsizex # hyperparameter
+            dilate_size = 1 * src_fp.pxsizex / fp.pxsizex # hyperparameter
         elif interpolation in {'cv_linear', 'cv_area'}:
-            dilate_size = 2 * self.fp.pxsizex / fp.pxsizex # hyperparameter
+            dilate_size = 2 * src_fp.pxsizex / fp.pxsizex # hyperparameter
         else:
-            dilate_size = 4 * self.fp.pxsizex / fp.pxsizex # hyperparameter
+            dilate_size = 4 * src_fp.pxsizex / fp.pxsizex # hyperparameter
         dilate_size = max(2, np.ceil(dilate_size)) # hyperparameter too
         fp = fp.dilate(dilate_size)
-        fp = self.fp & fp
+        fp = src_fp & fp
         return fp
 
     @classmethod
@@ -65,7 +97,7 @@ class ABackProxyRasterRemapMixin(object):
         arr_mode = array is not None, mask is not None
         fp_mode = (
             src_fp.same_grid(dst_fp),
-            src_fp.poly.contains(dst_fp.poly),
+            src_fp._poly_contains(dst_fp),
         )
 
         # Check array / mask ***************************************************
@@ -165,21 +197,215 @@ class ABackProxyRasterRemapMixin(object):
 
         return dstarray, dstmask
 
+    @classmethod
+    def _build_warp(cls, src_fp, dst_fp, interpolation):
+        """Build a function that warps an array from `src_fp` to `dst_fp`.
+
+        When the Footprints only differ by a scale and a translation that are multiples of the
+        precision of the fixed-point coordinates of cv2 (1/32 of a pixel, or 1 pixel with
+        'cv_nearest'), the warp is performed by `cv2.warpAffine` that computes the source
+        coordinates on the fly. Those coordinates are then exact, the output is identical to the
+        one of `cv2.remap`. Otherwise the per-pixel maps of `cv2.remap` are used, since
+        `cv2.warpAffine` rounds the coordinates differently.
+        """
+        aff = ~src_fp.affine * dst_fp.affine
+        flags = cls.REMAP_INTERPOLATIONS[interpolation]
+        matrix = None
+        if _is_scale_translation(aff):
+            matrix = _exact_warp_matrix(aff, interpolation)
+
+        if matrix is not None:
+            dsize = (int(dst_fp.rsizex), int(dst_fp.rsizey))
+
+            def _warp(array, **kwargs):
+                return cv2.warpAffine(
+                    array, matrix, dsize, flags=flags | cv2.WARP_INVERSE_MAP, **kwargs
+                )
+        else:
+            mapx, mapy = cls._remap_maps(src_fp, dst_fp, interpolation == 'cv_nearest')
+
+            def _warp(array, **kwargs):
+                return cv2.remap(array, mapx, mapy, interpolation=flags, **kwargs)
+
+        return _warp
+
+    @staticmethod
+    def _remap_maps(src_fp, dst_fp, nninterpolation):
+        """Build the maps of `cv2.remap` from `dst_fp` to `src_fp`, converted to CV_16SC2.
+
+        The maps are computed from the affine transformation between the two Footprints, rounded
+        like the keys of the cache, this way a cached map is identical to a newly built one.
+        The maps of two pairs of Footprints that only differ by an integer translation of the
+        source pixels only differ by an integer offset. The maps are cached with the integer
+        part of the translation removed, and this offset is added back after a lookup.
+        With `nninterpolation` the coordinates are rounded to the nearest integer, the ties to the
+        even one, removing an odd offset would change the rounding of the ties: the whole
+        translation is kept in the cache key.
+        """
+        aff = ~src_fp.affine * dst_fp.affine
+        if nninterpolation:
+            offset = np.zeros(2)
+        else:
+            offset = np.floor(np.around([aff.c, aff.f], _KEY_DECIMALS))
+        coefs = tuple(np.around(
+            [aff.a, aff.b, aff.d, aff.e, aff.c - offset[0], aff.f - offset[1]], _KEY_DECIMALS,
+        ).tolist())
+        key = (coefs, tuple(dst_fp.shape), nninterpolation)
+
+        maps = None if env.remap_cache_size == 0 else MAPS_CACHE.get(key)
+        if maps is None:
+            a, b, d, e, c, f = coefs
+            x, y = dst_fp.meshgrid_raster
+            maps = cv2.convertMaps(
+                (x * a + y * b + c).astype('float32'),
+                (x * d + y * e + f).astype('float32'),
+                cv2.CV_16SC2,
+                nninterpolation=nninterpolation,
+            ) # At this point mapx/mapy are not really mapx/mapy any more, but who cares?
+            if env.remap_cache_size != 0:
+                MAPS_CACHE.put(key, maps)
+        map1, map2 = maps
+        if offset.any():
+            map1 = map1 + offset.astype(map1.dtype)
+        return map1, map2
+
     @classmethod
     def _remap_interpolate(cls, src_fp, dst_fp, array, mask, src_nodata, dst_nodata,
                            mask_mode, interpolation):
-        if array is not None and array.dtype in [np.dtype('float64'), np.dtype('bool')]:
-            raise ValueError(
-                'dtype {!r} not handled by cv2.remap'.format(array.dtype)
-            ) # pragma: no cover
-
-        mapx, mapy = dst_fp.meshgrid_raster_in(src_fp, dtype='float32')
-        mapx, mapy = cv2.convertMaps(
-            mapx, mapy, cv2.CV_16SC2,
-            nninterpolation=interpolation == 'cv_nearest',
-        ) # At this point mapx/mapy are not really mapx/mapy any more, but who cares?
-        interpolation = cls.REMAP_INTERPOLATIONS[interpolation]
+        if array is not None and array.dtype == np.dtype('bool'):
+            # cv2 does not handle bool arrays, remap them as uint8 without copy
+            dstarray, dstmask = cls._remap_interpolate(
+                src_fp, dst_fp,
+                array.view('uint8'), mask,
+                None if src_nodata is None else int(src_nodata), int(dst_nodata),
+                mask_mode, interpolation,
+            )
+            # Interpolations with negative lobes may overshoot 1
+            np.minimum(dstarray, 1, out=dstarray)
+            return dstarray.view('bool'), dstmask
+
+        if array is not None:
+            dstarray = np.full(np.r_[dst_fp.shape, array.shape[-1]], dst_nodata, array.dtype)
+        else:
+            dstarray = None # pragma: no cover
+        if mask is not None:
+            dstmask = np.zeros(dst_fp.shape, bool)
+        else:
+            dstmask = None # pragma: no cover
+
+        workers = env.remap_workers
+        strip_height = cls._remap_strip_height(
+            src_fp, dst_fp, array, workers, env.remap_memory_budget,
+        )
+        if strip_height >= dst_fp.rsizey:
+            cls._remap_interpolate_into(
+                cls._build_warp(src_fp, dst_fp, interpolation),
+                array, mask, src_nodata, dst_nodata, mask_mode, interpolation,
+                dstarray, dstmask,
+            )
+            return dstarray, dstmask
+
+        def _remap_strip(starty):
+            rows = slice(starty, min(starty + strip_height, dst_fp.rsizey))
+            gt = dst_fp.gt
+            gt[0], gt[3] = dst_fp.affine * (0, rows.start)
+            strip_fp = Footprint(gt=gt, rsize=(dst_fp.rsizex, rows.stop - rows.start))
+            if not strip_fp.share_area(src_fp):
+                return
+            sample_fp = cls.dilate_sampling_footprint(strip_fp, interpolation, src_fp)
+            sample_slice = sample_fp.slice_in(src_fp)
+            if interpolation == 'cv_nearest':
+                # cv2 rounds the ties of the coordinates to the even pixel, the origin of the
+                # sample must be on an even pixel of `src_fp` to keep the rounding of a full warp
+                sy, sx = sample_slice
+                sample_fp = src_fp.clip(
+                    sx.start - sx.start % 2, sy.start - sy.start % 2, sx.stop, sy.stop,
+                )
+                sample_slice = sample_fp.slice_in(src_fp)
+            cls._remap_interpolate_into(
+                cls._build_warp(sample_fp, strip_fp, interpolation),
+                None if array is None else array[sample_slice],
+                None if mask is None else mask[sample_slice],
+                src_nodata, dst_nodata, mask_mode, interpolation,
+                None if dstarray is None else dstarray[rows],
+                None if dstmask is None else dstmask[rows],
+            )
+
+        startys = range(0, dst_fp.rsizey, strip_height)
+        if workers == 1:
+            for starty in startys:
+                _remap_strip(starty)
+        else:
+            with concurrent.futures.ThreadPoolExecutor(workers) as ex:
+                for future in [ex.submit(_remap_strip, starty) for starty in startys]:
+                    future.result()
+        return dstarray, dstmask
+
+    @staticmethod
+    def _remap_strip_height(src_fp, dst_fp, array, workers, budget):
+        """Compute the number of destination rows to remap at once to keep the temporary arrays
+        of all the workers within `budget` bytes (0 for no limit).
+
+        The temporary arrays are the nodata masks (bool and float32, source and destination
+        sides), the float32 mask and the maps of `cv2.remap` (float32 and converted).
+        """
+        if budget == 0:
+            return dst_fp.rsizey
+        bandcount = 1 if array is None else array.shape[-1]
+        ratio = dst_fp.pxsize / src_fp.pxsize
+        srcrow_bytes = dst_fp.rsizex * ratio[0] * (bandcount * 5 + 4)
+        row_bytes = dst_fp.rsizex * (bandcount * 5 + 14) + ratio[1] * srcrow_bytes
+        return max(1, int(budget / workers // row_bytes))
+
+    @classmethod
+    def remap_maps(cls, array, mapx, mapy, src_nodata, dst_nodata, interpolation):
+        """Remap `array` given the raster coordinates in `array` of each destination pixel, like
+        `cv2.remap`
+
+        Parameters
+        ----------
+        array: np.ndarray of shape (Y, X, B)
+        mapx, mapy: np.ndarray of float32 of shape (Y', X')
+        src_nodata: None or nbr
+        dst_nodata: nbr
+        interpolation: one of `REMAP_INTERPOLATIONS`
 
+        Returns
+        -------
+        np.ndarray of shape (Y', X', B)
+        """
+        if array.dtype == np.dtype('bool'):
+            dstarray = cls.remap_maps(
+                array.view('uint8'), mapx, mapy,
+                None if src_nodata is None else int(src_nodata), int(dst_nodata),
+                interpolation,
+            )
+            np.minimum(dstarray, 1, out=dstarray)
+            return dstarray.view('bool')
+
+        flags = cls.REMAP_INTERPOLATIONS[interpolation]
+        dstshape = mapx.shape
+        if max(array.shape[:2]) < 2 ** 15:
+            # Same fixed-point maps and nearest rounding as the other remappings
+            mapx, mapy = cv2.convertMaps(
+                mapx, mapy, cv2.CV_16SC2,
+                nninterpolation=interpolation == 'cv_nearest',
+            )
+
+        def _warp(array, **kwargs):
+            return cv2.remap(array, mapx, mapy, interpolation=flags, **kwargs)
+
+        dstarray = np.full(np.r_[dstshape, array.shape[-1]], dst_nodata, array.dtype)
+        cls._remap_interpolate_into(
+            _warp, array, None, src_nodata, dst_nodata, None, interpolation, dstarray, None,
+        )
+        return dstarray
+
+    @classmethod
+    def _remap_interpolate_into(cls, warp, array, mask, src_nodata, dst_nodata,
+                                mask_mode, interpolation, dstarray, dstmask):
+        """Remap `array` and `mask` with `warp` to the preallocated `dstarray` and `dstmask`,
+        `dstarray` should be filled with `dst_nodata`"""
         if array is not None:
             # "Bug" 1 with cv2.BORDER_CONSTANT *********************************
             # cv2.remap with cv2.BORDER_CONSTANT considers that the constant value is part of the
@@ -196,51 +422,69 @@ class ABackProxyRasterRemapMixin(object):
             #  "Bug" 3 with remap **********************************************
             # If the input array has shape (Y, X, 1), the output is (Y, X).
             if src_nodata is None:
-                dstarray = np.full(np.r_[dst_fp.shape, array.shape[-1]], dst_nodata, array.dtype)
-                cv2.remap(
-                    array, mapx, mapy,
-                    interpolation=interpolation,
+                warp(
+                    array,
                     borderMode=cv2.BORDER_TRANSPARENT,
                     dst=dstarray,
                 )
             else:
-                dstnodatamask = np.ones(np.r_[dst_fp.shape, array.shape[-1]], 'float32')
-                cv2.remap(
-                    (array == src_nodata).astype('float32'), mapx, mapy,
-                    interpolation=interpolation,
+                # The nodata mask is remapped once if it is shared by all bands, a destination
+                # pixel is nodata if any of the source pixels it is interpolated from is nodata.
+                nodatamask = array == src_nodata
+                firstmask = nodatamask[..., 0]
+                if (np.count_nonzero(nodatamask) == np.count_nonzero(firstmask) * array.shape[-1] and
+                        nodatamask[firstmask].all()):
+                    nodatamask = firstmask
+                dtype, value = cls._NODATA_MASK_TYPES[interpolation]
+                dstnodatamask = np.full(dstarray.shape[:nodatamask.ndim], value, dtype)
+                warp(
+                    np.multiply(nodatamask, value, dtype=dtype),
                     dst=dstnodatamask,
                     borderMode=cv2.BORDER_TRANSPARENT,
                 )
                 dstnodatamask = dstnodatamask != 0
-                dstarray = np.full(np.r_[dst_fp.shape, array.shape[-1]], dst_nodata, array.dtype)
-                cv2.remap(
-                    array, mapx, mapy,
-                    interpolation=interpolation,
+                warp(
+                    array,
                     borderMode=cv2.BORDER_TRANSPARENT,
                     dst=dstarray,
                 )
                 dstarray[dstnodatamask] = dst_nodata
-        else:
-            dstarray = None # pragma: no cover
 
         if mask is not None:
             if mask_mode == 'erode':
-                dstmask = cv2.remap(
-                    mask.astype('float32'), mapx, mapy,
-                    interpolation=interpolation,
+                dstmask[:] = warp(
+                    mask.astype('float32'),
                     borderMode=cv2.BORDER_CONSTANT,
                     borderValue=0.,
                 ) == 1.
             elif mask_mode == 'dilate':
-                dstmask = cv2.remap(
-                    mask.astype('float32'), mapx, mapy,
-                    interpolation=interpolation,
+                dstmask[:] = warp(
+                    mask.astype('float32'),
                     borderMode=cv2.BORDER_CONSTANT,
                     borderValue=0.,
                 ) != 0.
             else:
                 assert False # pragma: no cover
-        else:
-            dstmask = None # pragma: no cover
 
-        return dstarray, dstmask
+def _is_scale_translation(aff):
+    """Is the affine transformation between two rasters only made of a scale and a translation"""
+    return (
+        abs(aff.b) < 10 ** -_KEY_DECIMALS and abs(aff.d) < 10 ** -_KEY_DECIMALS
+    )
+
+def _exact_warp_matrix(aff, interpolation):
+    """Build the matrix of `cv2.warpAffine` for a scale and translation `aff` if the source
+    coordinates it yields are exact. cv2 rounds the source coordinates to 1/32 of a pixel (to
+    the nearest pixel with 'cv_nearest'), `cv2.warpAffine` rounds the ties up while the maps of
+    `cv2.remap` round them to the even value.
+
+    Returns
+    -------
+    np.ndarray of shape (2, 3) or None
+    """
+    step = 1. if interpolation == 'cv_nearest' else 1. / _INTER_TAB_SIZE
+    coefs = np.around(np.asarray([aff.a, aff.c, aff.e, aff.f]) / step, _KEY_DECIMALS - 2)
+    if (coefs != np.around(coefs)).any():
+        return None
+    a, c, e, f = (coefs * step).tolist()
+    return np.asarray([[a, 0., c], [0., e, f]])
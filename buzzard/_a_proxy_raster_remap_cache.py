@@ -0,0 +1,98 @@
+import collections
+import threading
+
+from buzzard._datasource_back_block_cache import CacheInfo
+from buzzard._env import env
+
+class RemapMapsCache(object):
+    """Process-wide LRU cache of the maps converted by `cv2.convertMaps` for `cv2.remap`.
+
+    The size of the cache is read from `buzz.env.remap_cache_size` on each insertion.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._maps = collections.OrderedDict()
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key):
+        """Retrieve maps from the cache, return None on cache miss"""
+        with self._lock:
+            maps = self._maps.get(key)
+            if maps is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._maps.move_to_end(key)
+            return maps
+
+    def put(self, key, maps):
+        """Insert maps in the cache, evicting the least recently used maps if necessary"""
+        maxsize = env.remap_cache_size
+        nbytes = _nbytes_of_maps(maps)
+        if nbytes > maxsize:
+            return
+        for m in maps:
+            if m is not None:
+                m.flags.writeable = False
+        with self._lock:
+            old = self._maps.pop(key, None)
+            if old is not None:
+                self._nbytes -= _nbytes_of_maps(old)
+            while self._nbytes + nbytes > maxsize:
+                _, evicted = self._maps.popitem(last=False)
+                self._nbytes -= _nbytes_of_maps(evicted)
+            self._maps[key] = maps
+            self._nbytes += nbytes
+
+    def clear(self):
+        """Drop all the maps and reset the counters"""
+        with self._lock:
+            self._maps.clear()
+            self._nbytes = 0
+            self._hits = 0
+            self._misses = 0
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, env.remap_cache_size, self._nbytes)
+
+def _nbytes_of_maps(maps):
+    return sum(m.nbytes for m in maps if m is not None)
+
+MAPS_CACHE = RemapMapsCache()
+
+def remap_cache_info():
+    """Retrieve the statistics of the cache of remapping maps, shared by all the rasters of the
+    process. The maps used to resample a raster are cached, a map is reused for all the
+    Footprint pairs that only differ by an integer translation of the source pixels (like the
+    tiles of a `Footprint.tile` output read from the same raster).
+    No maps are needed when the two Footprints only differ by a scale and a translation (like
+    between two north-up Footprints), those resamplings do not use the cache.
+    The maps of the tiles warped by a `DataSource(warp_rasters=True)` are also cached.
+    See `buzz.env.remap_cache_size` to set the size of the cache.
+
+    Returns
+    -------
+    CacheInfo
+        namedtuple of (hits, misses, maxsize, currsize)
+        with hits/misses the number of map lookups that succeeded/failed
+        with maxsize/currsize the maximum/current size of the cache in bytes
+
+    Example
+    -------
+    >>> ds = buzz.DataSource(allow_interpolation=True)
+    >>> dsm = ds.aopen_raster('path/to/dsm.tif')
+    >>> ortho = ds.aopen_raster('path/to/rotated_ortho.tif')
+    >>> for tile in ortho.fp.tile((256, 256)).flat:
+    ...     arr = dsm.get_data(fp=tile)
+    >>> buzz.remap_cache_info()
+    CacheInfo(hits=99, misses=1, maxsize=67108864, currsize=393216)
+    """
+    return MAPS_CACHE.info()
+
+def clear_remap_cache():
+    """Drop all the maps of the cache of remapping maps and reset its statistics"""
+    MAPS_CACHE.clear()
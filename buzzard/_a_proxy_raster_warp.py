@@ -0,0 +1,126 @@
+import numpy as np
+
+from buzzard._footprint import Footprint
+from buzzard._a_proxy_raster_remap_cache import MAPS_CACHE
+
+# Distance in pixels between two points of the grid converted by OSR, the raster coordinates of
+# the other pixels are bilinearly interpolated
+_GRID_STEP = 16
+
+# Size of the tiles of the output warped at once
+_TILE_SIZE = (512, 512)
+
+# Margin in pixels read around the source pixels of a tile, given the interpolation
+_MARGINS = {
+    'cv_nearest': 1,
+    'cv_linear': 2,
+    'cv_area': 2,
+    'cv_cubic': 4,
+    'cv_lanczos4': 4,
+}
+
+class ABackProxyRasterWarpMixin(object):
+    """Raster Mixin containing the warping subroutines, used when a DataSource is created with
+    `warp_rasters=True` and the raster's `sr_virtual` differs from `sr_work`.
+
+    The pixels of the output are mapped to the pixels of the raster using a coarse grid of points
+    converted by OSR from `sr_work` to `sr_virtual`, and interpolated in between. The output is
+    processed tile by tile, and the maps of each tile are cached in the cache of remapping maps
+    (see `buzz.remap_cache_info`).
+    """
+
+    @property
+    def warping(self):
+        return self.to_virtual is not None and self.back_ds.warp_rasters
+
+    def sample_bands(self, fp, band_ids): # pragma: no cover
+        raise NotImplementedError('ABackProxyRasterWarpMixin.sample_bands is virtual pure')
+
+    def get_warped_data(self, fp, band_ids, dst_nodata, interpolation):
+        """Read the pixels of `fp` (in `sr_work`) from the raster (in `sr_virtual`)"""
+        if interpolation is None:
+            raise ValueError('`interpolation` should not be None when warping rasters')
+        array = np.full(np.r_[fp.shape, len(band_ids)], dst_nodata, self.dtype)
+        margin = _MARGINS[interpolation]
+
+        for tile in fp.tile(_TILE_SIZE, boundary_effect='shrink').flat:
+            origin, mapx, mapy = self._warp_maps(tile)
+
+            # Bounding box of the source pixels in the raster
+            valid = np.isfinite(mapx) & np.isfinite(mapy)
+            if not valid.any():
+                continue
+            x0, y0 = np.floor([mapx[valid].min(), mapy[valid].min()]).astype(int) + origin - margin
+            x1, y1 = np.ceil([mapx[valid].max(), mapy[valid].max()]).astype(int) + origin + margin
+            x0, y0 = max(x0, 0), max(y0, 0)
+            x1, y1 = min(x1 + 1, self.fp.rsizex), min(y1 + 1, self.fp.rsizey)
+            if x0 >= x1 or y0 >= y1:
+                continue
+
+            gt = self.fp.gt
+            gt[0], gt[3] = self.fp.affine * (x0, y0)
+            samplefp = Footprint(gt=gt, rsize=(x1 - x0, y1 - y0))
+            offset = (origin - [x0, y0]).astype('float32')
+            array[tile.slice_in(fp)] = self.remap_maps(
+                self.sample_bands(samplefp, band_ids),
+                np.where(valid, mapx + offset[0], -1),
+                np.where(valid, mapy + offset[1], -1),
+                src_nodata=self.nodata,
+                dst_nodata=dst_nodata,
+                interpolation=interpolation,
+            )
+        return array
+
+    def _warp_maps(self, fp):
+        """Compute the raster coordinates in `self.fp_stored` of the pixels of `fp`
+
+        Returns
+        -------
+        (origin, mapx, mapy)
+            with origin an array of 2 ints
+            with mapx and mapy float32 arrays of shape `fp.shape`, relative to `origin`
+        """
+        key = (
+            'warp', self.wkt_virtual, self.back_ds.wkt_work,
+            tuple(self.fp_stored.gt.tolist()), tuple(fp.gt.tolist()), tuple(fp.rsize.tolist()),
+        )
+        maps = MAPS_CACHE.get(key)
+        if maps is not None:
+            return maps
+
+        h, w = fp.shape
+        gridx = np.arange(max(2, -(-(w - 1) // _GRID_STEP) + 1)) * _GRID_STEP
+        gridy = np.arange(max(2, -(-(h - 1) // _GRID_STEP) + 1)) * _GRID_STEP
+        gridx, gridy = np.meshgrid(gridx, gridy)
+        xy = np.stack(fp.affine * (gridx, gridy), axis=-1).astype(np.float64)
+        xy = self.to_virtual(xy)
+        mapx, mapy = ~self.fp_stored.affine * (xy[..., 0], xy[..., 1])
+
+        mapx = _upsample(mapx, fp.shape)
+        mapy = _upsample(mapy, fp.shape)
+        valid = np.isfinite(mapx) & np.isfinite(mapy)
+        if valid.any():
+            origin = np.floor([mapx[valid].min(), mapy[valid].min()])
+        else:
+            origin = np.zeros(2)
+        maps = (
+            origin.astype(int),
+            (mapx - origin[0]).astype('float32'),
+            (mapy - origin[1]).astype('float32'),
+        )
+        MAPS_CACHE.put(key, maps)
+        return maps
+
+def _upsample(grid, shape):
+    """Bilinearly interpolate the values of `grid`, defined every `_GRID_STEP` pixels, to all the
+    pixels of an array of shape `shape`"""
+    def _indices(size, count):
+        x = np.arange(size) / _GRID_STEP
+        i = np.minimum(x.astype(int), count - 2)
+        return i, x - i
+
+    iy, ty = _indices(shape[0], grid.shape[0])
+    ix, tx = _indices(shape[1], grid.shape[1])
+    ty = ty[:, None]
+    rows = grid[iy] * (1 - ty) + grid[iy + 1] * ty
+    return rows[:, ix] * (1 - tx) + rows[:, ix + 1] * tx
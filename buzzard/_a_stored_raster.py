@@ -1,3 +1,5 @@
+import threading
+
 import numpy as np
 
 from buzzard import _tools
@@ -99,10 +101,43 @@ class AStoredRaster(AStored, AProxyRaster):
                 set(self._back.REMAP_INTERPOLATIONS.keys())
             ))
 
-        return self._back.set_data(
-            array=array,
+        with self._back.write_lock:
+            return self._back.set_data(
+                array=array,
+                fp=fp,
+                band_ids=band_ids,
+                interpolation=interpolation,
+                mask=mask,
+            )
+
+    def set_data_async(self, array, fp=None, band=1, interpolation='cv_area', mask=None):
+        """Schedule a `set_data` on the pool of threads of the DataSource
+        (see `Asynchronous reads and writes` in DataSource).
+
+        The parameters are the same as in `set_data`, the exceptions are raised by the `result`
+        method of the returned future. The writes to a raster are performed one at a time, `array`
+        should not be modified until the write is done.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            whose result is None
+
+        Example
+        -------
+        >>> futures = [
+        ...     dsm.set_data_async(predict(tile), fp=tile)
+        ...     for tile in dsm.fp.tile((512, 512)).flat
+        ... ]
+        >>> for future in futures:
+        ...     future.result()
+
+        """
+        return self._back.back_ds.async_executor.submit(
+            self.set_data,
+            array,
             fp=fp,
-            band_ids=band_ids,
+            band=band,
             interpolation=interpolation,
             mask=mask,
         )
@@ -139,14 +174,19 @@ class AStoredRaster(AStored, AProxyRaster):
 
         band_ids, _ = _tools.normalize_band_parameter(band, len(self), self.shared_band_id)
 
-        self._back.fill(
-            value=value,
-            band_ids=band_ids,
-        )
+        with self._back.write_lock:
+            self._back.fill(
+                value=value,
+                band_ids=band_ids,
+            )
 
 class ABackStoredRaster(ABackStored, ABackProxyRaster):
     """Implementation of AStoredRaster's specifications"""
 
+    def __init__(self, **kwargs):
+        super(ABackStoredRaster, self).__init__(**kwargs)
+        self.write_lock = threading.Lock()
+
     def set_data(self, array, fp, band_ids, interpolation, mask): # pragma: no cover
         raise NotImplementedError('ABackStoredRaster.set_data is virtual pure')
 
@@ -1,10 +1,14 @@
 """>>> help(buzz.DataSource)"""
 
 # pylint: disable=too-many-lines
+import os
 import ntpath
+import weakref
 import numbers
 import sys
 import itertools
+import collections
+import concurrent.futures
 
 from osgeo import osr
 import numpy as np
@@ -14,13 +18,16 @@ from buzzard._footprint import Footprint
 from buzzard import _tools
 from buzzard._datasource_back import BackDataSource
 from buzzard._a_proxy import AProxy
+from buzzard._a_proxy_raster import AProxyRaster
 from buzzard._gdal_file_raster import GDALFileRaster, BackGDALFileRaster
 from buzzard._gdal_file_vector import GDALFileVector, BackGDALFileVector
 from buzzard._gdal_mem_raster import GDALMemRaster
 from buzzard._gdal_memory_vector import GDALMemoryVector
 from buzzard._datasource_register import DataSourceRegisterMixin
 from buzzard._numpy_raster import NumpyRaster
+from buzzard._shared_numpy_raster import SharedNumpyRaster, BackSharedNumpyRaster
 from buzzard._a_pooled_emissary import APooledEmissary
+from buzzard._proxy_descriptor import ProxyDescriptor
 
 class DataSource(DataSourceRegisterMixin):
     """DataSource is a class that stores references to sources. A source is either a raster, or a
@@ -53,9 +60,26 @@ class DataSource(DataSourceRegisterMixin):
     allow_interpolation: bool
         Whether or not a raster geometry should raise an exception when remapping with interpolation
         is necessary.
+    warp_rasters: bool
+        Whether or not the rasters should be warped from their `sr_virtual` to `sr_work` when
+        reading them. Requires `allow_interpolation`.
+        (see `On the fly re-projections in buzzard` below)
     max_active: nbr >= 1
         Maximum number of pooled sources active at the same time.
         (see `Sources activation / deactivation` below)
+    block_cache_size: nbr >= 0
+        Maximum number of bytes of raster blocks kept in memory by the DataSource.
+        (see `Raster blocks cache` below)
+    max_read_workers: int >= 1
+        Maximum number of threads used to read a single raster window.
+        (see `Parallel reads` below)
+    max_async_workers: None or int >= 1
+        Maximum number of threads used to run the asynchronous reads and writes.
+        If None: the number of CPUs is used
+        (see `Asynchronous reads and writes` below)
+    write_queue_size: int >= 0
+        Maximum number of `set_data` queued per GDALFileRaster, 0 to write synchronously.
+        (see `Write-behind` below)
 
     Example
     -------
@@ -125,6 +149,74 @@ class DataSource(DataSourceRegisterMixin):
     ensure that no more than `max_activated` driver objects are active at the same time, by
     deactivating the LRU ones.
 
+    Raster blocks cache
+    -------------------
+    The `GDALFileRaster` sources may cache the pixels they read. When `block_cache_size` is greater
+    than 0, reading a window decodes the whole blocks (as defined by the file's native block size)
+    overlapping that window and keeps them in a cache shared by all the rasters of this
+    DataSource. The least recently used blocks are evicted when the cache grows larger than
+    `block_cache_size` bytes.
+
+    This is useful when reading overlapping windows, like the tiles of
+    `Footprint.tile(..., overlapx, overlapy)`, from compressed files. A write to a raster drops
+    all its cached blocks. See `DataSource.block_cache_info` to monitor the efficiency of the
+    cache.
+
+    Parallel reads
+    --------------
+    When `max_read_workers` is greater than 1, a `get_data` on a large window of a `GDALFileRaster`
+    is split into sub-windows aligned on the file's blocks. The sub-windows are read and remapped
+    by a pool of threads, each one using its own driver object, and are then assembled in the
+    output array. Since GDAL releases the GIL while decoding, this speeds up the reads of large
+    windows from compressed files. The number of threads is bounded by `max_active`, make sure
+    that enough driver objects are available if other threads are using the DataSource at the
+    same time.
+
+    Asynchronous reads and writes
+    -----------------------------
+    The `get_data_async` and `set_data_async` methods of the rasters schedule a `get_data` or a
+    `set_data` on a pool of threads of the DataSource and return a `concurrent.futures.Future`.
+    The number of threads is bounded by `max_async_workers` and by `max_active`. To use them from
+    an asyncio event loop, wrap the futures with `asyncio.wrap_future`.
+
+    >>> ds = buzz.DataSource(max_async_workers=8)
+    >>> rgb = ds.aopen_raster('path/to/rgb.tif')
+    >>> async def read(fp):
+    ...     return await asyncio.wrap_future(rgb.get_data_async(fp=fp, band=-1))
+
+    Write-behind
+    ------------
+    When `write_queue_size` is greater than 0, a `set_data` on a `GDALFileRaster` only copies its
+    inputs to a queue and returns, a background thread of the raster then performs the writes by
+    whole blocks of the file, each block being written once all its pixels were received.
+    `set_data` blocks while the queue is full. The writes are waited for on `flush`, `get_data`,
+    `fill`, `deactivate` and `close`. The exception raised by a failed write is raised back by the
+    next call to one of those methods or to `set_data`.
+
+    >>> ds = buzz.DataSource(write_queue_size=16)
+    >>> with ds.acreate_raster('path/to/out.tif', fp, 'float32', 1).close as out:
+    ...     for tile in fp.tile((512, 512)).flat:
+    ...         out.set_data(predict(tile), fp=tile)
+
+    Shared rasters
+    --------------
+    `create_shared_raster` allocates a raster in a shared memory block, that other processes can
+    attach with `attach_shared_raster` given the `name` of the raster. It is useful to share a
+    large intermediate product between the workers of a multi-process pipeline, without copies and
+    without temporary files.
+
+    >>> heatmap = ds.acreate_shared_raster(fp, 'float32', 1)
+    >>> ds2.aattach_shared_raster(heatmap.name, fp, 'float32', 1).set_data(arr, fp=tile)
+
+    Tiled processing
+    ----------------
+    `map_tiles` applies a function on the tiles of a Footprint using a pool of threads. Each tile
+    of the inputs is read with a margin of a few pixels (the halo), and only the central part of
+    the results is written to the outputs. With `pool='process'` the tiles are computed by a pool
+    of processes, the inputs are reopened in the workers from their `descriptor`.
+
+    >>> ds.map_tiles(compute_slopes, [dsm], slopes, tile_size=(1024, 1024), halo=1)
+
     On the fly re-projections in buzzard
     ------------------------------------
     A DataSource may perform spatial reference conversions on the fly, like a GIS does. Several
@@ -132,8 +224,15 @@ class DataSource(DataSourceRegisterMixin):
     read operations and write operations, all are performed by the OSR library.
 
     Those conversions are only perfomed on vector's data/metadata and raster's Footprints.
-    This implies that classic raster warping is not included (yet) in those conversions, only raster
-    shifting/scaling/rotation work.
+    This implies that by default classic raster warping is not included in those conversions, only
+    raster shifting/scaling/rotation work.
+
+    When `warp_rasters` is True, the `get_data` of a raster whose `sr_virtual` differs from
+    `sr_work` performs a true warping: the pixels of the requested Footprint are located in the
+    raster using a grid of points converted by OSR every 16 pixels, and interpolated in between.
+    The output is warped by tiles of 512x512 pixels whose maps are cached (see
+    `buzz.remap_cache_info`). The `fp` of such a raster is still the affine approximation of its
+    extent in `sr_work`, and `set_data` does not warp.
 
     The `z` coordinates of vectors geometries are also converted, on the other hand elevations are
     not converted in DEM rasters.
@@ -203,7 +302,12 @@ class DataSource(DataSourceRegisterMixin):
                  analyse_transformation=True,
                  allow_none_geometry=False,
                  allow_interpolation=False,
+                 warp_rasters=False,
                  max_active=np.inf,
+                 block_cache_size=0,
+                 max_read_workers=1,
+                 max_async_workers=None,
+                 write_queue_size=0,
                  **kwargs):
         sr_fallback, kwargs = deprecation_pool.streamline_with_kwargs(
             new_name='sr_fallback', old_names={'sr_implicit': '0.4.4'}, context='DataSource.__init__',
@@ -244,20 +348,53 @@ class DataSource(DataSourceRegisterMixin):
 
         if max_active < 1: # pragma: no cover
             raise ValueError('`max_active` should be greater than 1')
+        if block_cache_size < 0: # pragma: no cover
+            raise ValueError('`block_cache_size` should be greater than 0')
+        if max_read_workers < 1: # pragma: no cover
+            raise ValueError('`max_read_workers` should be greater than 1')
+        if max_async_workers is not None and max_async_workers < 1: # pragma: no cover
+            raise ValueError('`max_async_workers` should be None or greater than 1')
+        if write_queue_size < 0: # pragma: no cover
+            raise ValueError('`write_queue_size` should be greater than 0')
 
         allow_interpolation = bool(allow_interpolation)
+        warp_rasters = bool(warp_rasters)
+        if warp_rasters and not allow_interpolation: # pragma: no cover
+            raise ValueError('`warp_rasters` requires `allow_interpolation`')
         allow_none_geometry = bool(allow_none_geometry)
         analyse_transformation = bool(analyse_transformation)
 
+        # Parameters used to reopen the proxies of this DataSource in other processes
+        self._params = dict(
+            sr_work=sr_work,
+            sr_fallback=sr_fallback,
+            sr_forced=sr_forced,
+            analyse_transformation=analyse_transformation,
+            warp_rasters=warp_rasters,
+            allow_none_geometry=allow_none_geometry,
+            allow_interpolation=allow_interpolation,
+            max_active=max_active,
+            block_cache_size=block_cache_size,
+            max_read_workers=int(max_read_workers),
+            max_async_workers=max_async_workers,
+            write_queue_size=int(write_queue_size),
+        )
         self._back = BackDataSource(
             wkt_work=sr_work,
             wkt_fallback=sr_fallback,
             wkt_forced=sr_forced,
             analyse_transformation=analyse_transformation,
+            warp_rasters=warp_rasters,
             allow_none_geometry=allow_none_geometry,
             allow_interpolation=allow_interpolation,
             max_active=max_active,
+            block_cache_size=block_cache_size,
+            max_read_workers=int(max_read_workers),
+            max_async_workers=max_async_workers,
+            write_queue_size=int(write_queue_size),
         )
+        # The threads of the pools should not outlive the DataSource
+        weakref.finalize(self, self._back.shutdown_executors, wait=False)
         super(DataSource, self).__init__()
 
     # Raster entry points *********************************************************************** **
@@ -595,6 +732,152 @@ class DataSource(DataSourceRegisterMixin):
         self._register([], prox)
         return prox
 
+    def create_shared_raster(self, key, fp, dtype, band_count, band_schema=None, sr=None):
+        """Create a raster in a shared memory block and register it under `key` in this
+        DataSource. The pixels are initialized to 0.
+
+        The block can be attached by other processes with `attach_shared_raster`, given the `name`
+        of the raster, or by opening its `descriptor`. The workers of a multi-process pipeline can
+        then read and write the tiles of a large intermediate product without copies and without
+        temporary files. The block is freed when this raster is closed.
+
+        Parameters
+        ----------
+        key: hashable (like a string)
+            File identifier within DataSource
+        fp: Footprint
+            Description of the location and size of the raster to create.
+        dtype: numpy type (or any alias)
+        band_count: integer
+            number of bands
+        band_schema: dict or None
+            Band(s) metadata. (see `Band fields` in DataSource.create_raster)
+        sr: string or None
+            Spatial reference of the new raster (see DataSource.create_raster)
+
+        Returns
+        -------
+        SharedNumpyRaster
+
+        Example
+        -------
+        >>> ds.create_shared_raster('heatmap', ds.dem.fp, 'float32', 1)
+        >>> def worker(name, fp, tiles):
+        ...     ds = buzz.DataSource()
+        ...     heatmap = ds.aattach_shared_raster(name, fp, 'float32', 1)
+        ...     for tile in tiles:
+        ...         heatmap.set_data(compute_heatmap(tile), fp=tile)
+
+        """
+        # Parameter checking ***************************************************
+        self._validate_key(key)
+        prox = self._create_shared_raster(fp, dtype, band_count, band_schema, sr)
+
+        # DataSource Registering ***********************************************
+        self._register([key], prox)
+        return prox
+
+    def acreate_shared_raster(self, fp, dtype, band_count, band_schema=None, sr=None):
+        """Create a raster in a shared memory block anonymously in this DataSource.
+
+        See DataSource.create_shared_raster
+
+        Example
+        -------
+        >>> heatmap = ds.acreate_shared_raster(ds.dem.fp, 'float32', 1)
+        >>> block_name = heatmap.name
+
+        """
+        prox = self._create_shared_raster(fp, dtype, band_count, band_schema, sr)
+
+        # DataSource Registering ***********************************************
+        self._register([], prox)
+        return prox
+
+    def attach_shared_raster(self, key, name, fp, dtype, band_count, band_schema=None, sr=None,
+                             mode='w'):
+        """Attach a raster stored in a shared memory block by another process (see
+        `create_shared_raster`) and register it under `key` in this DataSource.
+
+        Parameters
+        ----------
+        key: hashable (like a string)
+            File identifier within DataSource
+        name: string
+            Name of the shared memory block (see `SharedNumpyRaster.name`)
+        fp, dtype, band_count, band_schema, sr
+            The parameters used to create the raster
+        mode: one of {'r', 'w'}
+
+        Returns
+        -------
+        SharedNumpyRaster
+
+        """
+        # Parameter checking ***************************************************
+        self._validate_key(key)
+        prox = self._attach_shared_raster(name, fp, dtype, band_count, band_schema, sr, mode)
+
+        # DataSource Registering ***********************************************
+        self._register([key], prox)
+        return prox
+
+    def aattach_shared_raster(self, name, fp, dtype, band_count, band_schema=None, sr=None,
+                              mode='w'):
+        """Attach a raster stored in a shared memory block by another process anonymously in this
+        DataSource.
+
+        See DataSource.attach_shared_raster
+        """
+        prox = self._attach_shared_raster(name, fp, dtype, band_count, band_schema, sr, mode)
+
+        # DataSource Registering ***********************************************
+        self._register([], prox)
+        return prox
+
+    def _create_shared_raster(self, fp, dtype, band_count, band_schema, sr):
+        if not isinstance(fp, Footprint): # pragma: no cover
+            raise TypeError('`fp` should be a Footprint')
+        dtype = np.dtype(dtype)
+        band_count = int(band_count)
+        shm = BackSharedNumpyRaster.create_block(fp.rarea * band_count * dtype.itemsize)
+        try:
+            return self._construct_shared_raster(
+                fp, shm, True, dtype, band_count, band_schema, sr, 'w'
+            )
+        except:
+            shm.close()
+            shm.unlink()
+            raise
+
+    def _attach_shared_raster(self, name, fp, dtype, band_count, band_schema, sr, mode):
+        if not isinstance(fp, Footprint): # pragma: no cover
+            raise TypeError('`fp` should be a Footprint')
+        dtype = np.dtype(dtype)
+        band_count = int(band_count)
+        _ = conv.of_of_mode(mode)
+        shm = BackSharedNumpyRaster.attach_block(str(name))
+        try:
+            return self._construct_shared_raster(
+                fp, shm, False, dtype, band_count, band_schema, sr, mode
+            )
+        except:
+            shm.close()
+            raise
+
+    def _construct_shared_raster(self, fp, shm, owner, dtype, band_count, band_schema, sr, mode):
+        # The parameters as provided are kept to attach the raster from other processes
+        fp_origin = fp
+        band_schema_origin = band_schema
+        band_schema = _tools.sanitize_band_schema(band_schema, band_count)
+        if sr is not None:
+            sr = osr.GetUserInputAsWKT(sr)
+            fp = self._back.convert_footprint(fp, sr)
+        return SharedNumpyRaster(
+            self, fp, fp_origin, shm, owner, dtype, band_count, band_schema, band_schema_origin,
+            sr, mode,
+        )
+
     # Vector entry points *********************************************************************** **
     def open_vector(self, key, path, layer=None, driver='ESRI Shapefile', options=(), mode='r'):
         """Open a vector file in this DataSource under `key`. Only metadata are kept in memory.
@@ -917,6 +1200,263 @@ class DataSource(DataSourceRegisterMixin):
             if prox.active:
                 prox.deactivate()
 
+    def shutdown_executors(self, wait=True):
+        """Shut down the pools of threads used by the parallel and asynchronous reads and writes
+        (see `Parallel reads` and `Asynchronous reads and writes` in DataSource). Called when the
+        DataSource is garbage collected.
+
+        The tasks already scheduled are performed, the pools are created again if needed.
+
+        Parameters
+        ----------
+        wait: bool
+            Whether to wait for the scheduled tasks to be performed before returning
+        """
+        self._back.shutdown_executors(wait=wait)
+
+
+    # Raster blocks cache ********************************************************************** **
+    def block_cache_info(self):
+        """Retrieve the statistics of the raster blocks cache
+
+        Returns
+        -------
+        CacheInfo
+            namedtuple of (hits, misses, maxsize, currsize)
+            with hits/misses the number of block lookups that succeeded/failed
+            with maxsize/currsize the maximum/current size of the cache in bytes
+
+        Example
+        -------
+        >>> ds = buzz.DataSource(block_cache_size=512 * 1024 ** 2)
+        >>> rgb = ds.aopen_raster('path/to/rgb.tif')
+        >>> for fp in rgb.fp.tile((512, 512), 128, 128).flat:
+        ...     arr = rgb.get_data(fp=fp, band=-1)
+        >>> ds.block_cache_info()
+        CacheInfo(hits=1156, misses=576, maxsize=536870912, currsize=201326592)
+        """
+        return self._back.block_cache_info()
+
+    def clear_block_cache(self):
+        """Drop all the raster blocks cached and reset the statistics"""
+        self._back.clear_block_cache()
+
+    # Raster overviews ************************************************************************** **
+    def build_overviews(self, factors, interpolation='cv_area', tile_size=(512, 512),
+                        max_workers=None, rasters=None):
+        """Build the overview levels of several GDAL file rasters, one raster after the other.
+        See `GDALFileRaster.build_overviews`.
+
+        This method is not thread-safe.
+
+        Parameters
+        ----------
+        factors: sequence of int
+            Downsampling factors of the levels to build (like `[2, 4, 8, 16]`)
+        interpolation: one of {'cv_area', 'cv_nearest', 'cv_linear', 'cv_cubic', 'cv_lanczos4'}
+            Resampling method
+        tile_size: (int, int)
+            Size of the tiles processed by the workers (in pixels)
+        max_workers: int or None
+            Number of threads. If None: the number of CPUs is used
+        rasters: None or sequence of (key or GDALFileRaster)
+            If None: all the GDAL file rasters of this DataSource
+
+        Example
+        -------
+        >>> ds = buzz.DataSource()
+        >>> ds.open_raster('dsm', 'path/to/dsm.tif', mode='w')
+        >>> ds.open_raster('rgb', 'path/to/rgb.tif', mode='w')
+        >>> ds.build_overviews([2, 4, 8, 16])
+
+        """
+        if rasters is None:
+            rasters = [
+                prox
+                for prox in self._keys_of_proxy.keys()
+                if isinstance(prox, GDALFileRaster)
+            ]
+        else:
+            rasters = [
+                prox if isinstance(prox, AProxy) else self[prox]
+                for prox in rasters
+            ]
+            for prox in rasters:
+                if not isinstance(prox, GDALFileRaster): # pragma: no cover
+                    raise TypeError('Overviews can only be built for GDAL file rasters')
+
+        for prox in rasters:
+            prox.build_overviews(
+                factors=factors,
+                interpolation=interpolation,
+                tile_size=tile_size,
+                max_workers=max_workers,
+            )
+
+    # Tiled processing ************************************************************************** **
+    def map_tiles(self, fn, inputs=(), output=None, tile_size=(512, 512), halo=0, fp=None,
+                  band=-1, interpolation='cv_area', order='row_major', pool='thread',
+                  workers=None, max_memory=None):
+        """Apply a function on the tiles of a Footprint. For each tile the `inputs` are read with a
+        margin of `halo` pixels, `fn` is called on those arrays and the part of its results that
+        lies within the tile is written to the `output` rasters.
+
+        The tiles are processed by a pool of threads or by a pool of processes. With a pool of
+        threads, the tiles are read and written by the workers, the `set_data` to a same output
+        raster are serialized. The `get_data` of a GDAL MEM raster are serialized too (and with its
+        `set_data`), since it is not thread-safe. With a pool of processes, the workers reopen the
+        inputs in mode 'r' from their `descriptor` (see `ProxyDescriptor`) and send the results
+        back to this process, where the outputs are written one tile after the other. An exception
+        raised by a worker cancels the remaining tiles and is raised back.
+
+        A pool of processes is useful when `fn` holds the GIL most of the time. In that case `fn`
+        should be picklable (like a function defined at the top level of a module), the inputs
+        should be GDAL file rasters or shared rasters, the GDAL file rasters opened in mode 'w' are
+        flushed to disk beforehand.
+
+        Parameters
+        ----------
+        fn: callable
+            Called as `fn(fp, *arrays)` for each tile, with `fp` the tile dilated by `halo` and
+            `arrays` the data of the `inputs` on `fp`, of shape (Y, X, B) if `band` is -1.
+            Should return one array for each `output`, of shape (Y, X) or (Y, X, B), covering
+            either the dilated tile or the tile only. If `output` is None, the results are
+            discarded.
+        inputs: sequence of (key or raster)
+            Rasters read for each tile
+        output: None or (key or raster) or sequence of (key or raster)
+            Rasters written for each tile. If a sequence, `fn` should return a tuple of arrays.
+        tile_size: (int, int)
+            Size of the tiles (in pixels), the tiles on the bottom and right edges may be smaller
+        halo: int
+            Number of pixels of margin read around each tile
+        fp: None or Footprint
+            Footprint to tile. If None: the Footprint of the first output raster.
+        band: band id or sequence of band id (see `get_data`)
+            Bands read from the inputs
+        interpolation: one of {'cv_area', 'cv_nearest', 'cv_linear', 'cv_cubic', 'cv_lanczos4'}
+            Resampling method used to read the inputs (see `get_data`)
+        order: {'row_major', 'column_major', 'z_order', 'hilbert'}
+            Order in which the tiles are scheduled (see `Footprint.iter_tile`)
+        pool: {'thread', 'process'}
+            Kind of workers
+        workers: int or None
+            Number of threads or processes. If None: the number of CPUs is used
+        max_memory: None or nbr
+            Maximum size in bytes of the arrays of the tiles being processed at the same time,
+            estimated from the bands read and written. If None: `2 * workers` tiles at most.
+
+        Example
+        -------
+        >>> ds = buzz.DataSource(allow_interpolation=True)
+        >>> dsm = ds.aopen_raster('path/to/dsm.tif')
+        >>> slopes = ds.acreate_raster('path/to/slopes.tif', dsm.fp, 'float32', 1)
+        >>> def compute_slopes(fp, arr):
+        ...     dy, dx = np.gradient(arr[..., 0], *fp.pxsize[::-1])
+        ...     return np.hypot(dx, dy)
+        >>> ds.map_tiles(compute_slopes, [dsm], slopes, tile_size=(1024, 1024), halo=1)
+
+        """
+        # Normalize and check parameters
+        def _proxy(prox):
+            if not isinstance(prox, AProxy):
+                prox = self[prox]
+            if not isinstance(prox, AProxyRaster): # pragma: no cover
+                raise TypeError('`{}` is not a raster'.format(prox))
+            return prox
+
+        inputs = [_proxy(prox) for prox in inputs]
+        if output is None:
+            outputs = []
+            multiple_outputs = False
+        elif isinstance(output, (list, tuple)):
+            outputs = [_proxy(prox) for prox in output]
+            multiple_outputs = True
+        else:
+            outputs = [_proxy(output)]
+            multiple_outputs = False
+        if fp is None:
+            if not outputs: # pragma: no cover
+                raise ValueError('`fp` should be provided when there is no output')
+            fp = outputs[0].fp
+        if not isinstance(fp, Footprint): # pragma: no cover
+            raise TypeError('`fp` should be a Footprint')
+        tile_size = np.asarray(tile_size, int).reshape(-1)
+        if tile_size.size != 2 or (tile_size <= 0).any(): # pragma: no cover
+            raise ValueError('`tile_size` should be a pair of positive int')
+        if not isinstance(halo, numbers.Integral) or halo < 0: # pragma: no cover
+            raise ValueError('`halo` should be a positive int')
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers < 1: # pragma: no cover
+            raise ValueError('`workers` should be None or greater than 0')
+        if pool == 'thread':
+            sources = inputs
+            executor = concurrent.futures.ThreadPoolExecutor(workers)
+        elif pool == 'process':
+            for prox in inputs:
+                if not isinstance(prox, (GDALFileRaster, SharedNumpyRaster)):
+                    raise TypeError(
+                        'Only GDAL file rasters and shared rasters can be read by a pool of '
+                        'processes'
+                    )
+                if isinstance(prox, GDALFileRaster) and prox.mode == 'w':
+                    prox.deactivate()
+            # The workers only read the inputs, a raster opened in mode 'w' is not reopened in
+            # mode 'w' by each worker
+            sources = [prox.descriptor.read_only() for prox in inputs]
+            executor = concurrent.futures.ProcessPoolExecutor(workers)
+        else: # pragma: no cover
+            raise ValueError('`pool` should be one of {"thread", "process"}')
+
+        # Bound the number of tiles in memory
+        max_in_flight = 2 * workers
+        if max_memory is not None:
+            tile_bytes = int(np.prod(tile_size + 2 * halo)) * (
+                sum(
+                    len(_tools.normalize_band_parameter(band, len(prox), prox.shared_band_id)[0]) *
+                    prox.dtype.itemsize
+                    for prox in inputs
+                ) +
+                sum(len(prox) * prox.dtype.itemsize for prox in outputs)
+            )
+            max_in_flight = int(max(1, min(max_in_flight, max_memory // max(tile_bytes, 1))))
+
+        def _write_tile(tile, arrays):
+            for prox, array in zip(outputs, arrays):
+                prox.set_data(array, fp=tile, band=-1)
+
+        def _process_tile(tile):
+            _write_tile(tile, _compute_tile(
+                fn, sources, tile, halo, band, interpolation, multiple_outputs, len(outputs)
+            ))
+
+        def _wait(tile, future):
+            arrays = future.result()
+            if pool == 'process':
+                _write_tile(tile, arrays)
+
+        tiles = fp.iter_tile(tile_size, boundary_effect='shrink', order=order)
+        futures = collections.deque()
+        with executor as ex:
+            try:
+                for tile in tiles:
+                    if len(futures) >= max_in_flight:
+                        _wait(*futures.popleft())
+                    if pool == 'thread':
+                        future = ex.submit(_process_tile, tile)
+                    else:
+                        future = ex.submit(
+                            _compute_tile,
+                            fn, sources, tile, halo, band, interpolation, multiple_outputs,
+                            len(outputs),
+                        )
+                    futures.append((tile, future))
+                while futures:
+                    _wait(*futures.popleft())
+            finally:
+                for _, future in futures:
+                    future.cancel()
 
     # Deprecation ******************************************************************************* **
     open_araster = deprecation_pool.wrap_method(
@@ -964,3 +1504,43 @@ def create_vector(*args, **kwargs):
 def wrap_numpy_raster(*args, **kwargs):
     """Shortcut for `DataSource().awrap_numpy_raster`"""
     return DataSource().awrap_numpy_raster(*args, **kwargs)
+
+def _compute_tile(fn, inputs, tile, halo, band, interpolation, multiple_outputs, output_count):
+    """Read the `inputs` around `tile`, call `fn` and crop its results to `tile`.
+    See DataSource.map_tiles.
+    The `inputs` are either rasters or their descriptors, to be run in another process.
+    """
+    inputs = [
+        prox.open() if isinstance(prox, ProxyDescriptor) else prox
+        for prox in inputs
+    ]
+    fp_halo = tile.dilate(halo) if halo else tile
+    arrays = [
+        _read_tile(prox, fp_halo, band, interpolation)
+        for prox in inputs
+    ]
+    results = fn(fp_halo, *arrays)
+    if output_count == 0:
+        return []
+    if not multiple_outputs:
+        results = (results,)
+    if len(results) != output_count: # pragma: no cover
+        raise ValueError('`fn` returned {} arrays instead of {}'.format(
+            len(results), output_count
+        ))
+    arrays = []
+    for array in results:
+        array = np.asarray(array)
+        if halo and array.shape[:2] == tuple(fp_halo.shape):
+            array = array[tile.slice_in(fp_halo)]
+        arrays.append(array)
+    return arrays
+
+def _read_tile(prox, fp, band, interpolation):
+    """Read `fp` from `prox`. The GDAL dataset of a GDAL MEM raster is shared by all the threads
+    and is not thread-safe, its reads are serialized with the lock of its writes.
+    """
+    if isinstance(prox, GDALMemRaster):
+        with prox._back.write_lock:
+            return prox.get_data(fp=fp, band=band, interpolation=interpolation)
+    return prox.get_data(fp=fp, band=band, interpolation=interpolation)
@@ -1,12 +1,16 @@
 from buzzard._datasource_back_conversions import BackDataSourceConversionsMixin
 from buzzard._datasource_back_activation_pool import BackDataSourceActivationPoolMixin
+from buzzard._datasource_back_block_cache import BackDataSourceBlockCacheMixin
+from buzzard._datasource_back_executors import BackDataSourceExecutorsMixin
 
-class BackDataSource(BackDataSourceConversionsMixin, BackDataSourceActivationPoolMixin):
+class BackDataSource(BackDataSourceConversionsMixin, BackDataSourceActivationPoolMixin,
+                     BackDataSourceBlockCacheMixin, BackDataSourceExecutorsMixin):
     """Backend of the DataSource, referenced by backend proxies
-    Implements activation (pooling) and conversion methods"""
+    Implements activation (pooling), blocks caching, pools of threads and conversion methods"""
 
-    def __init__(self, allow_none_geometry, allow_interpolation, **kwargs):
+    def __init__(self, allow_none_geometry, allow_interpolation, write_queue_size, **kwargs):
         self.allow_interpolation = allow_interpolation
         self.allow_none_geometry = allow_none_geometry
+        self.write_queue_size = write_queue_size
 
         super(BackDataSource, self).__init__(**kwargs)
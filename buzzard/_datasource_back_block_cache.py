@@ -0,0 +1,75 @@
+import collections
+import threading
+
+CacheInfo = collections.namedtuple('CacheInfo', 'hits, misses, maxsize, currsize')
+
+class BackDataSourceBlockCacheMixin(object):
+    """Private mixin for the DataSource class containing subroutines for the caching of raster
+    blocks.
+
+    A block is identified by a key of the form `(uid, band_id, overview_index, block_index)`, with
+    `overview_index` None for the full resolution. The cache is shared by all the rasters of a
+    DataSource, the least recently used blocks are evicted first when the byte budget is exceeded.
+    """
+
+    def __init__(self, block_cache_size, **kwargs):
+        self.block_cache_size = block_cache_size
+        self._bc_lock = threading.Lock()
+        self._bc_blocks = collections.OrderedDict()
+        self._bc_nbytes = 0
+        self._bc_hits = 0
+        self._bc_misses = 0
+        super(BackDataSourceBlockCacheMixin, self).__init__(**kwargs)
+
+    @property
+    def block_cache_enabled(self):
+        return self.block_cache_size > 0
+
+    def get_cached_block(self, key):
+        """Retrieve a block from the cache, return None on cache miss"""
+        with self._bc_lock:
+            block = self._bc_blocks.get(key)
+            if block is None:
+                self._bc_misses += 1
+            else:
+                self._bc_hits += 1
+                self._bc_blocks.move_to_end(key)
+            return block
+
+    def put_cached_block(self, key, block):
+        """Insert a block in the cache, evicting the least recently used blocks if necessary.
+        A block bigger than the whole budget is not inserted.
+        """
+        if block.nbytes > self.block_cache_size:
+            return
+        block.flags.writeable = False
+        with self._bc_lock:
+            old = self._bc_blocks.pop(key, None)
+            if old is not None:
+                self._bc_nbytes -= old.nbytes
+            while self._bc_nbytes + block.nbytes > self.block_cache_size:
+                _, evicted = self._bc_blocks.popitem(last=False)
+                self._bc_nbytes -= evicted.nbytes
+            self._bc_blocks[key] = block
+            self._bc_nbytes += block.nbytes
+
+    def evict_cached_blocks(self, uid):
+        """Drop all the blocks of a raster"""
+        with self._bc_lock:
+            keys = [key for key in self._bc_blocks.keys() if key[0] == uid]
+            for key in keys:
+                self._bc_nbytes -= self._bc_blocks.pop(key).nbytes
+
+    def clear_block_cache(self):
+        """Drop all the blocks and reset the counters"""
+        with self._bc_lock:
+            self._bc_blocks.clear()
+            self._bc_nbytes = 0
+            self._bc_hits = 0
+            self._bc_misses = 0
+
+    def block_cache_info(self):
+        with self._bc_lock:
+            return CacheInfo(
+                self._bc_hits, self._bc_misses, self.block_cache_size, self._bc_nbytes,
+            )
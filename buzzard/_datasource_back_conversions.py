@@ -8,7 +8,8 @@ class BackDataSourceConversionsMixin(object):
     """Private mixin for the DataSource class containing the spatial coordinates
     conversion subroutines"""
 
-    def __init__(self, wkt_work, wkt_fallback, wkt_forced, analyse_transformation, **kwargs):
+    def __init__(self, wkt_work, wkt_fallback, wkt_forced, analyse_transformation, warp_rasters,
+                 **kwargs):
 
         if wkt_work is not None:
             sr_work = osr.SpatialReference(wkt_work)
@@ -30,6 +31,7 @@ class BackDataSourceConversionsMixin(object):
         self.sr_fallback = sr_fallback
         self.sr_forced = sr_forced
         self.analyse_transformations = analyse_transformation
+        self.warp_rasters = warp_rasters
         super(BackDataSourceConversionsMixin, self).__init__(**kwargs)
 
     def get_transforms(self, sr_virtual, rect, rect_from='virtual'):
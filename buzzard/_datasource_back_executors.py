@@ -0,0 +1,60 @@
+import os
+import threading
+import concurrent.futures
+
+class BackDataSourceExecutorsMixin(object):
+    """Private mixin for the DataSource class containing the pools of threads used by the
+    rasters.
+
+    The pools are created on first use, the number of threads of a pool is bounded by
+    `max_active` since each thread may hold a driver object. The pools are shut down by
+    `shutdown_executors`, and created again if used afterwards.
+    """
+
+    def __init__(self, max_read_workers, max_async_workers, **kwargs):
+        self.max_read_workers = max_read_workers
+        self.max_async_workers = max_async_workers
+        self._ex_lock = threading.Lock()
+        self._read_executor = None
+        self._async_executor = None
+        super(BackDataSourceExecutorsMixin, self).__init__(**kwargs)
+
+    @property
+    def read_workers(self):
+        """Number of threads used to read a single window"""
+        return int(min(self.max_read_workers, self.max_active))
+
+    @property
+    def read_executor(self):
+        """Pool of threads used to read the parts of a large window in parallel"""
+        with self._ex_lock:
+            if self._read_executor is None:
+                self._read_executor = concurrent.futures.ThreadPoolExecutor(self.read_workers)
+            return self._read_executor
+
+    @property
+    def async_workers(self):
+        """Number of threads used to run the asynchronous reads and writes"""
+        if self.max_async_workers is None:
+            count = os.cpu_count() or 1
+        else:
+            count = self.max_async_workers
+        return int(min(count, self.max_active))
+
+    @property
+    def async_executor(self):
+        """Pool of threads used to run the asynchronous reads and writes"""
+        with self._ex_lock:
+            if self._async_executor is None:
+                self._async_executor = concurrent.futures.ThreadPoolExecutor(self.async_workers)
+            return self._async_executor
+
+    def shutdown_executors(self, wait=True):
+        """Shut down the pools of threads created, the tasks already scheduled are performed"""
+        with self._ex_lock:
+            executors = [self._read_executor, self._async_executor]
+            self._read_executor = None
+            self._async_executor = None
+        for ex in executors:
+            if ex is not None:
+                ex.shutdown(wait=wait)
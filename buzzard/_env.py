@@ -60,6 +60,18 @@ def _sanitize_significant(val):
         raise ValueError('Significant should be greater than 0')
     return val
 
+def _sanitize_nbytes(val):
+    val = int(val)
+    if val < 0:
+        raise ValueError('A number of bytes should be greater than or equal to 0')
+    return val
+
+def _sanitize_workers(val):
+    val = int(val)
+    if val <= 0:
+        raise ValueError('A number of workers should be greater than 0')
+    return val
+
 # Set up **************************************************************************************** **
 def _set_up_osgeo_use_exception(new, _):
     if new:
@@ -102,6 +114,9 @@ _OPTIONS = {
     'default_index_dtype': _EnvOption(_sanitize_index_dtype, None, 'int32'),
     'warnings': _EnvOption(bool, None, True),
     'allow_complex_footprint': _EnvOption(bool, None, False),
+    'remap_cache_size': _EnvOption(_sanitize_nbytes, None, 64 * 1024 ** 2),
+    'remap_memory_budget': _EnvOption(_sanitize_nbytes, None, 256 * 1024 ** 2),
+    'remap_workers': _EnvOption(_sanitize_workers, None, 1),
 
     '_osgeo_use_exceptions': _EnvOption(bool, _set_up_osgeo_use_exception, gdal.GetUseExceptions()),
     # '_gdal_trust_buzzard': _EnvOption(bool, _set_up_buzz_trusted, False),
@@ -172,6 +187,17 @@ class Env(object):
         Initialized to `False`
     warnings: bool
         Initialized to `True`
+    remap_cache_size: int
+        Maximum number of bytes of remapping maps cached when resampling rasters, 0 to disable
+        the cache (see `buzz.remap_cache_info`)
+        Initialized to `64 * 1024 ** 2`
+    remap_memory_budget: int
+        Approximate maximum number of bytes of the temporary arrays allocated when resampling a
+        raster, 0 for no limit. Above this limit the output is resampled by strips of rows.
+        Initialized to `256 * 1024 ** 2`
+    remap_workers: int
+        Number of threads resampling the strips of rows of an output in parallel
+        Initialized to `1`
 
     Example
     -------
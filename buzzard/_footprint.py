@@ -5,7 +5,11 @@
 from __future__ import division, print_function
 import logging
 import itertools
+import functools
 import numbers
+import math
+import threading
+import weakref
 
 import shapely
 import shapely.geometry as sg
@@ -84,7 +88,10 @@ class Footprint(TileMixin, IntersectionMixin):
     >>> dx, rx, tlx, ry, dy, tly = fp.aff6
     """
 
-    __slots__ = ['_tl', '_bl', '_br', '_tr', '_aff', '_rsize', '_significant_min']
+    __slots__ = [
+        '_aff', '_rsize', '_corners', '_significant_min_cache', '_intern_key_cache',
+        '_abstract_grid_density_cache',
+    ]
 
     # Footprint construction ******************************************************************** **
     # Footprint construction - from scratch ***************************************************** **
@@ -146,6 +153,20 @@ class Footprint(TileMixin, IntersectionMixin):
         if kwargs:
             raise ValueError('Unknown parameters [{}]'.format(kwargs.keys()))
 
+        aff = affine.Affine(a, b, c, d, e, f)
+        self._check_affine(aff)
+
+        self._aff = aff
+        self._rsize = np.asarray(rsize, dtype=env.default_index_dtype)
+        self._corners = None
+        self._significant_min_cache = None
+        self._intern_key_cache = None
+        self._abstract_grid_density_cache = None
+
+    @staticmethod
+    def _check_affine(aff):
+        """Check that an affine matrix can be used to build a Footprint given `buzz.env`"""
+        a, b, c, d, e, f = aff[:6]
         if a * e - d * b == 0:
             raise ValueError('Determinent should not be 0: {}'.format(
                 a * e - d * b
@@ -168,25 +189,70 @@ class Footprint(TileMixin, IntersectionMixin):
                     'affine matrix:{}'
                 ).format(arr))
 
-        rsizex, rsizey = rsize
-        aff = affine.Affine(a, b, c, d, e, f)
-
-        self._tl = c, f
-        self._bl = aff * (0, rsizey)
-        self._br = aff * (rsizex, rsizey)
-        self._tr = aff * (rsizex, 0)
+    @classmethod
+    def _of_trusted(cls, aff, rsize):
+        """Construct a Footprint from an `affine.Affine` and a `rsize` that are known to be valid,
+        skipping the checks of `__init__`. Used by the methods that derive Footprints from a valid
+        Footprint (see `_check_affine` to validate a new orientation).
+        """
+        self = object.__new__(cls)
         self._aff = aff
-        self._rsize = rsize
+        self._rsize = np.asarray(rsize, dtype=env.default_index_dtype)
+        self._corners = None
+        self._significant_min_cache = None
+        self._intern_key_cache = None
+        self._abstract_grid_density_cache = None
+        return self
+
+    @property
+    def _tl(self):
+        return self._get_corners()[0]
 
-        self._tl = np.asarray(self._tl, dtype=np.float64)
-        self._bl = np.asarray(self._bl, dtype=np.float64)
-        self._br = np.asarray(self._br, dtype=np.float64)
-        self._tr = np.asarray(self._tr, dtype=np.float64)
-        self._rsize = np.asarray(self._rsize, dtype=env.default_index_dtype)
+    @property
+    def _bl(self):
+        return self._get_corners()[1]
+
+    @property
+    def _br(self):
+        return self._get_corners()[2]
+
+    @property
+    def _tr(self):
+        return self._get_corners()[3]
+
+    def _get_corners(self):
+        """Compute lazily the spatial coordinates of the 4 corners (tl, bl, br, tr)"""
+        if self._corners is None:
+            aff = self._aff
+            rsizex, rsizey = self._rsize.tolist()
+            self._corners = np.asarray([
+                (aff.c, aff.f),
+                aff * (0, rsizey),
+                aff * (rsizex, rsizey),
+                aff * (rsizex, 0),
+            ], dtype=np.float64)
+        return self._corners
+
+    @property
+    def _axis_aligned(self):
+        """Are the edges of `self` parallel to the spatial axes"""
+        aff = self._aff
+        return aff.b == 0 and aff.d == 0
 
-        rect = _tools.Rect(*self.coords)
-        self._significant_min = rect.significant_min((rect.size / self._rsize).min())
+    def _fast_bounds(self):
+        """Compute the bounds (`min` then `max`) as python floats, assuming `self._axis_aligned`"""
+        (tlx, tly), _, (brx, bry), _ = self._get_corners().tolist()
+        return min(tlx, brx), min(tly, bry), max(tlx, brx), max(tly, bry)
 
+    @property
+    def _significant_min(self):
+        """Compute lazily the minimum number of significant digits required to handle `self`"""
+        if self._significant_min_cache is None:
+            rect = _tools.Rect(*self.coords)
+            self._significant_min_cache = rect.significant_min(
+                (rect.size / self._rsize).min()
+            )
+        return self._significant_min_cache
 
     # Footprint construction - from Footprint *************************************************** **
     def __and__(self, other):
@@ -269,25 +335,22 @@ class Footprint(TileMixin, IntersectionMixin):
         startx, endx, _ = slice(startx, endx).indices(self.rsizex)
         starty, endy, _ = slice(starty, endy).indices(self.rsizey)
 
-        rsize = np.asarray(
-            [endx - startx, endy - starty]
-        )
-        tl = self.tl + [startx, starty] * self.pxvec
-        size = rsize * self.pxsize
-        gt = self.gt
-        gt[0] = tl[0]
-        gt[3] = tl[1]
-
-        return self.__class__(
-            gt=gt,
-            rsize=rsize,
+        rsize = (endx - startx, endy - starty)
+        if rsize[0] <= 0 or rsize[1] <= 0:
+            raise ValueError('Invalid rsize value `%s`' % (rsize,))
+
+        return self._of_trusted(
+            self._aff * affine.Affine.translation(startx, starty),
+            rsize,
         )
 
     def _morpho(self, scount):
-        aff = self._aff * affine.Affine.translation(-scount, -scount)
-        return Footprint(
-            gt=aff.to_gdal(),
-            rsize=(self.rsize + 2 * scount),
+        rsize = self.rsize + 2 * scount
+        if (rsize <= 0).any():
+            raise ValueError('Invalid rsize value `%s`' % rsize)
+        return self._of_trusted(
+            self._aff * affine.Affine.translation(-scount, -scount),
+            rsize,
         )
 
     def erode(self, count):
@@ -489,10 +552,8 @@ class Footprint(TileMixin, IntersectionMixin):
             affine.Affine.rotation(angle) *
             affine.Affine.scale(*scale)
         )
-        return self.__class__(
-            gt=aff.to_gdal(),
-            rsize=self.rsize,
-        )
+        self._check_affine(aff)
+        return self._of_trusted(aff, self.rsize)
 
     # Export ************************************************************************************ **
     @property
@@ -1056,10 +1117,27 @@ class Footprint(TileMixin, IntersectionMixin):
         -------
         bool
         """
+        if isinstance(other, sg.base.BaseGeometry):
+            a = self.poly
+            return not a.disjoint(other) and not a.touches(other)
+        if self._axis_aligned and other._axis_aligned:
+            # Two rectangles with edges parallel to the axes: compare the bounds directly, they are
+            # computed from the same corners as `poly`.
+            aminx, aminy, amaxx, amaxy = self._fast_bounds()
+            bminx, bminy, bmaxx, bmaxy = other._fast_bounds()
+            return aminx < bmaxx and bminx < amaxx and aminy < bmaxy and bminy < amaxy
         a = self.poly
         b = other.poly
         return not a.disjoint(b) and not a.touches(b)
 
+    def _poly_contains(self, other):
+        """Binary predicate: Does `self.poly` contain `other.poly`"""
+        if self._axis_aligned and other._axis_aligned:
+            aminx, aminy, amaxx, amaxy = self._fast_bounds()
+            bminx, bminy, bmaxx, bmaxy = other._fast_bounds()
+            return aminx <= bminx and bmaxx <= amaxx and aminy <= bminy and bmaxy <= amaxy
+        return self.poly.contains(other.poly)
+
     def equals(self, other):
         """Binary predicate: Is other Footprint equal to self
 
@@ -1079,12 +1157,18 @@ class Footprint(TileMixin, IntersectionMixin):
             raise RuntimeError('`env.significant` of value {} should be at least {}'.format(
                 env.significant, other._significant_min,
             ))
-        if (self.rsize != other.rsize).any():
+        if self._rsize.tolist() != other._rsize.tolist():
             return False
 
-        largest_coord = np.abs(np.r_[self.coords, other.coords]).max()
+        scoords = self._get_corners().tolist()
+        ocoords = other._get_corners().tolist()
+        largest_coord = max(abs(v) for pt in scoords + ocoords for v in pt)
         spatial_precision = largest_coord * 10 ** -env.significant
-        return (np.abs(self.coords - other.coords) < spatial_precision).all()
+        return all(
+            abs(sv - ov) < spatial_precision
+            for spt, opt in zip(scoords, ocoords)
+            for sv, ov in zip(spt, opt)
+        )
 
     def same_grid(self, other):
         """Binary predicate: Does other Footprint lie on the same grid as self
@@ -1105,28 +1189,91 @@ class Footprint(TileMixin, IntersectionMixin):
             raise RuntimeError('`env.significant` of value {} should be at least {}'.format(
                 env.significant, other._significant_min,
             ))
-        largest_coord = np.abs(np.r_[self.coords, other.coords]).max()
+        # This predicate is evaluated on every raster read and write, it is computed with python
+        # floats to avoid the overhead of numpy on such small vectors.
+        scoords = self._get_corners().tolist()
+        ocoords = other._get_corners().tolist()
+        largest_coord = max(abs(v) for pt in scoords + ocoords for v in pt)
         spatial_precision = largest_coord * 10 ** -env.significant
 
-        rdx, rdy = np.around(~self.affine * other.tl)
-        errors = other.tl - (self.pxtbvec * rdy + self.pxlrvec * rdx) - self.tl
-        if (np.abs(errors) >= spatial_precision).any():
+        (stlx, stly), (sblx, sbly), _, (strx, stry) = scoords
+        (otlx, otly), (oblx, obly), _, (otrx, otry) = ocoords
+        srw, srh = self._rsize.tolist()
+        orw, orh = other._rsize.tolist()
+        spxtbx, spxtby = (sblx - stlx) / srh, (sbly - stly) / srh
+        spxlrx, spxlry = (strx - stlx) / srw, (stry - stly) / srw
+        opxtbx, opxtby = (oblx - otlx) / orh, (obly - otly) / orh
+        opxlrx, opxlry = (otrx - otlx) / orw, (otry - otly) / orw
+
+        def _far(errx, erry):
+            return abs(errx) >= spatial_precision or abs(erry) >= spatial_precision
+
+        rdx, rdy = (round(v) for v in ~self._aff * (otlx, otly))
+        if _far(otlx - (spxtbx * rdy + spxlrx * rdx) - stlx,
+                otly - (spxtby * rdy + spxlry * rdx) - stly):
             return False
 
-        errors = self.tl + other.pxtbvec * self.rheight - self.bl
-        if (np.abs(errors) >= spatial_precision).any():
+        if _far(stlx + opxtbx * srh - sblx, stly + opxtby * srh - sbly):
             return False
-        errors = self.tl + other.pxlrvec * self.rwidth - self.tr
-        if (np.abs(errors) >= spatial_precision).any():
+        if _far(stlx + opxlrx * srw - strx, stly + opxlry * srw - stry):
             return False
-        errors = other.tl + self.pxtbvec * other.rheight - other.bl
-        if (np.abs(errors) >= spatial_precision).any():
+        if _far(otlx + spxtbx * orh - oblx, otly + spxtby * orh - obly):
             return False
-        errors = other.tl + self.pxlrvec * other.rwidth - other.tr
-        if (np.abs(errors) >= spatial_precision).any():
+        if _far(otlx + spxlrx * orw - otrx, otly + spxlry * orw - otry):
             return False
         return True
 
+    # Hashing *********************************************************************************** **
+    def __hash__(self):
+        """Hash compatible with `equals`: Footprints that are equal under `env.significant` share
+        the same hash.
+
+        Only the raster size is hashed, it is the only attribute that `equals` compares exactly,
+        the coordinates are compared with a tolerance. Use `intern` to get cheap dict keys out of
+        many Footprints of the same size.
+        """
+        return hash(tuple(self._rsize.tolist()))
+
+    def _get_intern_key(self):
+        """Compute lazily the key of `self` in the intern table"""
+        if self._intern_key_cache is None:
+            quantum = 2. ** math.floor(_intern_quantum_exponent(self)[0])
+            (tlx, tly), _, (brx, bry), _ = self._get_corners().tolist()
+            self._intern_key_cache = tuple(self._rsize.tolist()) + tuple(
+                int(math.floor(v / quantum))
+                for v in (tlx, tly, brx, bry)
+            )
+        return self._intern_key_cache
+
+    def intern(self):
+        """Get the interned Footprint equal to self, self is interned if there is none
+
+        Interning the Footprints of a pipeline makes the equal ones the same object, they can then
+        be used as cheap dict keys to memoize per-Footprint work. The intern table is shared by all
+        threads and only holds weak references to the Footprints.
+
+        Returns
+        -------
+        Footprint
+
+        Example
+        -------
+        >>> tiles = [tile.intern() for tile in fp.tile((512, 512)).flat]
+        >>> fp.clip(0, 0, 512, 512).intern() is tiles[0]
+        True
+        """
+        key = self._get_intern_key()
+        with _INTERN_LOCK:
+            for candidate_key in _intern_candidate_keys(self, key):
+                for ref in list(_INTERN_TABLE.get(candidate_key, ())):
+                    fp = ref()
+                    if fp is not None and fp.equals(self):
+                        return fp
+            refs = _INTERN_TABLE.setdefault(key, [])
+            refs[:] = [ref for ref in refs if ref() is not None]
+            refs.append(weakref.ref(self, functools.partial(_intern_table_discard, key)))
+        return self
+
     # Numpy ************************************************************************************* **
     @property
     def shape(self):
@@ -1242,7 +1389,7 @@ class Footprint(TileMixin, IntersectionMixin):
         return slice(starty, endy), slice(startx, endx)
 
     # Coordinates conversions ******************************************************************* **
-    def spatial_to_raster(self, xy, dtype=None, op=np.floor):
+    def spatial_to_raster(self, xy, dtype=None, op=np.floor, out=None):
         """Convert xy spatial coordinates to raster xy indices
 
         Parameters
@@ -1251,10 +1398,14 @@ class Footprint(TileMixin, IntersectionMixin):
             Spatial coordinates
         dtype: None or convertible to np.dtype
             Output dtype
-            If None: Use buzz.env.default_index_dtype
+            If None: Use `out.dtype` if provided, else buzz.env.default_index_dtype
         op: None or vectorized function
             Function to apply before casting output to dtype
             If None: Do not transform data before casting
+        out: None or np.ndarray
+            Output array
+            If None: A new array is allocated
+            Else: An array of shape np.asarray(xy).shape to write to, can be `xy` itself
 
         Returns
         -------
@@ -1263,6 +1414,8 @@ class Footprint(TileMixin, IntersectionMixin):
             with shape = np.asarray(xy).shape
             with dtype = dtype
 
+        Large arrays are converted by chunks, using a fixed amount of float64 workspace.
+
         Prototype inspired from
         https://mapbox.github.io/rasterio/api/rasterio.io.html#rasterio.io.TransformMethodsMixin.index
         """
@@ -1271,70 +1424,81 @@ class Footprint(TileMixin, IntersectionMixin):
         if xy.shape[-1] != 2:
             raise ValueError('An array of shape (..., 2) was expected') # pragma: no cover
 
-        # Check dtype parameter
-        if dtype is None:
-            dtype = env.default_index_dtype
-        else:
+        # Check dtype and out parameters
+        if dtype is not None:
             dtype = conv.dtype_of_any_downcast(dtype)
+        out = _check_conversion_out(out, xy.shape, dtype, env.default_index_dtype)
+        dtype = out.dtype
 
         # Check op parameter
         if not isinstance(np.zeros(1, dtype=dtype)[0], numbers.Integral):
             op = None
 
-
-        if env.significant <= self._significant_min:
-            raise RuntimeError('`env.significant` of value {} should be at least {}'.format(
-                env.significant, self._significant_min,
-            ))
-        largest_coord = np.abs(self.coords).max()
-        spatial_precision = largest_coord * 10 ** -env.significant
-        smallest_reso = self.pxsize.min()
-        pixel_precision = spatial_precision / smallest_reso
-        abstract_grid_density = np.floor(1 / pixel_precision)
-
-        workshape = int(xy.size / 2), 2
-        xy2 = np.empty(workshape, 'float64')
-        xy2[:, :] = xy.reshape(workshape)
+        abstract_grid_density = self._get_abstract_grid_density()
         aff = ~self._aff
-        xy2[:, 0], xy2[:, 1] = (
-            xy2[:, 0] * aff.a + xy2[:, 1] * aff.b + aff.c,
-            xy2[:, 0] * aff.d + xy2[:, 1] * aff.e + aff.f,
-        )
-        xy2 = np.around(xy2 * abstract_grid_density, 0) / abstract_grid_density # Should move this line in if?
-        if op is not None:
-            xy2 = op(xy2)
-        return xy2.astype(dtype).reshape(xy.shape)
 
-    def raster_to_spatial(self, xy):
+        def _convert(xy2):
+            xy2 = _apply_affine(aff, xy2)
+            xy2 *= abstract_grid_density
+            np.around(xy2, 0, out=xy2)
+            xy2 /= abstract_grid_density
+            if isinstance(op, np.ufunc):
+                op(xy2, out=xy2)
+            elif op is not None:
+                xy2 = op(xy2)
+            return xy2
+
+        _convert_by_chunks(xy, out, _convert)
+        return out
+
+    def raster_to_spatial(self, xy, out=None):
         """Convert xy raster coordinates to spatial coordinates
 
         Parameters
         ----------
         xy: sequence of numbers of shape (..., 2)
            Raster coordinages
+        out: None or np.ndarray
+            Output array
+            If None: A new float64 array is allocated
+            Else: An array of shape np.asarray(xy).shape to write to, can be `xy` itself
 
         Returns
         -------
         out_xy: np.ndarray
             Spatial coordinates
             with shape = np.asarray(xy).shape
-            with dtype = dtype
+            with dtype = float64, or `out.dtype`
 
+        Large arrays are converted by chunks, using a fixed amount of float64 workspace.
         """
         # Check xy parameter
         xy = np.asarray(xy)
         if xy.shape[-1] != 2:
             raise ValueError('An array of shape (..., 2) was expected') # pragma: no cover
 
-        workshape = int(xy.size / 2), 2
-        xy2 = np.empty(workshape, 'float64')
-        xy2[:, :] = xy.reshape(workshape)
+        out = _check_conversion_out(out, xy.shape, None, 'float64')
         aff = self._aff
-        xy2[:, 0], xy2[:, 1] = (
-            xy2[:, 0] * aff.a + xy2[:, 1] * aff.b + aff.c,
-            xy2[:, 0] * aff.d + xy2[:, 1] * aff.e + aff.f,
-        )
-        return xy2.reshape(xy.shape)
+        _convert_by_chunks(xy, out, lambda xy2: _apply_affine(aff, xy2))
+        return out
+
+    def _get_abstract_grid_density(self):
+        """Compute lazily the density of the grid on which `spatial_to_raster` rounds the raster
+        coordinates, given the current `env.significant`
+        """
+        significant = env.significant
+        if self._abstract_grid_density_cache is None or (
+                self._abstract_grid_density_cache[0] != significant):
+            if significant <= self._significant_min:
+                raise RuntimeError('`env.significant` of value {} should be at least {}'.format(
+                    significant, self._significant_min,
+                ))
+            largest_coord = np.abs(self.coords).max()
+            spatial_precision = largest_coord * 10 ** -significant
+            smallest_reso = self.pxsize.min()
+            pixel_precision = spatial_precision / smallest_reso
+            self._abstract_grid_density_cache = significant, np.floor(1 / pixel_precision)
+        return self._abstract_grid_density_cache[1]
 
     # Geometry / Raster conversions ************************************************************* **
     def find_lines(self, arr, output_offset='middle', merge=True):
@@ -1738,7 +1902,7 @@ class Footprint(TileMixin, IntersectionMixin):
 
     # Tiling ************************************************************************************ **
     def tile(self, size, overlapx=0, overlapy=0,
-             boundary_effect='extend', boundary_effect_locus='br'):
+             boundary_effect='extend', boundary_effect_locus='br', as_footprint_array=False):
         """Tile a Footprint to a matrix of Footprint
 
         Parameters
@@ -1787,43 +1951,25 @@ class Footprint(TileMixin, IntersectionMixin):
                 bottom right coordinates are preserved
             'bl' : Boundary effect occurs at the bottom left corner of the raster,
                 top right coordinates are preserved
+        as_footprint_array : bool, optional
+            If True, return a FootprintArray instead of a np.ndarray of Footprint. Building the
+            FootprintArray is vectorized, the Footprint objects are only built on element access.
 
         Returns
         -------
-        np.ndarray
+        np.ndarray or FootprintArray
             of dtype=object (Footprint)
             of shape (M, N)
                 with M the line count
                 with N the column count
         """
-        size = np.asarray(size, dtype=int)
-        overlapx = int(overlapx)
-        overlapy = int(overlapy)
-
-        if size.shape != (2,):
-            raise ValueError('size.shape(%s) should be (2,)' % str(size.shape))
-        if (size <= 0).any():
-            raise ValueError('size(%s) values should satisfy value > 0' % str(tuple(size)))
-        if not 0 <= overlapx < size[0]:
-            raise ValueError('overlapx(%d) should satisfy 0 <= overlapx < size[0](%d)' % (
-                overlapx, size[0]
-            ))
-        if not 0 <= overlapy < size[1]:
-            raise ValueError('overlapy(%d) should satisfy 0 <= overlapy < size[1](%d)' % (
-                overlapy, size[1]
-            ))
-        if boundary_effect not in self._TILE_BOUNDARY_EFFECTS:
-            raise ValueError('boundary_effect(%s) should be one of %s' % (
-                boundary_effect, self._TILE_BOUNDARY_EFFECTS
-            ))
-        if boundary_effect_locus not in self._TILE_BOUNDARY_EFFECT_LOCI:
-            raise ValueError('boundary_effect_locus(%s) should be one of %s' % (
-                boundary_effect_locus, self._TILE_BOUNDARY_EFFECT_LOCI
-            ))
-        return self._tile_unsafe(size, overlapx, overlapy, boundary_effect, boundary_effect_locus)
+        infoxs, infoys = self._tile_grid(
+            size, overlapx, overlapy, boundary_effect, boundary_effect_locus
+        )
+        return self._tiles_of_grid(infoxs, infoys, boundary_effect_locus, as_footprint_array)
 
     def tile_count(self, rowcount, colcount, overlapx=0, overlapy=0,
-                   boundary_effect='extend', boundary_effect_locus='br'):
+                   boundary_effect='extend', boundary_effect_locus='br', as_footprint_array=False):
         """Tile a Footprint to a matrix of Footprint
 
         Parameters
@@ -1874,15 +2020,209 @@ class Footprint(TileMixin, IntersectionMixin):
                 bottom right coordinates are preserved
             'bl' : Boundary effect occurs at the bottom left corner of the raster,
                 top right coordinates are preserved
+        as_footprint_array : bool, optional
+            If True, return a FootprintArray instead of a np.ndarray of Footprint. Building the
+            FootprintArray is vectorized, the Footprint objects are only built on element access.
 
         Returns
         -------
-        np.ndarray
+        np.ndarray or FootprintArray
+            of dtype=object (Footprint)
+            of shape (M, N)
+                with M the line count
+                with N the column count
+        """
+        infoxs, infoys = self._tile_count_grid(
+            rowcount, colcount, overlapx, overlapy, boundary_effect, boundary_effect_locus
+        )
+        return self._tiles_of_grid(infoxs, infoys, boundary_effect_locus, as_footprint_array)
+
+    def tile_occurrence(self, size, pixel_occurrencex, pixel_occurrencey,
+                        boundary_effect='extend', boundary_effect_locus='br',
+                        as_footprint_array=False):
+        """Tile a Footprint to a matrix of Footprint
+        Each pixel occur `pixel_occurrencex * pixel_occurrencey` times overall in the output
+
+        Parameters
+        ----------
+        size : (int, int)
+            Tile width and tile height, in pixel
+        pixel_occurrencex: int
+            Number of occurence of each pixel in a line of tile
+        pixel_occurrencey: int
+            Number of occurence of each pixel in a column of tile
+        boundary_effect : {'extend', 'exclude', 'overlap', 'shrink', 'exception'}, optional
+            Behevior at boundary effect locus
+            'extend'
+                Preserve tile size
+                Preserve overlapx and overlapy
+                Sacrifice global bounds
+                    Results in tiles partially outside bounds at locus (if necessary)
+                Preserve tile count
+                Preserve boundary pixels coverage
+            'overlap'
+                Preserve tile size
+                Sacrifice overlapx and overlapy
+                    Results in tiles overlapping more at locus (if necessary)
+                Preserve global bounds
+                Preserve tile count
+                Preserve boundary pixels coverage
+            'exclude'
+                Preserve tile size
+                Preserve overlapx and overlapy
+                Preserve global bounds
+                Sacrifice tile count, results in tiles excluded at locus (if necessary)
+                Sacrifice boundary pixels coverage at locus (if necessary)
+            'shrink'
+                Sacrifice tile size, results in tiles shrinked at locus (if necessary)
+                Preserve overlapx and overlapy
+                Preserve global bounds
+                Preserve tile count
+                Preserve boundary pixels coverage
+            'exception'
+                Raise an exception if tiles at locus do not lie inside the global bounds
+        boundary_effect_locus : {'br', 'tr', 'tl', 'bl'}, optional
+            Locus of the boundary effects
+            'br' : Boundary effect occurs at the bottom right corner of the raster
+                top left coordinates are preserved
+            'tr' : Boundary effect occurs at the top right corner of the raster,
+                bottom left coordinates are preserved
+            'tl' : Boundary effect occurs at the top left corner of the raster,
+                bottom right coordinates are preserved
+            'bl' : Boundary effect occurs at the bottom left corner of the raster,
+                top right coordinates are preserved
+        as_footprint_array : bool, optional
+            If True, return a FootprintArray instead of a np.ndarray of Footprint. Building the
+            FootprintArray is vectorized, the Footprint objects are only built on element access.
+
+        Returns
+        -------
+        np.ndarray or FootprintArray
             of dtype=object (Footprint)
             of shape (M, N)
                 with M the line count
                 with N the column count
         """
+        big_fp, infoxs, infoys = self._tile_occurrence_grid(
+            size, pixel_occurrencex, pixel_occurrencey, boundary_effect, boundary_effect_locus
+        )
+        return big_fp._tiles_of_grid(infoxs, infoys, boundary_effect_locus, as_footprint_array)
+
+    def iter_tile(self, size, overlapx=0, overlapy=0,
+                  boundary_effect='extend', boundary_effect_locus='br', order='row_major'):
+        """Lazily tile a Footprint, yielding the tiles of `tile` one by one
+
+        The tiles are built by chunks, the memory used does not depend on the number of tiles.
+
+        Parameters
+        ----------
+        size, overlapx, overlapy, boundary_effect, boundary_effect_locus
+            See `tile`
+        order : {'row_major', 'column_major', 'z_order', 'hilbert'}, optional
+            Traversal order of the matrix of tiles
+            'row_major' : Line by line, the same order as `tile(...).flat`
+            'column_major' : Column by column
+            'z_order' : Along a Z-order curve
+            'hilbert' : Along a Hilbert curve
+            The space-filling curves are computed on square blocks of a power of two tiles,
+            traversed one after the other along the longest side of the matrix of tiles.
+
+        Yields
+        ------
+        Footprint
+
+        Example
+        -------
+        >>> for fp, arr in r.iter_data(r.fp.iter_tile((512, 512), order='hilbert')):
+        ...     process(arr)
+        """
+        order = self._check_tile_order(order)
+        infoxs, infoys = self._tile_grid(
+            size, overlapx, overlapy, boundary_effect, boundary_effect_locus
+        )
+        return self._iter_tiles_of_grid(infoxs, infoys, boundary_effect_locus, order)
+
+    def iter_tile_count(self, rowcount, colcount, overlapx=0, overlapy=0,
+                        boundary_effect='extend', boundary_effect_locus='br', order='row_major'):
+        """Lazily tile a Footprint, yielding the tiles of `tile_count` one by one
+
+        Parameters
+        ----------
+        rowcount, colcount, overlapx, overlapy, boundary_effect, boundary_effect_locus
+            See `tile_count`
+        order : {'row_major', 'column_major', 'z_order', 'hilbert'}, optional
+            See `iter_tile`
+
+        Yields
+        ------
+        Footprint
+        """
+        order = self._check_tile_order(order)
+        infoxs, infoys = self._tile_count_grid(
+            rowcount, colcount, overlapx, overlapy, boundary_effect, boundary_effect_locus
+        )
+        return self._iter_tiles_of_grid(infoxs, infoys, boundary_effect_locus, order)
+
+    def iter_tile_occurrence(self, size, pixel_occurrencex, pixel_occurrencey,
+                             boundary_effect='extend', boundary_effect_locus='br',
+                             order='row_major'):
+        """Lazily tile a Footprint, yielding the tiles of `tile_occurrence` one by one
+
+        Parameters
+        ----------
+        size, pixel_occurrencex, pixel_occurrencey, boundary_effect, boundary_effect_locus
+            See `tile_occurrence`
+        order : {'row_major', 'column_major', 'z_order', 'hilbert'}, optional
+            See `iter_tile`
+
+        Yields
+        ------
+        Footprint
+        """
+        order = self._check_tile_order(order)
+        big_fp, infoxs, infoys = self._tile_occurrence_grid(
+            size, pixel_occurrencex, pixel_occurrencey, boundary_effect, boundary_effect_locus
+        )
+        return big_fp._iter_tiles_of_grid(infoxs, infoys, boundary_effect_locus, order)
+
+    def _check_tile_order(self, order):
+        if order not in self._TILE_ORDERS:
+            raise ValueError('order(%s) should be one of %s' % (
+                order, self._TILE_ORDERS
+            ))
+        return order
+
+    def _tile_grid(self, size, overlapx, overlapy, boundary_effect, boundary_effect_locus):
+        size = np.asarray(size, dtype=int)
+        overlapx = int(overlapx)
+        overlapy = int(overlapy)
+
+        if size.shape != (2,):
+            raise ValueError('size.shape(%s) should be (2,)' % str(size.shape))
+        if (size <= 0).any():
+            raise ValueError('size(%s) values should satisfy value > 0' % str(tuple(size)))
+        if not 0 <= overlapx < size[0]:
+            raise ValueError('overlapx(%d) should satisfy 0 <= overlapx < size[0](%d)' % (
+                overlapx, size[0]
+            ))
+        if not 0 <= overlapy < size[1]:
+            raise ValueError('overlapy(%d) should satisfy 0 <= overlapy < size[1](%d)' % (
+                overlapy, size[1]
+            ))
+        if boundary_effect not in self._TILE_BOUNDARY_EFFECTS:
+            raise ValueError('boundary_effect(%s) should be one of %s' % (
+                boundary_effect, self._TILE_BOUNDARY_EFFECTS
+            ))
+        if boundary_effect_locus not in self._TILE_BOUNDARY_EFFECT_LOCI:
+            raise ValueError('boundary_effect_locus(%s) should be one of %s' % (
+                boundary_effect_locus, self._TILE_BOUNDARY_EFFECT_LOCI
+            ))
+        return self._tile_grid_unsafe(
+            size, overlapx, overlapy, boundary_effect, boundary_effect_locus
+        )
+
+    def _tile_count_grid(self, rowcount, colcount, overlapx, overlapy,
+                         boundary_effect, boundary_effect_locus):
         rowcount = int(rowcount)
         colcount = int(colcount)
         overlapx = int(overlapx)
@@ -1951,82 +2291,24 @@ class Footprint(TileMixin, IntersectionMixin):
             ))
 
         size = np.asarray((sizex, sizey), dtype=int)
-        tiles = self._tile_unsafe(size, overlapx, overlapy, boundary_effect, boundary_effect_locus)
+        infoxs, infoys = self._tile_grid_unsafe(
+            size, overlapx, overlapy, boundary_effect, boundary_effect_locus
+        )
         if boundary_effect == 'exclude':
             if boundary_effect_locus == 'br':
-                tiles = tiles[0:colcount, 0:rowcount]
+                infoxs, infoys = infoxs[0:rowcount], infoys[0:colcount]
             elif boundary_effect_locus == 'tl':
-                tiles = tiles[-colcount:, -rowcount:]
+                infoxs, infoys = infoxs[-rowcount:], infoys[-colcount:]
             elif boundary_effect_locus == 'tr':
-                tiles = tiles[-colcount:, 0:rowcount]
+                infoxs, infoys = infoxs[0:rowcount], infoys[-colcount:]
             elif boundary_effect_locus == 'bl':
-                tiles = tiles[0:colcount, -rowcount:]
+                infoxs, infoys = infoxs[-rowcount:], infoys[0:colcount]
             else:
                 assert False # pragma: no cover
-        return tiles
-
-    def tile_occurrence(self, size, pixel_occurrencex, pixel_occurrencey,
-                        boundary_effect='extend', boundary_effect_locus='br'):
-        """Tile a Footprint to a matrix of Footprint
-        Each pixel occur `pixel_occurrencex * pixel_occurrencey` times overall in the output
-
-        Parameters
-        ----------
-        size : (int, int)
-            Tile width and tile height, in pixel
-        pixel_occurrencex: int
-            Number of occurence of each pixel in a line of tile
-        pixel_occurrencey: int
-            Number of occurence of each pixel in a column of tile
-        boundary_effect : {'extend', 'exclude', 'overlap', 'shrink', 'exception'}, optional
-            Behevior at boundary effect locus
-            'extend'
-                Preserve tile size
-                Preserve overlapx and overlapy
-                Sacrifice global bounds
-                    Results in tiles partially outside bounds at locus (if necessary)
-                Preserve tile count
-                Preserve boundary pixels coverage
-            'overlap'
-                Preserve tile size
-                Sacrifice overlapx and overlapy
-                    Results in tiles overlapping more at locus (if necessary)
-                Preserve global bounds
-                Preserve tile count
-                Preserve boundary pixels coverage
-            'exclude'
-                Preserve tile size
-                Preserve overlapx and overlapy
-                Preserve global bounds
-                Sacrifice tile count, results in tiles excluded at locus (if necessary)
-                Sacrifice boundary pixels coverage at locus (if necessary)
-            'shrink'
-                Sacrifice tile size, results in tiles shrinked at locus (if necessary)
-                Preserve overlapx and overlapy
-                Preserve global bounds
-                Preserve tile count
-                Preserve boundary pixels coverage
-            'exception'
-                Raise an exception if tiles at locus do not lie inside the global bounds
-        boundary_effect_locus : {'br', 'tr', 'tl', 'bl'}, optional
-            Locus of the boundary effects
-            'br' : Boundary effect occurs at the bottom right corner of the raster
-                top left coordinates are preserved
-            'tr' : Boundary effect occurs at the top right corner of the raster,
-                bottom left coordinates are preserved
-            'tl' : Boundary effect occurs at the top left corner of the raster,
-                bottom right coordinates are preserved
-            'bl' : Boundary effect occurs at the bottom left corner of the raster,
-                top right coordinates are preserved
+        return infoxs, infoys
 
-        Returns
-        -------
-        np.ndarray
-            of dtype=object (Footprint)
-            of shape (M, N)
-                with M the line count
-                with N the column count
-        """
+    def _tile_occurrence_grid(self, size, pixel_occurrencex, pixel_occurrencey,
+                              boundary_effect, boundary_effect_locus):
         size = np.asarray(size, dtype=int)
         pixel_occurrencex = int(pixel_occurrencex)
         pixel_occurrencey = int(pixel_occurrencey)
@@ -2069,10 +2351,10 @@ class Footprint(TileMixin, IntersectionMixin):
         big_rsize = self.rsize + np.asarray(overlap) * 2
         big_size = big_rsize * self.pxsize
         big_fp = self.__class__(tl=big_tl, size=big_size, rsize=big_rsize)
-        tiles = big_fp._tile_unsafe(
+        infoxs, infoys = big_fp._tile_grid_unsafe(
             size, overlap[0], overlap[1], boundary_effect, boundary_effect_locus
         )
-        return tiles
+        return big_fp, infoxs, infoys
 
     # Serialization ***************************************************************************** **
     def __str__(self):
@@ -2140,6 +2422,97 @@ def _poly_iterator(obj):
 def _restore(gt, rsize):
     return Footprint(gt=gt, rsize=rsize)
 
+_CONVERSION_CHUNK = 65536
+
+def _check_conversion_out(out, shape, dtype, default_dtype):
+    """Allocate or check the `out` parameter of the coordinates conversions"""
+    if out is None:
+        return np.empty(shape, default_dtype if dtype is None else dtype)
+    if not isinstance(out, np.ndarray):
+        raise TypeError('`out` should be a numpy array')
+    if out.shape != shape:
+        raise ValueError('`out` should have shape {}, not {}'.format(shape, out.shape))
+    if dtype is not None and out.dtype != dtype:
+        raise ValueError('`out` should have dtype {}, not {}'.format(dtype, out.dtype))
+    if out.size and not np.may_share_memory(out.reshape(-1, 2), out):
+        raise ValueError('`out` should be reshapable to (-1, 2) without copy')
+    return out
+
+def _convert_by_chunks(xy, out, fn):
+    """Apply `fn` on chunks of the coordinates of `xy` copied to a float64 workspace, and write
+    the results to `out`. `out` may be `xy`, each chunk is read before being overwritten.
+    """
+    xy = xy.reshape(-1, 2)
+    out = out.reshape(-1, 2)
+    workspace = np.empty((min(len(xy), _CONVERSION_CHUNK), 2), 'float64')
+    for i in range(0, len(xy), _CONVERSION_CHUNK):
+        xy2 = workspace[:len(xy) - i]
+        xy2[...] = xy[i:i + _CONVERSION_CHUNK]
+        out[i:i + _CONVERSION_CHUNK] = fn(xy2)
+
+def _apply_affine(aff, xy2):
+    """Apply `aff` in place on `xy2`, a float64 array of shape (N, 2)"""
+    x, y = xy2[:, 0].copy(), xy2[:, 1]
+    xy2[:, 0] *= aff.a
+    xy2[:, 0] += y * aff.b
+    xy2[:, 0] += aff.c
+    x *= aff.d
+    y *= aff.e
+    y += x
+    y += aff.f
+    return xy2
+
+_INTERN_TABLE = {}
+_INTERN_LOCK = threading.RLock()
+
+def _intern_quantum_exponent(fp):
+    """log2 of the pixel size of `fp`, the cells of the grid of the intern keys of `fp` are the
+    power of two below its pixel size. Also returns the smallest pixel size of `fp`.
+    """
+    (tlx, tly), (blx, bly), _, (trx, try_) = fp._get_corners().tolist()
+    rsizex, rsizey = fp._rsize.tolist()
+    pxsize = min(
+        math.hypot(trx - tlx, try_ - tly) / rsizex,
+        math.hypot(blx - tlx, bly - tly) / rsizey,
+    )
+    return math.log(pxsize, 2), pxsize
+
+def _intern_candidate_keys(fp, key):
+    """Intern keys under which a Footprint equal to `fp` may have been interned, `key` being the
+    intern key of `fp`. Neighboring cells of the grid are visited when a coordinate of `fp` lies
+    close to a grid line, and the grid of the adjacent power of two is visited when the pixel size
+    of `fp` lies close to a power of two.
+    """
+    exponent, pxsize = _intern_quantum_exponent(fp)
+    (tlx, tly), _, (brx, bry), _ = fp._get_corners().tolist()
+    coords = (tlx, tly, brx, bry)
+    spatial_precision = max(abs(v) for v in coords) * 10 ** -env.significant * 2
+    pxsize_slack = spatial_precision * 2 / min(fp._rsize.tolist()) / pxsize / math.log(2)
+    yield key
+    for quantum_exponent in set([
+            math.floor(exponent - pxsize_slack), math.floor(exponent + pxsize_slack),
+    ]):
+        quantum = 2. ** quantum_exponent
+        slack = spatial_precision / quantum
+        choices = []
+        for v in coords:
+            v = v / quantum
+            choices.append(set([
+                int(math.floor(v)), int(math.floor(v - slack)), int(math.floor(v + slack)),
+            ]))
+        for indices in itertools.product(*choices):
+            if key[2:] != indices:
+                yield key[:2] + indices
+
+def _intern_table_discard(key, _):
+    with _INTERN_LOCK:
+        refs = _INTERN_TABLE.get(key)
+        if refs is None:
+            return
+        refs[:] = [ref for ref in refs if ref() is not None]
+        if not refs:
+            del _INTERN_TABLE[key]
+
 def _angle_between(a, b, c):
     return np.arccos(np.dot(
         (a - b) / np.linalg.norm(a - b),
@@ -0,0 +1,572 @@
+""">>> help(FootprintArray)"""
+
+from __future__ import division, print_function
+import numbers
+
+import numpy as np
+import affine
+import shapely.geometry as sg
+
+from buzzard._tools import conv
+from buzzard._env import env
+
+class FootprintArray(object):
+    """Immutable n-dimensional array of Footprints, stored as contiguous arrays of affine
+    coefficients and raster sizes.
+
+    The Footprint objects are only built when accessing single elements, all other operations
+    are vectorized over the array.
+
+    Construction
+    ------------
+    >>> tiles = fp.tile((256, 256), as_footprint_array=True)
+    >>> tiles = buzz.FootprintArray([fp0, fp1, fp2])
+
+    Element access and filtering
+    ----------------------------
+    >>> tiles[0, 0]
+    Footprint(...)
+    >>> tiles[:, :3]
+    FootprintArray(shape=(M, 3))
+    >>> tiles[tiles.share_area(poly)]
+    FootprintArray(shape=(K,))
+
+    Conversion to a numpy array of dtype=object
+    -------------------------------------------
+    >>> np.asarray(tiles)
+    """
+
+    __slots__ = ['_fp_class', '_aff6', '_rsize']
+
+    def __init__(self, footprints):
+        """Constructor
+
+        Parameters
+        ----------
+        footprints: nested sequence of Footprint or np.ndarray of dtype=object
+        """
+        arr = np.asarray(footprints, dtype=object)
+        fps = arr.ravel()
+        if fps.size == 0:
+            fp_class = None
+        else:
+            fp_class = type(fps[0])
+            if not hasattr(fp_class, '_aff'):
+                raise TypeError('footprints should only contain Footprints, not %s' % fp_class)
+            for fp in fps:
+                if not isinstance(fp, fp_class):
+                    raise TypeError('footprints should only contain Footprints, not %s' % type(fp))
+        self._fp_class = fp_class
+        self._aff6 = np.asarray(
+            [fp._aff[:6] for fp in fps], dtype=np.float64
+        ).reshape(arr.shape + (6,))
+        self._rsize = np.asarray(
+            [fp._rsize for fp in fps], dtype=env.default_index_dtype
+        ).reshape(arr.shape + (2,))
+
+    @classmethod
+    def _of_trusted(cls, fp_class, aff6, rsize):
+        """Construct a FootprintArray from arrays of shape (..., 6) and (..., 2) known to describe
+        valid Footprints of class `fp_class`
+        """
+        self = object.__new__(cls)
+        self._fp_class = fp_class
+        self._aff6 = aff6
+        self._rsize = rsize
+        return self
+
+    # Array interface *************************************************************************** **
+    @property
+    def shape(self):
+        """Shape of the array of Footprints"""
+        return self._rsize.shape[:-1]
+
+    @property
+    def ndim(self):
+        """Number of dimensions of the array of Footprints"""
+        return self._rsize.ndim - 1
+
+    @property
+    def size(self):
+        """Number of Footprints in the array"""
+        return self._rsize.size // 2
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, key):
+        """Index the array of Footprints like a numpy array (integers, slices, boolean masks,
+        integer arrays). Returns a Footprint if a single element is selected, a FootprintArray
+        otherwise.
+        """
+        if isinstance(key, numbers.Integral):
+            key = (key,)
+        if (isinstance(key, tuple) and len(key) == self.ndim and
+                all(isinstance(k, numbers.Integral) for k in key)):
+            # Fast path for element access
+            return self._fp_class._of_trusted(
+                affine.Affine(*self._aff6[key].tolist()),
+                self._rsize[key].tolist(),
+            )
+        indices = np.arange(self.size).reshape(self.shape)[key]
+        aff6 = self._aff6.reshape(-1, 6)[indices]
+        rsize = self._rsize.reshape(-1, 2)[indices]
+        if indices.ndim == 0:
+            return self._fp_class._of_trusted(affine.Affine(*aff6.tolist()), rsize.tolist())
+        return self._of_trusted(self._fp_class, aff6, rsize)
+
+    def reshape(self, *shape):
+        """Give a new shape to the array of Footprints, like `np.ndarray.reshape`"""
+        if len(shape) == 1 and not isinstance(shape[0], numbers.Integral):
+            shape = tuple(shape[0])
+        return self._of_trusted(
+            self._fp_class,
+            self._aff6.reshape(shape + (6,)),
+            self._rsize.reshape(shape + (2,)),
+        )
+
+    def ravel(self):
+        """Flatten the array of Footprints"""
+        return self.reshape(-1)
+
+    def to_ndarray(self):
+        """Build all the Footprints
+
+        Returns
+        -------
+        np.ndarray
+            of dtype=object (Footprint)
+            of shape self.shape
+        """
+        fps = np.empty(self.size, dtype=object)
+        fp_class = self._fp_class
+        for i, (aff6, rsize) in enumerate(zip(
+                self._aff6.reshape(-1, 6).tolist(), self._rsize.reshape(-1, 2).tolist())):
+            fps[i] = fp_class._of_trusted(affine.Affine(*aff6), rsize)
+        return fps.reshape(self.shape)
+
+    def __array__(self, dtype=None):
+        arr = self.to_ndarray()
+        if dtype is not None:
+            arr = arr.astype(dtype)
+        return arr
+
+    def __repr__(self):
+        return 'FootprintArray(shape=%s)' % (self.shape,)
+
+    # Accessors ********************************************************************************* **
+    @property
+    def aff6(self):
+        """Affine transformation matrices, left-right/top-bottom ordering, of shape (..., 6)"""
+        return self._aff6.copy()
+
+    @property
+    def gt(self):
+        """Affine transformation matrices, GDAL ordering, of shape (..., 6)"""
+        return self._aff6[..., [2, 0, 1, 5, 3, 4]]
+
+    @property
+    def rsize(self):
+        """Sizes of rasters in pixel, of shape (..., 2)"""
+        return self._rsize.copy()
+
+    @property
+    def tl(self):
+        """Spatial coordinates of rasters top left, of shape (..., 2)"""
+        return self._aff6[..., [2, 5]]
+
+    def _corners(self):
+        """Spatial coordinates of the corners (tl, bl, br, tr), as two lists of 4 arrays
+        of shape self.shape (x and y)
+        """
+        a, b, c, d, e, f = np.moveaxis(self._aff6, -1, 0)
+        rsizex, rsizey = np.moveaxis(self._rsize, -1, 0)
+        res = []
+        for aa, bb, cc in [(a, b, c), (d, e, f)]:
+            xa = rsizex * aa
+            yb = rsizey * bb
+            res.append([cc, yb + cc, xa + yb + cc, xa + cc])
+        return res
+
+    @property
+    def coords(self):
+        """Spatial coordinates of the corners (tl, bl, br, tr), of shape (..., 4, 2)"""
+        xs, ys = self._corners()
+        return np.stack([np.stack(xs, axis=-1), np.stack(ys, axis=-1)], axis=-1)
+
+    @property
+    def bounds(self):
+        """Bounds (`min` then `max`), of shape (..., 4)
+
+        Example
+        -------
+        >>> minx, miny, maxx, maxy = np.moveaxis(fparr.bounds, -1, 0)
+        """
+        xs, ys = self._corners()
+        return np.stack([
+            np.minimum(np.minimum(xs[0], xs[1]), np.minimum(xs[2], xs[3])),
+            np.minimum(np.minimum(ys[0], ys[1]), np.minimum(ys[2], ys[3])),
+            np.maximum(np.maximum(xs[0], xs[1]), np.maximum(xs[2], xs[3])),
+            np.maximum(np.maximum(ys[0], ys[1]), np.maximum(ys[2], ys[3])),
+        ], axis=-1)
+
+    @property
+    def extent(self):
+        """Extents (`x` then `y`), of shape (..., 4)"""
+        return self.bounds[..., [0, 2, 1, 3]]
+
+    @property
+    def pxsize(self):
+        """Spatial distances: (||pixel right - pixel left||, ||pixel bottom - pixel top||),
+        of shape (..., 2)
+        """
+        a, b, _, d, e, _ = np.moveaxis(self._aff6, -1, 0)
+        return np.stack([np.hypot(a, d), np.hypot(b, e)], axis=-1)
+
+    @property
+    def _axis_aligned_mask(self):
+        return (self._aff6[..., 1] == 0) & (self._aff6[..., 3] == 0)
+
+    # Binary predicates ************************************************************************* **
+    def share_area(self, other):
+        """Vectorized binary predicate: Does other share area with each Footprint
+
+        Parameters
+        ----------
+        other: Footprint or shapely object
+
+        Returns
+        -------
+        np.ndarray
+            of dtype=bool
+            of shape self.shape
+        """
+        if isinstance(other, sg.base.BaseGeometry):
+            geom = other
+            other_bounds = np.asarray(geom.bounds, dtype=np.float64)
+            other_is_box = False
+        else:
+            geom = None
+            other_bounds = other.bounds
+            other_is_box = other._aff.b == 0 and other._aff.d == 0
+        if geom is not None and geom.is_empty:
+            return np.zeros(self.shape, dtype=bool)
+
+        bounds = self.bounds.reshape(-1, 4)
+        aligned = self._axis_aligned_mask.reshape(-1)
+        res = np.zeros(len(bounds), dtype=bool)
+
+        # Discard Footprints with disjoint or touching bounding boxes
+        candidates = (
+            (bounds[:, 0] < other_bounds[2]) & (other_bounds[0] < bounds[:, 2]) &
+            (bounds[:, 1] < other_bounds[3]) & (other_bounds[1] < bounds[:, 3])
+        )
+
+        if other_is_box:
+            res[candidates & aligned] = True
+        elif geom is None:
+            geom = other.poly
+
+        if geom is not None:
+            mask = candidates & aligned
+            if isinstance(geom, (sg.Polygon, sg.MultiPolygon)):
+                res[mask] = _boxes_share_area_with_polygon(bounds[mask], geom)
+            else:
+                res[mask] = [
+                    _shapely_share_area(sg.box(*b), geom)
+                    for b in bounds[mask]
+                ]
+
+        # Rotated Footprints
+        mask = candidates & ~aligned
+        if mask.any():
+            if geom is None:
+                geom = other.poly
+            flat = self.ravel()
+            res[mask] = [
+                _shapely_share_area(flat[int(i)].poly, geom)
+                for i in np.flatnonzero(mask)
+            ]
+        return res.reshape(self.shape)
+
+    # Footprint construction ******************************************************************** **
+    def intersection(self, other):
+        """Vectorized `Footprint.intersection` of each Footprint with `other`, using the default
+        parameters of `Footprint.intersection` (each output lies on the grid of the input)
+
+        Parameters
+        ----------
+        other: Footprint
+
+        Returns
+        -------
+        FootprintArray
+            of shape self.shape
+        """
+        if not hasattr(other, '_aff'):
+            raise TypeError('other should be a Footprint') # pragma: no cover
+        if not self.share_area(other).all():
+            raise ValueError('Intersection is empty for some of the Footprints')
+
+        aff6 = self._aff6.reshape(-1, 6).copy()
+        rsize = self._rsize.reshape(-1, 2).copy()
+        a, b, c, d, e, f = aff6.T
+        northup = (b == 0) & (d == 0) & (a > 0) & (e < 0)
+        if other._aff.b != 0 or other._aff.d != 0:
+            northup[:] = False
+
+        # North-up Footprints intersecting an axis-aligned Footprint
+        if northup.any():
+            a, b, c, d, e, f = aff6[northup].T
+            w, h = rsize[northup].T
+            ominx, ominy, omaxx, omaxy = other.bounds
+            minx = np.maximum(c, ominx)
+            maxx = np.minimum(c + w * a, omaxx)
+            maxy = np.minimum(f, omaxy)
+            miny = np.maximum(f + h * e, ominy)
+
+            largest_coord = np.abs([minx, maxx, miny, maxy]).max(axis=0).clip(1, np.inf)
+            smallest_reso = np.minimum(a, -e)
+            significant_min = (-np.log10(smallest_reso / largest_coord)).max()
+            if env.significant <= significant_min:
+                raise RuntimeError('`env.significant` of value {} should be at least {}'.format(
+                    env.significant, significant_min,
+                ))
+            spatial_precision = largest_coord * 10 ** -env.significant
+            abstract_grid_density = np.floor(1 / (spatial_precision / smallest_reso))
+
+            tmpx = np.around((minx - c) / a * abstract_grid_density, 0) / abstract_grid_density
+            tmpy = np.around((maxy - f) / e * abstract_grid_density, 0) / abstract_grid_density
+            tlx = np.floor(tmpx) * a + c
+            tly = np.floor(tmpy) * e + f
+            rsizex = np.around((maxx - tlx) / a * abstract_grid_density, 0) / abstract_grid_density
+            rsizey = np.around((miny - tly) / e * abstract_grid_density, 0) / abstract_grid_density
+
+            aff6[northup, 2] = tlx
+            aff6[northup, 5] = tly
+            rsize[northup, 0] = np.ceil(rsizex).clip(1, np.iinfo(int).max)
+            rsize[northup, 1] = np.ceil(rsizey).clip(1, np.iinfo(int).max)
+
+        # Other Footprints
+        if not northup.all():
+            flat = self.ravel()
+            for i in np.flatnonzero(~northup):
+                fp = flat[int(i)].intersection(other)
+                aff6[i] = fp._aff[:6]
+                rsize[i] = fp._rsize
+
+        return self._of_trusted(
+            self._fp_class, aff6.reshape(self._aff6.shape), rsize.reshape(self._rsize.shape)
+        )
+
+    # Numpy ************************************************************************************* **
+    def slice_in(self, other, clip=False):
+        """Vectorized `Footprint.slice_in`: Compute location of each Footprint inside `other`.
+        If other and a Footprint do not have the same rotation, operation is undefined
+
+        Parameters
+        ----------
+        other: Footprint
+        clip: bool
+            False
+                Does nothing
+            True
+                Clip the slices to other bounds
+
+        Returns
+        -------
+        np.ndarray
+            of dtype=env.default_index_dtype
+            of shape self.shape + (2, 2)
+            with `[..., 0, :]` the start and stop indices along y
+            with `[..., 1, :]` the start and stop indices along x
+
+        Example
+        -------
+        >>> for (ystart, ystop), (xstart, xstop) in tiles.slice_in(big).reshape(-1, 2, 2):
+        ...     big_data[ystart:ystop, xstart:xstop] = 1
+        """
+        coords = self.coords
+        start = other.spatial_to_raster(coords[..., 0, :])
+        end = other.spatial_to_raster(coords[..., 2, :])
+        if clip:
+            start = start.clip(0, other.rsize)
+            end = end.clip(0, other.rsize)
+        return np.stack([
+            np.stack([start[..., 1], end[..., 1]], axis=-1),
+            np.stack([start[..., 0], end[..., 0]], axis=-1),
+        ], axis=-2)
+
+    # Coordinates conversions ******************************************************************* **
+    def spatial_to_raster(self, xy, dtype=None, op=np.floor):
+        """Vectorized `Footprint.spatial_to_raster`: Convert xy spatial coordinates to raster
+        xy indices, in the referential of each Footprint
+
+        Parameters
+        ----------
+        xy: sequence of numbers of shape (..., 2)
+            Spatial coordinates, broadcastable against `self.shape + (2,)`
+        dtype: None or convertible to np.dtype
+            Output dtype
+            If None: Use buzz.env.default_index_dtype
+        op: None or vectorized function
+            Function to apply before casting output to dtype
+            If None: Do not transform data before casting
+
+        Returns
+        -------
+        out_xy: np.ndarray
+            Raster indices
+            with shape = np.broadcast(xy, self.shape + (2,)).shape
+            with dtype = dtype
+        """
+        # Check xy parameter
+        xy = np.asarray(xy)
+        if xy.shape[-1] != 2:
+            raise ValueError('An array of shape (..., 2) was expected') # pragma: no cover
+
+        # Check dtype parameter
+        if dtype is None:
+            dtype = env.default_index_dtype
+        else:
+            dtype = conv.dtype_of_any_downcast(dtype)
+
+        # Check op parameter
+        if not isinstance(np.zeros(1, dtype=dtype)[0], numbers.Integral):
+            op = None
+
+        largest_coord = np.abs(self.coords).max(axis=(-1, -2))
+        smallest_reso = self.pxsize.min(axis=-1)
+        significant_min = -np.log10(smallest_reso / largest_coord.clip(1, np.inf))
+        if significant_min.size and env.significant <= significant_min.max():
+            raise RuntimeError('`env.significant` of value {} should be at least {}'.format(
+                env.significant, significant_min.max(),
+            ))
+        spatial_precision = largest_coord * 10 ** -env.significant
+        pixel_precision = spatial_precision / smallest_reso
+        abstract_grid_density = np.floor(1 / pixel_precision)
+
+        # Same operations as `~affine.Affine`
+        a, b, c, d, e, f = np.moveaxis(self._aff6, -1, 0)
+        idet = 1.0 / (a * e - b * d)
+        ra = e * idet
+        rb = -b * idet
+        rd = -d * idet
+        re = a * idet
+        rc = -c * ra - f * rb
+        rf = -c * rd - f * re
+
+        x, y = xy[..., 0], xy[..., 1]
+        xy2 = np.stack([
+            x * ra + y * rb + rc,
+            x * rd + y * re + rf,
+        ], axis=-1)
+        abstract_grid_density = abstract_grid_density[..., None]
+        xy2 = np.around(xy2 * abstract_grid_density, 0) / abstract_grid_density
+        if op is not None:
+            xy2 = op(xy2)
+        return xy2.astype(dtype)
+
+    def raster_to_spatial(self, xy):
+        """Vectorized `Footprint.raster_to_spatial`: Convert xy raster coordinates to spatial
+        coordinates, in the referential of each Footprint
+
+        Parameters
+        ----------
+        xy: sequence of numbers of shape (..., 2)
+            Raster coordinates, broadcastable against `self.shape + (2,)`
+
+        Returns
+        -------
+        out_xy: np.ndarray
+            Spatial coordinates
+            with shape = np.broadcast(xy, self.shape + (2,)).shape
+            with dtype = float64
+        """
+        xy = np.asarray(xy, dtype=np.float64)
+        if xy.shape[-1] != 2:
+            raise ValueError('An array of shape (..., 2) was expected') # pragma: no cover
+        a, b, c, d, e, f = np.moveaxis(self._aff6, -1, 0)
+        x, y = xy[..., 0], xy[..., 1]
+        return np.stack([
+            x * a + y * b + c,
+            x * d + y * e + f,
+        ], axis=-1)
+
+def _shapely_share_area(a, b):
+    return not a.disjoint(b) and not a.touches(b)
+
+def _polygon_rings(geom):
+    if isinstance(geom, sg.MultiPolygon):
+        polys = list(geom.geoms)
+    else:
+        polys = [geom]
+    for poly in polys:
+        yield np.asarray(poly.exterior.coords)[:, :2]
+        for ring in poly.interiors:
+            yield np.asarray(ring.coords)[:, :2]
+
+def _boxes_share_area_with_polygon(bounds, geom):
+    """Vectorized share_area between axis-aligned boxes of shape (N, 4) and a polygon
+
+    A box shares area with a polygon if an edge of the polygon crosses the interior of the box, or
+    else if the center of the box lies inside the polygon.
+    """
+    if len(bounds) == 0:
+        return np.zeros(0, dtype=bool)
+    minx, miny, maxx, maxy = bounds.T
+    cx = (minx + maxx) / 2
+    cy = (miny + maxy) / 2
+    edges = np.concatenate([
+        np.c_[ring[:-1], ring[1:]]
+        for ring in _polygon_rings(geom)
+    ], axis=0)
+
+    # Sort boxes along x and y to only visit the boxes near each edge
+    xorder = np.argsort(minx, kind='mergesort')
+    sorted_minx = minx[xorder]
+    maxwidth = (maxx - minx).max()
+    yorder = np.argsort(cy, kind='mergesort')
+    sorted_cy = cy[yorder]
+
+    crossing = np.zeros(len(bounds), dtype=bool)
+    inside = np.zeros(len(bounds), dtype=bool)
+    for x0, y0, x1, y1 in edges.tolist():
+        # Edge crossing the interior of the boxes
+        lo = np.searchsorted(sorted_minx, min(x0, x1) - maxwidth, 'left')
+        hi = np.searchsorted(sorted_minx, max(x0, x1), 'left')
+        idx = xorder[lo:hi]
+        idx = idx[(miny[idx] < max(y0, y1)) & (min(y0, y1) < maxy[idx])]
+        if idx.size:
+            crossing[idx] |= _segment_crosses_open_boxes(
+                x0, y0, x1, y1, minx[idx], miny[idx], maxx[idx], maxy[idx],
+            )
+
+        # Even-odd rule for the center of the boxes
+        if y0 != y1:
+            lo = np.searchsorted(sorted_cy, min(y0, y1), 'left')
+            hi = np.searchsorted(sorted_cy, max(y0, y1), 'left')
+            idx = yorder[lo:hi]
+            idx = idx[cx[idx] < (x1 - x0) * (cy[idx] - y0) / (y1 - y0) + x0]
+            inside[idx] = ~inside[idx]
+    return crossing | inside
+
+def _segment_crosses_open_boxes(x0, y0, x1, y1, minx, miny, maxx, maxy):
+    """Liang-Barsky clipping of the segment [(x0, y0), (x1, y1)] with the interior of many boxes"""
+    tmin = np.zeros(len(minx))
+    tmax = np.ones(len(minx))
+    res = np.ones(len(minx), dtype=bool)
+    for p0, p1, lo, hi in [(x0, x1, minx, maxx), (y0, y1, miny, maxy)]:
+        delta = p1 - p0
+        if delta == 0:
+            res &= (lo < p0) & (p0 < hi)
+        else:
+            t0 = (lo - p0) / delta
+            t1 = (hi - p0) / delta
+            tmin = np.maximum(tmin, np.minimum(t0, t1))
+            tmax = np.minimum(tmax, np.maximum(t0, t1))
+    return res & (tmin < tmax)
@@ -71,22 +71,35 @@ class IntersectionMixin(object):
         return resolution, rotation, fitrot, alignment, fitalign
 
     def _intersection_unsafe(self, footprints, geoms, resolution, rotation, alignment):
-        geoms = [fp.poly for fp in footprints] + geoms
-        for g1, g2 in itertools.combinations(geoms, 2):
-            if g1.disjoint(g2):
-                raise ValueError('Intersection is empty')
-            elif g1.touches(g2):
-                raise ValueError('Two geometries are only touching, intersection is empty')
-        geom = functools.reduce(sg.Polygon.intersection, geoms)
+        if not geoms and all(fp._axis_aligned for fp in footprints):
+            # Intersection of rectangles with edges parallel to the axes, no need for shapely
+            bounds = _intersection_of_boxes([fp._fast_bounds() for fp in footprints])
+            geom = None
+        else:
+            geoms = [fp.poly for fp in footprints] + geoms
+            for g1, g2 in itertools.combinations(geoms, 2):
+                if g1.disjoint(g2):
+                    raise ValueError('Intersection is empty')
+                elif g1.touches(g2):
+                    raise ValueError('Two geometries are only touching, intersection is empty')
+            geom = functools.reduce(sg.Polygon.intersection, geoms)
+            assert geom.is_valid
+            assert not geom.is_empty
         del geoms
-        assert geom.is_valid
-        assert not geom.is_empty
         resolution, rotation, fitrot, alignment, fitalign = self._intersection_expand_parameters(
             footprints, resolution, rotation, alignment
         )
         del footprints
 
-        if fitrot:
+        if geom is None and (fitrot or rotation != 0):
+            geom = sg.box(*bounds)
+
+        if geom is None:
+            minx, miny, maxx, maxy = bounds
+            lx, rx = (minx, maxx) if resolution[0] > 0 else (maxx, minx)
+            ty, by = (miny, maxy) if resolution[1] > 0 else (maxy, miny)
+            rect = _tools.Rect(tl=(lx, ty), bl=(lx, by), br=(rx, by), tr=(rx, ty))
+        elif fitrot:
             # TODO: Make this block work with non-polygon geom
             rect = geom.minimum_rotated_rectangle
             abovex, _, _, abovey = rect.bounds
@@ -157,10 +170,21 @@ class IntersectionMixin(object):
             rsize = rsize.clip(1, np.iinfo(int).max)
 
         assert (rsize > 0).all()
-        return self.__class__(
-            gt=aff.to_gdal(),
-            rsize=rsize,
-        )
+        self._check_affine(aff)
+        return self._of_trusted(aff, rsize)
+
+def _intersection_of_boxes(bounds):
+    """Compute the intersection of several `(minx, miny, maxx, maxy)` rectangles, raising the same
+    exceptions as the shapely code path of `IntersectionMixin._intersection_unsafe`
+    """
+    for (aminx, aminy, amaxx, amaxy), (bminx, bminy, bmaxx, bmaxy) in itertools.combinations(
+            bounds, 2):
+        if aminx > bmaxx or bminx > amaxx or aminy > bmaxy or bminy > amaxy:
+            raise ValueError('Intersection is empty')
+        elif aminx == bmaxx or bminx == amaxx or aminy == bmaxy or bminy == amaxy:
+            raise ValueError('Two geometries are only touching, intersection is empty')
+    minxs, minys, maxxs, maxys = zip(*bounds)
+    return max(minxs), max(minys), min(maxxs), min(maxys)
 
 def _exterior_coords_iterator(geom):
     if isinstance(geom, sg.Point):
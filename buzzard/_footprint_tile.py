@@ -2,12 +2,16 @@
 
 import numpy as np
 
+from buzzard._env import env
+from buzzard._footprint_array import FootprintArray
+
 class TileMixin(object):
     """Private mixin for the Footprint class containing tiling subroutines"""
 
     _TILE_BOUNDARY_EFFECTS = set(['extend', 'exclude', 'overlap', 'shrink', 'exception'])
     _TILE_OCCURRENCE_BOUNDARY_EFFECTS = set(['extend', 'exception'])
     _TILE_BOUNDARY_EFFECT_LOCI = set(['br', 'tr', 'tl', 'bl'])
+    _TILE_ORDERS = set(['row_major', 'column_major', 'z_order', 'hilbert'])
 
     @staticmethod
     def _details_of_tiling_direction(tile_size, overlap_size, raster_size):
@@ -123,7 +127,10 @@ class TileMixin(object):
             if gap != 0:
                 yield self.rsizey - gap - overlapy, gap + overlapy
 
-    def _tile_unsafe(self, size, overlapx, overlapy, boundary_effect, boundary_effect_locus):
+    def _tile_grid_unsafe(self, size, overlapx, overlapy, boundary_effect, boundary_effect_locus):
+        """Compute the (delta, size) in pixel of the columns and of the lines of tiles, in the order
+        of the output matrix. Returns two arrays of shape (N, 2) and (M, 2).
+        """
         if boundary_effect == 'extend':
             gen_xinfo = self._tile_extend_deltax_gen(size[0], overlapx)
             gen_yinfo = self._tile_extend_deltay_gen(size[1], overlapy)
@@ -142,6 +149,18 @@ class TileMixin(object):
         else:
             assert False # pragma: no cover
 
+        infoxs = np.asarray(list(gen_xinfo), dtype=int).reshape(-1, 2)
+        infoys = np.asarray(list(gen_yinfo), dtype=int).reshape(-1, 2)
+        if boundary_effect_locus in ('tl', 'bl'):
+            infoxs = infoxs[::-1]
+        if boundary_effect_locus in ('tl', 'tr'):
+            infoys = infoys[::-1]
+        return infoxs, infoys
+
+    def _tile_footprints(self, infoxs, infoys, boundary_effect_locus):
+        """Build the FootprintArray of the tiles located by `infoxs` and `infoys`, two arrays of
+        (delta, size) of shape (..., 2) broadcastable together
+        """
         if boundary_effect_locus == 'br':
             origin = self.tl
             direction = np.array([+1, +1], dtype='int')
@@ -160,39 +179,99 @@ class TileMixin(object):
         horiz_vec = self.pxlrvec * direction[0]
         vert_vec = self.pxtbvec * direction[1]
 
-        def _footprint_of_deltacoords(y, x, sizex, sizey):
-            rsize = np.asarray([sizex, sizey])
-            gt = self.gt
-            tl = horiz_vec * x + vert_vec * y + origin
-            tl -= rsize * (direction == -1) * (1, -1) # I don't get this line :'(
-            gt[0] = tl[0]
-            gt[3] = tl[1]
-            return self.__class__(
-                gt=gt,
-                rsize=rsize,
-            )
+        infoxs, infoys = np.broadcast_arrays(infoxs, infoys)
+        rsize = np.stack([infoxs[..., 1], infoys[..., 1]], axis=-1)
 
-        infoxs = list(gen_xinfo)
-        infoys = list(gen_yinfo)
-        deltaxs, deltays = np.meshgrid(
-            [deltax for (deltax, _) in infoxs],
-            [deltay for (deltay, _) in infoys],
-        )
-        sizexs, sizeys = np.meshgrid(
-            [sizex for (_, sizex) in infoxs],
-            [sizey for (_, sizey) in infoys],
+        tl = horiz_vec * infoxs[..., 0, None] + vert_vec * infoys[..., 0, None] + origin
+        tl -= rsize * (direction == -1) * (1, -1) # I don't get this line :'(
+
+        aff6 = np.empty(rsize.shape[:-1] + (6,), dtype=np.float64)
+        aff6[...] = self._aff[:6]
+        aff6[..., 2] = tl[..., 0]
+        aff6[..., 5] = tl[..., 1]
+        return FootprintArray._of_trusted(
+            self.__class__, aff6, rsize.astype(env.default_index_dtype),
         )
-        tiles = np.asarray(list(map(
-            _footprint_of_deltacoords,
-            deltays.flatten(),
-            deltaxs.flatten(),
-            sizexs.flatten(),
-            sizeys.flatten(),
-        )), dtype=object)
-        if tiles.size > 0:
-            tiles = tiles.reshape(len(infoys), len(infoxs))
-        if direction[0] == -1:
-            tiles = np.fliplr(tiles)
-        if direction[1] == -1:
-            tiles = np.flipud(tiles)
-        return tiles
+
+    def _tiles_of_grid(self, infoxs, infoys, boundary_effect_locus, as_footprint_array):
+        tiles = self._tile_footprints(infoxs[None, :], infoys[:, None], boundary_effect_locus)
+        if as_footprint_array:
+            return tiles
+        if tiles.size == 0:
+            return np.asarray([], dtype=object)
+        return tiles.to_ndarray()
+
+    def _iter_tiles_of_grid(self, infoxs, infoys, boundary_effect_locus, order):
+        for rows, cols in _iter_grid_indices(len(infoys), len(infoxs), order):
+            tiles = self._tile_footprints(infoxs[cols], infoys[rows], boundary_effect_locus)
+            for fp in tiles.to_ndarray():
+                yield fp
+
+_ITER_TILE_CHUNK = 4096
+
+def _iter_grid_indices(rowcount, colcount, order):
+    """Generate the (line, column) indices of a grid in a traversal order, by chunks of at most
+    `_ITER_TILE_CHUNK` cells
+    """
+    if rowcount == 0 or colcount == 0:
+        return
+    if order == 'row_major':
+        step = max(1, _ITER_TILE_CHUNK // colcount)
+        for start in range(0, rowcount, step):
+            rows, cols = np.mgrid[start:min(start + step, rowcount), 0:colcount]
+            for i in range(0, rows.size, _ITER_TILE_CHUNK):
+                yield rows.ravel()[i:i + _ITER_TILE_CHUNK], cols.ravel()[i:i + _ITER_TILE_CHUNK]
+    elif order == 'column_major':
+        for cols, rows in _iter_grid_indices(colcount, rowcount, 'row_major'):
+            yield rows, cols
+    elif order in ('z_order', 'hilbert'):
+        # The grid is covered by a line of square blocks of side a power of two, each block being
+        # traversed by a space-filling curve. A block is at most twice as large as the grid along
+        # its shortest side, the out of grid cells are skipped.
+        side = 1 << int(np.ceil(np.log2(min(rowcount, colcount))))
+        blockcount = -(-max(rowcount, colcount) // side)
+        curve = _z_order_curve if order == 'z_order' else _hilbert_curve
+        for start in range(0, blockcount * side * side, _ITER_TILE_CHUNK):
+            block, d = np.divmod(
+                np.arange(start, min(start + _ITER_TILE_CHUNK, blockcount * side * side)),
+                side * side,
+            )
+            x, y = curve(side, d)
+            if rowcount <= colcount:
+                x += block * side
+            else:
+                y += block * side
+            mask = (x < colcount) & (y < rowcount)
+            if mask.any():
+                yield y[mask], x[mask]
+    else:
+        assert False # pragma: no cover
+
+def _z_order_curve(side, d):
+    """Coordinates of the cells at positions `d` along the Z-order curve of a square grid"""
+    x = np.zeros_like(d)
+    y = np.zeros_like(d)
+    for bit in range(int(side).bit_length()):
+        x |= ((d >> (2 * bit)) & 1) << bit
+        y |= ((d >> (2 * bit + 1)) & 1) << bit
+    return x, y
+
+def _hilbert_curve(side, d):
+    """Coordinates of the cells at positions `d` along the Hilbert curve of a square grid"""
+    x = np.zeros_like(d)
+    y = np.zeros_like(d)
+    t = d.copy()
+    s = 1
+    while s < side:
+        rx = 1 & (t // 2)
+        ry = 1 & (t ^ rx)
+        flip = (ry == 0) & (rx == 1)
+        x = np.where(flip, s - 1 - x, x)
+        y = np.where(flip, s - 1 - y, y)
+        swap = ry == 0
+        x, y = np.where(swap, y, x), np.where(swap, x, y)
+        x += s * rx
+        y += s * ry
+        t //= 4
+        s *= 2
+    return x, y
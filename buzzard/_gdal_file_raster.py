@@ -1,12 +1,26 @@
+import os
 import uuid
 import contextlib
+import collections
+import threading
+import concurrent.futures
 
+import numpy as np
 from osgeo import gdal
 
 from buzzard._a_pooled_emissary_raster import APooledEmissaryRaster, ABackPooledEmissaryRaster
 from buzzard._a_gdal_raster import ABackGDALRaster
+from buzzard._gdal_file_raster_write_behind import BackGDALFileRasterWriteBehindMixin
 from buzzard._tools import conv
 from buzzard._footprint import Footprint
+from buzzard._proxy_descriptor import ProxyDescriptor
+
+# Minimum size of the chunks read by the threads when parallel reads are enabled (in pixels)
+_CHUNK_SIZE = 512
+
+def _is_north_up(fp):
+    _, a, b, _, d, e = fp.gt
+    return a > 0 and b == 0 and d == 0 and e < 0
 
 class GDALFileRaster(APooledEmissaryRaster):
     """Concrete class defining the behavior of a GDAL raster using a file"""
@@ -17,7 +31,83 @@ class GDALFileRaster(APooledEmissaryRaster):
         )
         super(GDALFileRaster, self).__init__(ds=ds, back=back)
 
-class BackGDALFileRaster(ABackPooledEmissaryRaster, ABackGDALRaster):
+    @property
+    def descriptor(self):
+        """Get a picklable description of this raster, used to reopen it in another process
+        (see `ProxyDescriptor`)"""
+        return ProxyDescriptor(
+            kind='raster',
+            path=self.path,
+            layer=None,
+            driver=self.driver,
+            open_options=self.open_options,
+            mode=self.mode,
+            ds_params=self._ds._params,
+            band_schema=self.band_schema,
+        )
+
+    def flush(self):
+        """Wait for the writes queued by `set_data` to be performed
+        (see `Write-behind` in DataSource).
+
+        The exception raised by the first failed write since the last call is raised here.
+        This method does not flush the driver cache to disk, see `deactivate`.
+        """
+        self._back.flush()
+
+    def build_overviews(self, factors, interpolation='cv_area', tile_size=(512, 512),
+                        max_workers=None):
+        """Build the overview levels of the raster using buzzard's remapping, the nodata values are
+        not interpolated, they are spread to the output like in `get_data`.
+
+        The first level is computed from the full resolution raster and each subsequent level from
+        the previous one. Each level is computed tile by tile in a pool of threads, with at most
+        `2 * max_workers` tiles in memory at once. The overviews are stored with the driver's
+        mechanism (internal overviews or external `.ovr` file if the raster is opened in read mode),
+        they are then used by `get_data` to perform cheap downsampled reads.
+
+        This method is not thread-safe.
+
+        Parameters
+        ----------
+        factors: sequence of int
+            Downsampling factors of the levels to build (like `[2, 4, 8, 16]`)
+        interpolation: one of {'cv_area', 'cv_nearest', 'cv_linear', 'cv_cubic', 'cv_lanczos4'}
+            Resampling method
+        tile_size: (int, int)
+            Size of the tiles processed by the workers (in pixels)
+        max_workers: int or None
+            Number of threads. If None: the number of CPUs is used
+
+        Example
+        -------
+        >>> ds = buzz.DataSource()
+        >>> rgb = ds.aopen_raster('path/to/rgb.tif', mode='w')
+        >>> rgb.build_overviews([2, 4, 8, 16], interpolation='cv_area')
+
+        """
+        factors = [int(factor) for factor in factors]
+        if not factors or min(factors) < 2: # pragma: no cover
+            raise ValueError('`factors` should be a non-empty sequence of int greater than 1')
+        if interpolation not in self._back.REMAP_INTERPOLATIONS: # pragma: no cover
+            raise ValueError('`interpolation` should be one of {}'.format(
+                set(self._back.REMAP_INTERPOLATIONS.keys())
+            ))
+        tile_size = np.asarray(tile_size, dtype=int).reshape(-1)
+        if tile_size.size != 2 or (tile_size <= 0).any(): # pragma: no cover
+            raise ValueError('`tile_size` should be a pair of positive int')
+        if max_workers is not None and max_workers < 1: # pragma: no cover
+            raise ValueError('`max_workers` should be None or greater than 0')
+
+        self._back.build_overviews(
+            factors=factors,
+            interpolation=interpolation,
+            tile_size=tile_size,
+            max_workers=max_workers,
+        )
+
+class BackGDALFileRaster(BackGDALFileRasterWriteBehindMixin, ABackPooledEmissaryRaster,
+                         ABackGDALRaster):
     """Implementation of GDALFileRaster"""
 
     def __init__(self, back_ds, allocator, open_options, mode):
@@ -32,6 +122,8 @@ class BackGDALFileRaster(ABackPooledEmissaryRaster, ABackGDALRaster):
             )
             band_schema = self._band_schema_of_gdal_ds(gdal_ds)
             dtype = conv.dtype_of_gdt_downcast(gdal_ds.GetRasterBand(1).DataType)
+            block_size = tuple(gdal_ds.GetRasterBand(1).GetBlockSize())
+            overview_infos = self._overview_infos_of_gdal_ds(gdal_ds)
             sr = gdal_ds.GetProjection()
             if sr == '':
                 wkt_stored = None
@@ -50,6 +142,8 @@ class BackGDALFileRaster(ABackPooledEmissaryRaster, ABackGDALRaster):
             path=path,
             uid=uid,
         )
+        self.block_size = block_size
+        self.overviews = self._overviews_of_infos(overview_infos)
 
     @contextlib.contextmanager
     def acquire_driver_object(self):
@@ -59,7 +153,219 @@ class BackGDALFileRaster(ABackPooledEmissaryRaster, ABackGDALRaster):
         ) as gdal_ds:
             yield gdal_ds
 
+    def get_data(self, fp, band_ids, dst_nodata, interpolation):
+        self.flush()
+        if self.back_ds.read_workers < 2:
+            return super(BackGDALFileRaster, self).get_data(
+                fp, band_ids, dst_nodata, interpolation,
+            )
+        fps = self._split_footprint(fp, band_ids, interpolation)
+        if len(fps) < 2:
+            return super(BackGDALFileRaster, self).get_data(
+                fp, band_ids, dst_nodata, interpolation,
+            )
+
+        array = np.empty(np.r_[fp.shape, len(band_ids)], self.dtype)
+
+        def _get_data(subfp):
+            array[subfp.slice_in(fp)] = super(BackGDALFileRaster, self).get_data(
+                subfp, band_ids, dst_nodata, interpolation,
+            )
+
+        futures = [self.back_ds.read_executor.submit(_get_data, subfp) for subfp in fps]
+        for future in futures:
+            future.result()
+        return array
+
+    def sample_points(self, xy, band_ids, dst_nodata, interpolation):
+        self.flush()
+        return super(BackGDALFileRaster, self).sample_points(
+            xy, band_ids, dst_nodata, interpolation,
+        )
+
+    def _split_footprint(self, fp, band_ids, interpolation):
+        """Split `fp` in sub-footprints that can be read in parallel, the sub-footprints are
+        aligned on chunks of blocks of the source raster (or overview) that will be read.
+        """
+        ovr = self.overview_of_footprint(fp, band_ids, interpolation)
+        if ovr is None:
+            srcfp, block_size = self.fp, self.block_size
+        else:
+            srcfp, block_size = self.overviews[ovr]
+        if not (_is_north_up(fp) and _is_north_up(srcfp)):
+            return [fp]
+
+        block_size = np.asarray(block_size)
+        chunk_size = block_size * np.ceil(_CHUNK_SIZE / block_size)
+        origin = np.asarray(~srcfp.affine * fp.tl)
+        ratio = fp.pxsize / srcfp.pxsize
+        bounds = []
+        for i in range(2):
+            # Chunks boundaries, in the source raster and then in `fp`
+            lines = np.arange(
+                max(np.ceil(origin[i] / chunk_size[i]), 1) * chunk_size[i],
+                min(origin[i] + fp.rsize[i] * ratio[i], srcfp.rsize[i]),
+                chunk_size[i],
+            )
+            lines = np.around((lines - origin[i]) / ratio[i]).astype(int)
+            lines = lines[(lines > 0) & (lines < fp.rsize[i])]
+            bounds.append(np.unique(np.r_[0, lines, fp.rsize[i]]))
+        xs, ys = bounds
+        return [
+            fp.clip(x0, y0, x1, y1)
+            for y0, y1 in zip(ys[:-1], ys[1:])
+            for x0, x1 in zip(xs[:-1], xs[1:])
+        ]
+
+    def sample_bands(self, fp, band_ids, ovr=None):
+        if not self.back_ds.block_cache_enabled:
+            return super(BackGDALFileRaster, self).sample_bands(fp, band_ids, ovr)
+
+        if ovr is None:
+            srcfp, (bw, bh) = self.fp, self.block_size
+        else:
+            srcfp, (bw, bh) = self.overviews[ovr]
+        rtlx, rtly = srcfp.spatial_to_raster(fp.tl)
+        assert rtlx >= 0 and rtlx < srcfp.rsizex
+        assert rtly >= 0 and rtly < srcfp.rsizey
+        xs = range(rtlx // bw, (rtlx + fp.rsizex - 1) // bw + 1)
+        ys = range(rtly // bh, (rtly + fp.rsizey - 1) // bh + 1)
+
+        dstarray = np.empty(np.r_[fp.shape, len(band_ids)], self.dtype)
+
+        def _blit(i, block_index, block):
+            bx, by = block_index
+            x0, y0 = max(rtlx, bx * bw), max(rtly, by * bh)
+            x1 = min(rtlx + fp.rsizex, bx * bw + block.shape[1])
+            y1 = min(rtly + fp.rsizey, by * bh + block.shape[0])
+            dstarray[y0 - rtly:y1 - rtly, x0 - rtlx:x1 - rtlx, i] = (
+                block[y0 - by * bh:y1 - by * bh, x0 - bx * bw:x1 - bx * bw]
+            )
+
+        # Lookup blocks in cache
+        missing = collections.OrderedDict()
+        for i, band_id in enumerate(band_ids):
+            for block_index in ((bx, by) for by in ys for bx in xs):
+                block = self.back_ds.get_cached_block((self.uid, band_id, ovr, block_index))
+                if block is None:
+                    missing.setdefault(block_index, []).append((i, band_id))
+                else:
+                    _blit(i, block_index, block)
+        if not missing:
+            return dstarray
+
+        # Decode missing blocks, all bands of a block at once
+        with self.acquire_driver_object() as gdal_ds:
+            for block_index, l in missing.items():
+                bx, by = block_index
+                w = min(bw, srcfp.rsizex - bx * bw)
+                h = min(bh, srcfp.rsizey - by * bh)
+                blocks = np.empty((h, w, len(l)), self.dtype)
+                self.read_bands_driver(
+                    bx * bw, by * bh, w, h, [band_id for _, band_id in l], gdal_ds, blocks, ovr
+                )
+                for j, (i, band_id) in enumerate(l):
+                    block = np.ascontiguousarray(blocks[..., j])
+                    self.back_ds.put_cached_block((self.uid, band_id, ovr, block_index), block)
+                    _blit(i, block_index, block)
+        return dstarray
+
+    def set_data(self, array, fp, band_ids, interpolation, mask):
+        if self.write_behind_enabled:
+            self.queue_write(array, fp, band_ids, interpolation, mask)
+        else:
+            self.write_data(array, fp, band_ids, interpolation, mask)
+
+    def write_data(self, array, fp, band_ids, interpolation, mask):
+        super(BackGDALFileRaster, self).set_data(array, fp, band_ids, interpolation, mask)
+        self.back_ds.evict_cached_blocks(self.uid)
+
+    def fill(self, value, band_ids):
+        self.flush()
+        super(BackGDALFileRaster, self).fill(value, band_ids)
+        self.back_ds.evict_cached_blocks(self.uid)
+
+    def deactivate(self):
+        self.flush()
+        super(BackGDALFileRaster, self).deactivate()
+
+    def close(self):
+        self.stop_write_behind()
+        self.back_ds.evict_cached_blocks(self.uid)
+        super(BackGDALFileRaster, self).close()
+        self._raise_write_error()
+
+    def build_overviews(self, factors, interpolation, tile_size, max_workers):
+        self.flush()
+        band_ids = list(range(1, len(self) + 1))
+        nodata = self.nodata
+        lock = threading.Lock()
+
+        def _build_tile(src_ovr, dst_ovr, tile):
+            srcfp = self.fp if src_ovr is None else self.overviews[src_ovr][0]
+            dstfp = self.overviews[dst_ovr][0]
+            samplefp = self.dilate_sampling_footprint(tile, interpolation, srcfp)
+            with lock:
+                array = self.sample_bands_driver(samplefp, band_ids, gdal_ds, src_ovr)
+            array = self.remap(
+                samplefp,
+                tile,
+                array=array,
+                mask=None,
+                src_nodata=nodata,
+                dst_nodata=nodata or 0,
+                mask_mode='erode',
+                interpolation=interpolation,
+            )
+            array = array.astype(self.dtype, copy=False)
+            x, y = dstfp.spatial_to_raster(tile.tl)
+            with lock:
+                for i, band_id in enumerate(band_ids):
+                    gdal_band = gdal_ds.GetRasterBand(band_id).GetOverview(dst_ovr)
+                    gdal_band.WriteArray(array[..., i], int(x), int(y))
+
+        # Flush the pending writes of the other driver objects
+        self.back_ds.deactivate(self.uid)
+        self.back_ds.evict_cached_blocks(self.uid)
+
+        with self.acquire_driver_object() as gdal_ds:
+            # Allocate the overview levels without computing them
+            err = gdal_ds.BuildOverviews('NONE', list(factors))
+            if err: # pragma: no cover
+                raise RuntimeError('Could not build overviews of `{}` (gdal error: `{}`)'.format(
+                    self.path, str(gdal.GetLastErrorMsg()).strip('\n')
+                ))
+            self.overviews = self._overviews_of_infos(self._overview_infos_of_gdal_ds(gdal_ds))
+
+            # Compute the levels from the finest to the coarsest, each level is computed from the
+            # previous one
+            levels = sorted({
+                min(
+                    range(len(self.overviews)),
+                    key=lambda i: abs(self.overviews[i][0].rsizex - self.fp.rsizex / factor),
+                )
+                for factor in factors
+            }, key=lambda i: -self.overviews[i][0].rsizex)
+            max_workers = max_workers or os.cpu_count() or 1
+            with concurrent.futures.ThreadPoolExecutor(max_workers) as ex:
+                for src_ovr, dst_ovr in zip([None] + levels[:-1], levels):
+                    futures = collections.deque()
+                    tiles = self.overviews[dst_ovr][0].tile(tile_size, boundary_effect='shrink')
+                    for tile in tiles.flat:
+                        # Bound the number of tiles in memory
+                        if len(futures) >= 2 * max_workers:
+                            futures.popleft().result()
+                        futures.append(ex.submit(_build_tile, src_ovr, dst_ovr, tile))
+                    while futures:
+                        futures.popleft().result()
+            gdal_ds.FlushCache()
+
+        self.back_ds.deactivate(self.uid)
+        self.back_ds.evict_cached_blocks(self.uid)
+
     def delete(self):
+        self.stop_write_behind()
+        self._wb_error = None
         super(BackGDALFileRaster, self).delete()
 
         dr = gdal.GetDriverByName(self.driver)
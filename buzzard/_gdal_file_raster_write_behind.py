@@ -0,0 +1,235 @@
+import collections
+import threading
+import queue
+
+import numpy as np
+
+from buzzard._footprint import Footprint
+
+# Queued by `flush` to have the staged pixels written
+_FLUSH = object()
+
+class BackGDALFileRasterWriteBehindMixin(object):
+    """Private mixin for the GDALFileRaster class containing the subroutines of the write-behind
+    mode, where the `set_data` are queued and performed by a background thread.
+
+    The background thread writes whole blocks of the file. The pixels of the writes that are on
+    the grid of the raster and without mask are staged in the blocks they cover, a block is
+    written once all its pixels are staged, the neighbouring blocks completed by a same write are
+    written together. This way a compressed file encodes each block once, even when the writes
+    are not aligned on the blocks. The blocks still partially staged are written by `flush`, or
+    before a write that cannot be staged.
+    The exception raised by a write is stored and raised back to the caller by the next `set_data`,
+    `get_data` or `flush`.
+    """
+
+    def __init__(self, **kwargs):
+        super(BackGDALFileRasterWriteBehindMixin, self).__init__(**kwargs)
+        self._wb_queue = None
+        self._wb_thread = None
+        self._wb_error = None
+
+    @property
+    def write_behind_enabled(self):
+        return self.back_ds.write_queue_size > 0
+
+    def queue_write(self, array, fp, band_ids, interpolation, mask):
+        """Queue a write, block while the queue is full"""
+        self._raise_write_error()
+        if self._wb_thread is None:
+            self._wb_queue = queue.Queue(self.back_ds.write_queue_size)
+            self._wb_thread = threading.Thread(
+                target=self._write_behind_loop,
+                name='buzzard-write-behind-{}'.format(self.uid),
+            )
+            self._wb_thread.daemon = True
+            self._wb_thread.start()
+        self._wb_queue.put((
+            array.copy(), fp, band_ids, interpolation, None if mask is None else mask.copy(),
+        ))
+
+    def flush(self):
+        """Wait for the queued writes to be performed and raise the first error encountered"""
+        if self._wb_queue is not None:
+            self._wb_queue.put(_FLUSH)
+            self._wb_queue.join()
+        self._raise_write_error()
+
+    def stop_write_behind(self):
+        """Wait for the queued writes to be performed and stop the background thread"""
+        if self._wb_thread is not None:
+            self._wb_queue.put(None)
+            self._wb_thread.join()
+            self._wb_thread = None
+            self._wb_queue = None
+
+    def write_data(self, array, fp, band_ids, interpolation, mask): # pragma: no cover
+        raise NotImplementedError('BackGDALFileRasterWriteBehindMixin.write_data is virtual pure')
+
+    def _raise_write_error(self):
+        err, self._wb_error = self._wb_error, None
+        if err is not None:
+            raise err
+
+    def _write_behind_loop(self):
+        staging = _BlockStaging(self.fp, self.block_size)
+        while True:
+            item = self._wb_queue.get()
+            try:
+                if item is None or item is _FLUSH:
+                    writes = staging.pop_all()
+                else:
+                    writes = self._stage_write(staging, item)
+                for write in writes:
+                    try:
+                        self.write_data(*write)
+                    except Exception as e: # pylint: disable=broad-except
+                        if self._wb_error is None:
+                            self._wb_error = e
+            finally:
+                self._wb_queue.task_done()
+            if item is None:
+                return
+
+    def _stage_write(self, staging, item):
+        """Stage the pixels of a queued write, return the writes to perform now"""
+        array, fp, band_ids, _, mask = item
+        if mask is not None or not fp.same_grid(self.fp):
+            return staging.pop_all() + [item]
+        if not fp.share_area(self.fp):
+            return []
+        writes = []
+        if not staging.accepts(array, band_ids):
+            writes += staging.pop_all()
+        x, y = np.around(self.fp.spatial_to_raster(fp.tl)).astype(int)
+        return writes + staging.add(array, x, y, band_ids)
+
+class _BlockStaging(object):
+    """Pixels of the writes to a raster grouped by block of the file, until the blocks are
+    entirely covered.
+    """
+
+    def __init__(self, fp, block_size):
+        self.fp = fp
+        self.block_size = tuple(int(v) for v in block_size)
+        self.blocks = collections.OrderedDict() # (bx, by) -> (array, covered)
+        self.band_ids = None
+        self.dtype = None
+
+    def accepts(self, array, band_ids):
+        """Can `array` be staged along with the pixels already staged"""
+        return not self.blocks or (band_ids == self.band_ids and array.dtype == self.dtype)
+
+    def add(self, array, x, y, band_ids):
+        """Stage `array` whose top left pixel is at (x, y) in the raster, return the writes of the
+        blocks completed
+        """
+        # Crop to the raster
+        h, w = array.shape[:2]
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, self.fp.rsizex), min(y + h, self.fp.rsizey)
+        array = array[y0 - y:y1 - y, x0 - x:x1 - x]
+        self.band_ids, self.dtype = band_ids, array.dtype
+
+        bw, bh = self.block_size
+        completed = []
+        for by in range(y0 // bh, -(-y1 // bh)):
+            for bx in range(x0 // bw, -(-x1 // bw)):
+                bx0, by0, bx1, by1 = self._block_rect(bx, by)
+                cx0, cy0, cx1, cy1 = max(x0, bx0), max(y0, by0), min(x1, bx1), min(y1, by1)
+                block = self.blocks.get((bx, by))
+                if block is None:
+                    if (cx0, cy0, cx1, cy1) == (bx0, by0, bx1, by1):
+                        completed.append((bx, by))
+                        continue
+                    block = (
+                        np.empty((by1 - by0, bx1 - bx0, len(band_ids)), array.dtype),
+                        np.zeros((by1 - by0, bx1 - bx0), bool),
+                    )
+                    self.blocks[(bx, by)] = block
+                sl = slice(cy0 - by0, cy1 - by0), slice(cx0 - bx0, cx1 - bx0)
+                block[0][sl] = array[cy0 - y0:cy1 - y0, cx0 - x0:cx1 - x0]
+                block[1][sl] = True
+                if block[1].all():
+                    completed.append((bx, by))
+
+        writes = []
+        for rbx0, rby0, rbx1, rby1 in _rects_of_blocks(completed):
+            rx0, ry0, _, _ = self._block_rect(rbx0, rby0)
+            _, _, rx1, ry1 = self._block_rect(rbx1 - 1, rby1 - 1)
+            staged = [
+                ((bx, by), self.blocks.pop((bx, by)))
+                for by in range(rby0, rby1)
+                for bx in range(rbx0, rbx1)
+                if (bx, by) in self.blocks
+            ]
+            if not staged:
+                # The blocks are covered by `array` alone, no copy
+                rect_array = array[ry0 - y0:ry1 - y0, rx0 - x0:rx1 - x0]
+            else:
+                rect_array = np.empty((ry1 - ry0, rx1 - rx0, len(band_ids)), array.dtype)
+                cx0, cy0, cx1, cy1 = max(x0, rx0), max(y0, ry0), min(x1, rx1), min(y1, ry1)
+                rect_array[cy0 - ry0:cy1 - ry0, cx0 - rx0:cx1 - rx0] = (
+                    array[cy0 - y0:cy1 - y0, cx0 - x0:cx1 - x0]
+                )
+                for (bx, by), (block_array, _) in staged:
+                    bx0, by0, bx1, by1 = self._block_rect(bx, by)
+                    rect_array[by0 - ry0:by1 - ry0, bx0 - rx0:bx1 - rx0] = block_array
+            writes.append(self._write_of_rect(rect_array, rx0, ry0, None))
+        return writes
+
+    def pop_all(self):
+        """Return the writes of all the pixels staged"""
+        writes = []
+        for (bx, by), (array, covered) in self.blocks.items():
+            bx0, by0, _, _ = self._block_rect(bx, by)
+            rows = np.flatnonzero(covered.any(axis=1))
+            cols = np.flatnonzero(covered.any(axis=0))
+            sl = slice(rows[0], rows[-1] + 1), slice(cols[0], cols[-1] + 1)
+            array, covered = array[sl], covered[sl]
+            writes.append(self._write_of_rect(
+                array, bx0 + sl[1].start, by0 + sl[0].start, None if covered.all() else covered,
+            ))
+        self.blocks.clear()
+        return writes
+
+    def _block_rect(self, bx, by):
+        bw, bh = self.block_size
+        return (
+            bx * bw, by * bh,
+            min((bx + 1) * bw, self.fp.rsizex), min((by + 1) * bh, self.fp.rsizey),
+        )
+
+    def _write_of_rect(self, array, x, y, mask):
+        h, w = array.shape[:2]
+        gt = self.fp.gt
+        gt[0], gt[3] = self.fp.affine * (x, y)
+        fp = Footprint(gt=gt, rsize=(w, h))
+        return array, fp, self.band_ids, None, mask
+
+def _rects_of_blocks(indices):
+    """Group block indices in rectangles of blocks `(bx0, by0, bx1, by1)`, the runs of blocks of a
+    row are merged with the same runs of the next rows
+    """
+    rows = collections.defaultdict(list)
+    for bx, by in indices:
+        rows[by].append(bx)
+    rects = []
+    opened = {}
+    for by in sorted(rows):
+        bxs = sorted(rows[by])
+        runs = []
+        for bx in bxs:
+            if runs and runs[-1][1] == bx:
+                runs[-1][1] = bx + 1
+            else:
+                runs.append([bx, bx + 1])
+        for bx0, bx1 in runs:
+            rect = opened.get((bx0, bx1))
+            if rect is not None and rect[3] == by:
+                rect[3] = by + 1
+            else:
+                rect = [bx0, by, bx1, by + 1]
+                opened[(bx0, bx1)] = rect
+                rects.append(rect)
+    return [tuple(rect) for rect in rects]
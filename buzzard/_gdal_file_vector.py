@@ -7,6 +7,7 @@ from osgeo import gdal
 from buzzard._a_pooled_emissary_vector import APooledEmissaryVector, ABackPooledEmissaryVector
 from buzzard._a_gdal_vector import ABackGDALVector
 from buzzard._tools import conv
+from buzzard._proxy_descriptor import ProxyDescriptor
 
 class GDALFileVector(APooledEmissaryVector):
     """Concrete class defining the behavior of a GDAL vector using a file"""
@@ -17,6 +18,20 @@ class GDALFileVector(APooledEmissaryVector):
         )
         super(GDALFileVector, self).__init__(ds=ds, back=back)
 
+    @property
+    def descriptor(self):
+        """Get a picklable description of this vector, used to reopen it in another process
+        (see `ProxyDescriptor`)"""
+        return ProxyDescriptor(
+            kind='vector',
+            path=self.path,
+            layer=self.layer,
+            driver=self.driver,
+            open_options=self.open_options,
+            mode=self.mode,
+            ds_params=self._ds._params,
+        )
+
 class BackGDALFileVector(ABackPooledEmissaryVector, ABackGDALVector):
     """Implementation of GDALFileVector"""
 
@@ -32,6 +32,8 @@ class BackGDALMemRaster(ABackEmissaryRaster, ABackGDALRaster):
         )
         band_schema = self._band_schema_of_gdal_ds(gdal_ds)
         dtype = conv.dtype_of_gdt_downcast(gdal_ds.GetRasterBand(1).DataType)
+        block_size = tuple(gdal_ds.GetRasterBand(1).GetBlockSize())
+        overview_infos = self._overview_infos_of_gdal_ds(gdal_ds)
         sr = gdal_ds.GetProjection()
         if sr == '':
             wkt_stored = None
@@ -49,6 +51,8 @@ class BackGDALMemRaster(ABackEmissaryRaster, ABackGDALRaster):
             open_options=open_options,
             path=path,
         )
+        self.block_size = block_size
+        self.overviews = self._overviews_of_infos(overview_infos)
 
     @contextlib.contextmanager
     def acquire_driver_object(self):
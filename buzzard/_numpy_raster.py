@@ -53,12 +53,17 @@ class BackNumpyRaster(ABackStoredRaster):
             mode=mode,
         )
 
+        # The array is in memory, it is seen as a single block
+        self.block_size = tuple(fp.rsize.tolist())
+
         self._should_tranform = (
             any(v != 0 for v in band_schema['offset']) or
             any(v != 1 for v in band_schema['scale'])
         )
 
     def get_data(self, fp, band_ids, dst_nodata, interpolation):
+        if self.warping:
+            return self.get_warped_data(fp, band_ids, dst_nodata, interpolation)
         samplefp = self.build_sampling_footprint(fp, interpolation)
         if samplefp is None:
             return np.full(
@@ -66,10 +71,7 @@ class BackNumpyRaster(ABackStoredRaster):
                 dst_nodata,
                 self.dtype
             )
-        key = list(samplefp.slice_in(self.fp)) + [self._best_indexers_of_band_ids(band_ids)]
-        array = self._arr[key]
-        if self._should_tranform:
-            array = array * self.band_schema['scale'] + self.band_schema['offset']
+        array = self.sample_bands(samplefp, band_ids)
         array = self.remap(
             samplefp,
             fp,
@@ -83,6 +85,14 @@ class BackNumpyRaster(ABackStoredRaster):
         array = array.astype(self.dtype, copy=False)
         return array
 
+    def sample_bands(self, fp, band_ids):
+        """Read the pixels of `fp` (that lies inside `self.fp` and on the same grid)"""
+        key = list(fp.slice_in(self.fp)) + [self._best_indexers_of_band_ids(band_ids)]
+        array = self._arr[key]
+        if self._should_tranform:
+            array = array * self.band_schema['scale'] + self.band_schema['offset']
+        return array
+
     def set_data(self, array, fp, band_ids, interpolation, mask):
         if not fp.share_area(self.fp):
             return
@@ -0,0 +1,136 @@
+"""Picklable descriptions of the file proxies, used to reopen them in other processes"""
+
+import os
+import threading
+
+# Proxies opened by `ProxyDescriptor.open` in the current process, the DataSources are shared by
+# the descriptors having the same DataSource parameters.
+_OPENED_LOCK = threading.Lock()
+_OPENED_PID = [None]
+_OPENED_DATASOURCES = {}
+_OPENED_PROXIES = {}
+
+class ProxyDescriptor(object):
+    """Picklable description of a file opened in a DataSource, obtained with the `descriptor`
+    property of a `GDALFileRaster`, of a `GDALFileVector` or of a `SharedNumpyRaster`.
+
+    A descriptor can be sent to another process (like a worker of a
+    `concurrent.futures.ProcessPoolExecutor`), where `open` rebuilds the proxy in a DataSource
+    constructed with the same parameters as the original one. Within a process, the proxies are
+    opened once and shared by all the calls to `open`, they are pooled like any other
+    `GDALFileRaster` or `GDALFileVector`. The descriptor of a `SharedNumpyRaster` attaches its
+    shared memory block.
+
+    GDAL does not support concurrent writes to a same file from several processes, the files
+    opened in mode 'w' should only be written by one process at a time, and should be flushed to
+    disk (see `deactivate`) before being read by other processes. Use `read_only` to send a
+    description of a file opened in mode 'w' to the processes that only read it.
+
+    Example
+    -------
+    >>> ds = buzz.DataSource(sr_work='EPSG:32632', block_cache_size=256 * 1024 ** 2)
+    >>> desc = ds.aopen_raster('path/to/dsm.tif').descriptor
+    >>> def mean_height(desc, fp):
+    ...     return desc.open().get_data(fp=fp).mean()
+    >>> with concurrent.futures.ProcessPoolExecutor() as ex:
+    ...     means = list(ex.map(mean_height, [desc] * len(tiles), tiles))
+
+    """
+
+    __slots__ = [
+        'kind', 'path', 'layer', 'driver', 'open_options', 'mode', 'ds_params', 'band_schema',
+        'fp', 'dtype', 'band_count', 'wkt',
+    ]
+
+    def __init__(self, kind, path, layer, driver, open_options, mode, ds_params,
+                 band_schema=None, fp=None, dtype=None, band_count=None, wkt=None):
+        if kind not in {'raster', 'vector', 'shared_raster'}: # pragma: no cover
+            raise ValueError('`kind` should be one of {"raster", "vector", "shared_raster"}')
+        self.kind = kind
+        self.path = path
+        self.layer = layer
+        self.driver = driver
+        self.open_options = tuple(open_options)
+        self.mode = mode
+        self.ds_params = tuple(sorted(dict(ds_params).items()))
+        self.band_schema = band_schema
+        self.fp = fp
+        self.dtype = dtype
+        self.band_count = band_count
+        self.wkt = wkt
+
+    def open(self):
+        """Get the proxy described, opened in a DataSource of the current process
+
+        Returns
+        -------
+        GDALFileRaster or GDALFileVector or SharedNumpyRaster
+        """
+        from buzzard._datasource import DataSource
+
+        with _OPENED_LOCK:
+            # The proxies inherited from a parent process by `fork` are not reused
+            if _OPENED_PID[0] != os.getpid():
+                _OPENED_PID[0] = os.getpid()
+                _OPENED_DATASOURCES.clear()
+                _OPENED_PROXIES.clear()
+
+            prox = _OPENED_PROXIES.get(self)
+            if prox is not None and hasattr(prox, '_back'):
+                return prox
+            ds = _OPENED_DATASOURCES.get(self.ds_params)
+            if ds is None:
+                ds = DataSource(**dict(self.ds_params))
+                _OPENED_DATASOURCES[self.ds_params] = ds
+            if self.kind == 'raster':
+                prox = ds.aopen_raster(self.path, self.driver, self.open_options, self.mode)
+            elif self.kind == 'shared_raster':
+                prox = ds.aattach_shared_raster(
+                    self.path, self.fp, self.dtype, self.band_count, self.band_schema, self.wkt,
+                    self.mode,
+                )
+            else:
+                prox = ds.aopen_vector(
+                    self.path, self.layer, self.driver, self.open_options, self.mode
+                )
+            _OPENED_PROXIES[self] = prox
+            return prox
+
+    def read_only(self):
+        """Get the description of the same proxy opened in mode 'r', to read a file from several
+        processes while it is only written by this one.
+
+        Returns
+        -------
+        ProxyDescriptor
+        """
+        return type(self)(
+            self.kind, self.path, self.layer, self.driver, self.open_options, 'r',
+            self.ds_params, self.band_schema, self.fp, self.dtype, self.band_count, self.wkt,
+        )
+
+    def _key(self):
+        return (
+            self.kind, self.path, self.layer, self.driver, self.open_options, self.mode,
+            self.ds_params, self.fp, self.dtype, self.band_count, self.wkt,
+        )
+
+    def __eq__(self, other):
+        return isinstance(other, ProxyDescriptor) and self._key() == other._key()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __reduce__(self):
+        return (type(self), (
+            self.kind, self.path, self.layer, self.driver, self.open_options, self.mode,
+            self.ds_params, self.band_schema, self.fp, self.dtype, self.band_count, self.wkt,
+        ))
+
+    def __repr__(self):
+        return 'ProxyDescriptor({}, path={!r}, driver={!r}, mode={!r})'.format(
+            self.kind, self.path, self.driver, self.mode,
+        )
@@ -0,0 +1,118 @@
+import os
+
+import numpy as np
+
+try:
+    from multiprocessing import shared_memory, resource_tracker
+except ImportError: # pragma: no cover
+    shared_memory = None
+
+from buzzard._numpy_raster import NumpyRaster, BackNumpyRaster
+from buzzard._proxy_descriptor import ProxyDescriptor
+
+class SharedNumpyRaster(NumpyRaster):
+    """Concrete class defining the behavior of a numpy array stored in a shared memory block.
+
+    The block is allocated by `DataSource.create_shared_raster` and can be attached by other
+    processes with `DataSource.attach_shared_raster`, given its `name`, or with the `descriptor`
+    of this raster. All the rasters attached to a block read and write the same pixels without
+    copies, the writes to overlapping windows from several processes should be synchronized by
+    the user.
+
+    The block is freed when the raster that allocated it is closed, the rasters attached to it
+    should be closed before.
+    """
+
+    def __init__(self, ds, fp, fp_origin, shm, owner, dtype, band_count, band_schema,
+                 band_schema_origin, wkt, mode):
+        back = BackSharedNumpyRaster(
+            ds._back, fp, fp_origin, shm, owner, dtype, band_count, band_schema,
+            band_schema_origin, wkt, mode,
+        )
+        self._arr_shape = back._arr.shape
+        self._arr_address = back._arr.__array_interface__['data'][0]
+        super(NumpyRaster, self).__init__(ds=ds, back=back)
+
+    @property
+    def name(self):
+        """Get the name of the shared memory block, used to attach it from another process"""
+        return self._back.shm.name
+
+    @property
+    def descriptor(self):
+        """Get a picklable description of this raster, used to attach it in another process
+        (see `ProxyDescriptor`)"""
+        return ProxyDescriptor(
+            kind='shared_raster',
+            path=self.name,
+            layer=None,
+            driver='',
+            open_options=(),
+            mode=self.mode,
+            ds_params=self._ds._params,
+            band_schema=self._back.band_schema_origin,
+            fp=self._back.fp_origin,
+            dtype=self.dtype,
+            band_count=len(self),
+            wkt=self.wkt_stored,
+        )
+
+class BackSharedNumpyRaster(BackNumpyRaster):
+    """Implementation of SharedNumpyRaster"""
+
+    def __init__(self, back_ds, fp, fp_origin, shm, owner, dtype, band_count, band_schema,
+                 band_schema_origin, wkt, mode):
+        shape = tuple(fp.shape) + (band_count,)
+        if shm.size < np.prod(shape) * dtype.itemsize: # pragma: no cover
+            raise ValueError('The shared memory block `{}` is too small for a raster of shape {} '
+                             'and dtype {}'.format(shm.name, shape, dtype))
+        array = np.ndarray(shape, dtype, buffer=shm.buf)
+        if mode != 'w':
+            array.flags.writeable = False
+        self.shm = shm
+        self.owner = owner
+        self.fp_origin = fp_origin
+        self.band_schema_origin = band_schema_origin
+        super(BackSharedNumpyRaster, self).__init__(
+            back_ds, fp, array, band_schema, wkt, mode
+        )
+
+    def close(self):
+        super(BackSharedNumpyRaster, self).close()
+        shm = self.shm
+        del self.shm
+        try:
+            shm.close()
+        except BufferError: # pragma: no cover
+            # Some views of the array are still referenced, the block is unmapped when they are
+            # garbage collected
+            pass
+        if self.owner:
+            if os.name == 'posix':
+                # A raster attached by a process sharing the resource tracker of this process may
+                # have unregistered the block (see `attach_block`), `unlink` expects it registered
+                resource_tracker.register(shm._name, 'shared_memory')
+            shm.unlink()
+
+    @staticmethod
+    def create_block(nbytes):
+        """Allocate a new shared memory block of `nbytes` bytes, filled with zeros"""
+        if shared_memory is None: # pragma: no cover
+            raise RuntimeError('Shared rasters require python>=3.8')
+        return shared_memory.SharedMemory(create=True, size=max(1, int(nbytes)))
+
+    @staticmethod
+    def attach_block(name):
+        """Attach an existing shared memory block"""
+        if shared_memory is None: # pragma: no cover
+            raise RuntimeError('Shared rasters require python>=3.8')
+        # The block should not be registered to the resource tracker of this process, that would
+        # free it when this process exits
+        try:
+            return shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Before python 3.13 the block is always registered
+            shm = shared_memory.SharedMemory(name=name)
+            if os.name == 'posix':
+                resource_tracker.unregister(shm._name, 'shared_memory')
+            return shm
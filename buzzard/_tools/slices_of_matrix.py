@@ -1,13 +1,32 @@
 import numpy as np
 
-def _slices_of_vector(vec):
-    """Generates slices of oneline mask parts"""
-    assert vec.ndim == 1
-    diff = np.diff(np.r_[[False], vec, [False]].astype('int'))
-    starts = np.where(diff == 1)[0]
-    ends = np.where(diff == -1)[0]
-    for s, e in zip(starts, ends):
-        yield slice(s, e)
+def rects_of_matrix(mask):
+    """Decompose a 2d mask in rectangles, the consecutive identical rows are grouped together.
+
+    Returns
+    -------
+    np.ndarray of shape (N, 4)
+        Rectangles as (ystart, yend, xstart, xend), sorted by ystart and xstart
+    """
+    mask = np.asarray(mask, bool)
+    assert mask.ndim == 2
+    h, w = mask.shape
+    if h == 0 or w == 0:
+        return np.empty((0, 4), int)
+
+    # Groups of identical consecutive rows
+    ystarts = np.r_[0, np.flatnonzero((mask[1:] != mask[:-1]).any(axis=1)) + 1]
+    yends = np.r_[ystarts[1:], h]
+
+    # Runs of True in the first row of each group
+    rows = mask[ystarts]
+    padded = np.zeros((rows.shape[0], w + 2), 'int8')
+    padded[:, 1:-1] = rows
+    diff = np.diff(padded, axis=1)
+    groups, xstarts = np.nonzero(diff == 1)
+    _, xends = np.nonzero(diff == -1)
+
+    return np.stack([ystarts[groups], yends[groups], xstarts, xends], axis=-1)
 
 def slices_of_matrix(mask):
     """Generates slices of mask parts"""
@@ -15,36 +34,5 @@ def slices_of_matrix(mask):
         yield slice(0, None), slice(0, None)
         return
 
-    ystart = None
-    y = 0
-    while True:
-        # Iteration analysis
-        if y == 0:
-            begin_group = True
-            send_group = False
-            stop = False
-        elif y == mask.shape[0]:
-            begin_group = False
-            send_group = True
-            stop = True
-        elif (mask[y - 1] != mask[y]).any():
-            begin_group = True
-            send_group = True
-            stop = False
-        else:
-            begin_group = False
-            send_group = False
-            stop = False
-
-        # Actions
-        if send_group:
-            yslice = slice(ystart, y)
-            for xslice in _slices_of_vector(mask[ystart]):
-                yield yslice, xslice
-        if begin_group:
-            ystart = y
-
-        # Loop control
-        if stop:
-            break
-        y += 1
+    for ystart, yend, xstart, xend in rects_of_matrix(mask).tolist():
+        yield slice(ystart, yend), slice(xstart, xend)
@@ -0,0 +1,37 @@
+"""Microbenchmark of the construction of the Footprints derived from a Footprint
+
+Run it with `python -m buzzard.test.bench_footprint`, it prints the best time per call out of 5
+runs for each operation.
+"""
+
+from __future__ import division, print_function
+import timeit
+
+import buzzard as buzz
+
+REPEAT = 5
+
+def _bench(stmt, number):
+    """Best time per call of `stmt` in seconds"""
+    return min(timeit.repeat(stmt, repeat=REPEAT, number=number)) / number
+
+def _m():
+    fp = buzz.Footprint(tl=(0, 0), size=(10000, 10000), rsize=(10000, 10000))
+    small = fp.clip(0, 0, 512, 512)
+    other = small.move((256.5, -256.5))
+    cases = [
+        ('tile((100, 100)), 10000 tiles', lambda: fp.tile((100, 100)), 3),
+        ('clip', lambda: fp.clip(10, 10, 522, 522), 10000),
+        ('dilate(1)', lambda: small.dilate(1), 10000),
+        ('move', lambda: small.move((10, -10)), 10000),
+        ('intersection', lambda: small.intersection(other), 1000),
+    ]
+    for name, stmt, number in cases:
+        duration = _bench(stmt, number)
+        if duration >= 1e-3:
+            print('{:<32}{:>10.1f}ms'.format(name, duration * 1e3))
+        else:
+            print('{:<32}{:>10.1f}us'.format(name, duration * 1e6))
+
+if __name__ == '__main__':
+    _m()
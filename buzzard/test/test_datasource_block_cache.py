@@ -0,0 +1,106 @@
+"""Tests for the raster blocks cache of the DataSource"""
+
+# pylint: disable=redefined-outer-name
+
+from __future__ import division, print_function
+import os
+import tempfile
+import uuid
+
+import numpy as np
+import pytest
+
+import buzzard as buzz
+
+BLOCK_SIZE = 16
+BAND_COUNT = 3
+
+@pytest.fixture(scope='module')
+def fp():
+    return buzz.Footprint(tl=(100, 110), size=(100, 90), rsize=(100, 90))
+
+@pytest.fixture(scope='module')
+def values(fp):
+    return np.dstack([
+        np.add(*fp.meshgrid_raster) * (i + 1)
+        for i in range(BAND_COUNT)
+    ]).astype('float32')
+
+@pytest.fixture(scope='module')
+def path(fp, values):
+    path = '{}/{}.tif'.format(tempfile.gettempdir(), uuid.uuid4())
+    ds = buzz.DataSource()
+    options = [
+        'TILED=YES', 'BLOCKXSIZE={}'.format(BLOCK_SIZE), 'BLOCKYSIZE={}'.format(BLOCK_SIZE),
+        'COMPRESS=DEFLATE',
+    ]
+    with ds.acreate_raster(path, fp, 'float32', BAND_COUNT, options=options).close as r:
+        r.set_data(values, band=-1)
+    yield path
+    os.remove(path)
+
+def test_cache_hits(fp, values, path):
+    ds = buzz.DataSource(block_cache_size=1024 ** 3, allow_interpolation=True)
+    r = ds.aopen_raster(path)
+    assert r._back.block_size == (BLOCK_SIZE, BLOCK_SIZE)
+
+    tiles = fp.tile((30, 30), 10, 10, boundary_effect='shrink')
+    for tile in tiles.flat:
+        arr = r.get_data(fp=tile, band=-1)
+        assert (arr == values[tile.slice_in(fp)]).all()
+
+    block_count = np.prod(np.ceil(fp.rsize / BLOCK_SIZE)) * BAND_COUNT
+    hits, misses, maxsize, currsize = ds.block_cache_info()
+    assert misses == block_count
+    assert hits > misses
+    assert maxsize == 1024 ** 3
+    assert currsize == values.nbytes
+
+    # Second pass only hits
+    for tile in tiles.flat:
+        arr = r.get_data(fp=tile, band=[3, 1])
+        assert (arr == values[tile.slice_in(fp)][..., [2, 0]]).all()
+    assert ds.block_cache_info().misses == misses
+
+    # Outside and resampled windows
+    arr = r.get_data(fp=fp.dilate(5), band=-1)
+    assert (arr[5:-5, 5:-5] == values).all()
+    fp2 = fp.intersection(fp, scale=fp.scale * 2)
+    assert (
+        r.get_data(fp=fp2, band=-1) ==
+        buzz.DataSource(allow_interpolation=True).aopen_raster(path).get_data(fp=fp2, band=-1)
+    ).all()
+
+    ds.clear_block_cache()
+    assert ds.block_cache_info() == (0, 0, 1024 ** 3, 0)
+
+def test_cache_budget(fp, values, path):
+    budget = BLOCK_SIZE ** 2 * 4 * 5
+    ds = buzz.DataSource(block_cache_size=budget)
+    r = ds.aopen_raster(path)
+    for tile in fp.tile((30, 30), 10, 10, boundary_effect='shrink').flat:
+        arr = r.get_data(fp=tile, band=-1)
+        assert (arr == values[tile.slice_in(fp)]).all()
+        assert ds.block_cache_info().currsize <= budget
+
+def test_cache_disabled(fp, values, path):
+    ds = buzz.DataSource()
+    r = ds.aopen_raster(path)
+    assert (r.get_data(band=-1) == values).all()
+    assert ds.block_cache_info() == (0, 0, 0, 0)
+
+def test_cache_invalidation(fp, values, path):
+    ds = buzz.DataSource(block_cache_size=1024 ** 3)
+    path2 = '{}/{}.tif'.format(tempfile.gettempdir(), uuid.uuid4())
+    with ds.acreate_raster(path2, fp, 'float32', 1, options=['TILED=YES']).delete as r:
+        r.set_data(values[..., 0])
+        assert (r.get_data() == values[..., 0]).all()
+        assert ds.block_cache_info().currsize > 0
+
+        r.set_data(values[..., 1])
+        assert ds.block_cache_info().currsize == 0
+        assert (r.get_data() == values[..., 1]).all()
+
+        r.fill(42)
+        assert (r.get_data() == 42).all()
+    assert ds.block_cache_info().currsize == 0
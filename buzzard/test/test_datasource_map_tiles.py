@@ -0,0 +1,169 @@
+"""Tests for DataSource.map_tiles"""
+
+# pylint: disable=redefined-outer-name
+
+from __future__ import division, print_function
+import tempfile
+import threading
+import time
+import uuid
+
+import numpy as np
+import pytest
+
+import buzzard as buzz
+from buzzard._gdal_mem_raster import BackGDALMemRaster
+
+@pytest.fixture(scope='module')
+def fp():
+    return buzz.Footprint(tl=(100, 250), size=(100, 70), rsize=(100, 70))
+
+@pytest.fixture(scope='module')
+def values(fp):
+    rng = np.random.RandomState(42)
+    return rng.uniform(0, 100, tuple(fp.shape) + (2,)).astype('float32')
+
+@pytest.fixture()
+def ds():
+    return buzz.DataSource()
+
+@pytest.fixture()
+def src(ds, fp, values):
+    return ds.awrap_numpy_raster(fp, values.copy(), sr=None)
+
+@pytest.fixture(params=['numpy', 'MEM'])
+def create_dst(request, ds, fp):
+    def _create_dst(band_count=1):
+        if request.param == 'numpy':
+            return ds.awrap_numpy_raster(
+                fp, np.full(tuple(fp.shape) + (band_count,), -1, 'float32'), sr=None,
+            )
+        dst = ds.acreate_raster('', fp, 'float32', band_count, driver='MEM')
+        dst.fill(-1)
+        return dst
+    return _create_dst
+
+def _box_sum(arr):
+    """Sum of the 3x3 neighborhoods of `arr`, the outer pixels are dropped"""
+    h, w = arr.shape[:2]
+    return sum(
+        arr[y:h - 2 + y, x:w - 2 + x]
+        for y in range(3)
+        for x in range(3)
+    )
+
+@pytest.mark.parametrize('tile_size', [(17, 13), (100, 70), (512, 512)])
+@pytest.mark.parametrize('order', ['row_major', 'hilbert'])
+def test_halo(ds, fp, values, src, create_dst, tile_size, order):
+    dst = create_dst()
+    fps = []
+    lock = threading.Lock()
+
+    def _fn(tile, arr):
+        with lock:
+            fps.append(tile)
+        assert arr.shape == tuple(tile.shape) + (2,)
+        out = np.zeros(tile.shape, 'float32')
+        out[1:-1, 1:-1] = _box_sum(arr[..., 0] + arr[..., 1])
+        return out
+
+    ds.map_tiles(_fn, [src], dst, tile_size=tile_size, halo=1, order=order, workers=4)
+    truth = _box_sum(np.pad(values[..., 0] + values[..., 1], 1, mode='constant'))
+    assert np.allclose(dst.get_data(), truth, rtol=1e-5)
+
+    tiles = fp.tile(tile_size, boundary_effect='shrink')
+    assert len(fps) == tiles.size
+    assert sorted(tuple(x.rsize) for x in fps) == sorted(
+        tuple(x.dilate(1).rsize) for x in tiles.flat
+    )
+
+def test_outputs(ds, fp, values, src, create_dst):
+    dst1 = create_dst()
+    dst2 = create_dst(2)
+
+    def _fn(tile, arr):
+        return arr[2:-2, 2:-2, 1], arr * 2
+
+    ds.map_tiles(_fn, [src], [dst1, dst2], tile_size=(30, 30), halo=2, workers=3)
+    assert (dst1.get_data() == values[..., 1]).all()
+    assert (dst2.get_data(band=-1) == values * 2).all()
+
+    ds.map_tiles(lambda tile, arr: arr + 1, [src], dst1, tile_size=(30, 30), band=1)
+    assert (dst1.get_data() == values[..., 0] + 1).all()
+
+    fps = []
+    ds.map_tiles(lambda tile: fps.append(tile), fp=fp, tile_size=(30, 30), workers=1)
+    assert len(fps) == 12
+
+def test_max_memory(ds, fp, src, create_dst):
+    dst = create_dst()
+    lock = threading.Lock()
+    counts = dict(current=0, max=0)
+
+    def _fn(tile, arr):
+        with lock:
+            counts['current'] += 1
+            counts['max'] = max(counts['max'], counts['current'])
+        try:
+            return arr[..., 0]
+        finally:
+            with lock:
+                counts['current'] -= 1
+
+    ds.map_tiles(_fn, [src], dst, tile_size=(10, 10), workers=4, max_memory=1)
+    assert counts['max'] == 1
+    ds.map_tiles(_fn, [src], dst, tile_size=(10, 10), workers=4, max_memory=10 * 10 * 12 * 3)
+    assert counts['max'] <= 3
+
+def test_error(ds, src, create_dst):
+    dst = create_dst()
+    fps = []
+
+    def _fn(tile, arr):
+        fps.append(tile)
+        if len(fps) == 3:
+            raise ZeroDivisionError()
+        return arr[..., 0]
+
+    with pytest.raises(ZeroDivisionError):
+        ds.map_tiles(_fn, [src], dst, tile_size=(10, 10), workers=1)
+    assert len(fps) < 70
+
+def test_mem_inputs(ds, fp, values, create_dst, monkeypatch):
+    src = ds.acreate_raster('', fp, 'float32', 2, driver='MEM')
+    src.set_data(values, band=-1)
+    dst = create_dst()
+    lock = threading.Lock()
+    counts = dict(current=0, max=0)
+    get_data = BackGDALMemRaster.get_data
+
+    def _get_data(self, *args, **kwargs):
+        with lock:
+            counts['current'] += 1
+            counts['max'] = max(counts['max'], counts['current'])
+        try:
+            time.sleep(0.001)
+            return get_data(self, *args, **kwargs)
+        finally:
+            with lock:
+                counts['current'] -= 1
+
+    monkeypatch.setattr(BackGDALMemRaster, 'get_data', _get_data)
+    ds.map_tiles(lambda tile, arr: arr[..., 0] + arr[..., 1], [src], dst, tile_size=(10, 10),
+                 workers=4)
+    assert counts['max'] == 1
+    assert np.allclose(dst.get_data(), values[..., 0] + values[..., 1])
+
+def _double(tile, arr):
+    return arr * 2
+
+def test_process_pool(ds, fp, values, src, create_dst):
+    path = '{}/{}.tif'.format(tempfile.gettempdir(), uuid.uuid4())
+    with ds.acreate_raster(path, fp, 'float32', 2, sr=None).delete as tif:
+        tif.set_data(values, band=-1)
+        dst = create_dst(2)
+        ds.map_tiles(_double, [tif], dst, tile_size=(30, 20), halo=3, pool='process', workers=2)
+        assert (dst.get_data(band=-1) == values * 2).all()
+
+    with pytest.raises(TypeError):
+        ds.map_tiles(_double, [src], dst, pool='process')
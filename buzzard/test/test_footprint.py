@@ -197,6 +197,37 @@ def test_equal(fps):
     for a, b in itertools.combinations(fps.values(), 2):
         assert a != b
 
+def test_hash_and_intern(fps):
+    dfs = [fps.DF, fps.AF & fps.DI, fps.DF & fps.AI, fps.DF & fps.DI]
+    assert len(set(hash(a) for a in dfs)) == 1
+    assert len({a: None for a in itertools.chain(fps.values(), dfs)}) == len(fps)
+    assert dfs[0].intern() is dfs[0]
+    for a in dfs:
+        assert a.intern() is dfs[0]
+
+    # Equal Footprints around any coordinate share the same hash
+    for tlx in [10, 10 - 0.6180339887, 62.5, 1234.5678]:
+        a = buzz.Footprint(tl=(tlx + 1e-9, 0), size=(1, 1), rsize=(10, 10))
+        b = buzz.Footprint(tl=(tlx - 1e-9, 0), size=(1, 1), rsize=(10, 10))
+        assert a == b
+        assert hash(a) == hash(b)
+        assert b in {a: 1}
+
+    # Corners lying on a line of the grid of the intern table
+    tlx = 1000 * 2 ** -4
+    a = buzz.Footprint(tl=(tlx, 0), size=(1, 1), rsize=(10, 10))
+    for b in [a.move((tlx * (1 + 1e-13), 0)), a.move((tlx * (1 - 1e-13), 0))]:
+        assert a == b
+        assert a.intern() is b.intern()
+
+    # Pixel sizes lying on a power of two
+    for factor in [1 + 1e-12, 1 - 1e-12]:
+        a = buzz.Footprint(tl=(100, 200), size=(20, 20), rsize=(10, 10))
+        b = buzz.Footprint(tl=(100, 200), size=(20 * factor, 20), rsize=(10, 10))
+        assert a == b
+        assert hash(a) == hash(b)
+        assert b.intern() is a.intern()
+
 
 def test_morpho(fps):
 
@@ -263,6 +294,29 @@ def test_clip(fps1px):
         fps.BI.clip(0, 1, 1, 2),
         fps.BI.clip(0 - 2, 1 - 3, 1 - 2, 2 - 3),
     )
+    with pytest.raises(ValueError):
+        fps.E.clip(1, 1, 0, 0)
+
+def test_derived_footprints(fps):
+    """The Footprints derived from a Footprint skip the checks of the constructor"""
+    for fp in fps.values():
+        for derived in [fp.clip(1, 0, 3, 2), fp.dilate(2), fp.tile((2, 1)).flat[-1]]:
+            other = buzz.Footprint(gt=derived.gt, rsize=derived.rsize)
+            assert fpeq(derived, other)
+            assert (derived.coords == other.coords).all()
+            assert derived._significant_min == other._significant_min
+
+    with buzz.Env(warnings=False, allow_complex_footprint=True):
+        aff = Affine.translation(*fps.AI.tl) * Affine.rotation(30) * Affine.scale(0.1, -0.1)
+        rotated = buzz.Footprint(gt=aff.to_gdal(), rsize=[10, 10])
+        clipped = rotated.clip(1, 2, 3, 4)
+        assert fpeq(clipped.clip(1, 1, 2, 2), rotated.clip(2, 3, 3, 4))
+        assert eq(clipped.tl, rotated.tl + rotated.pxlrvec + 2 * rotated.pxtbvec)
+
+    with pytest.raises(ValueError, match='north-up'):
+        fps.A.move(fps.A.tr, fps.A.tl)
+    with pytest.raises(ValueError):
+        fps.A.erode(fps.A.rsize.min())
 
 
 def test_move(fps1px):
@@ -355,3 +409,34 @@ def test_coord_conv(fps):
     assert fps.AI.spatial_to_raster(ai).shape == ai.shape
     assert fps.AI.spatial_to_raster(ai, dtype='float16').dtype == np.float16
     assert fps.AI.spatial_to_raster(ai, dtype='float16', op=42).dtype == np.float16
+
+def test_coord_conv_out(fps, monkeypatch):
+    monkeypatch.setattr(buzz._footprint, '_CONVERSION_CHUNK', 7)
+    fp = fps.AI
+    xy = np.dstack(fp.meshgrid_spatial) + [0.03, -0.03]
+    rxy = fp.spatial_to_raster(xy)
+    assert (rxy == np.dstack(fp.meshgrid_raster)).all()
+    assert np.allclose(fp.raster_to_spatial(rxy), np.dstack(fp.meshgrid_spatial))
+
+    out = np.empty(xy.shape, 'int64')
+    assert fp.spatial_to_raster(xy, out=out) is out
+    assert (out == rxy).all()
+
+    # In place
+    xy32 = xy.astype('float32')
+    truth = fp.spatial_to_raster(xy32, dtype='float32', op=None)
+    assert fp.spatial_to_raster(xy32, op=None, out=xy32) is xy32
+    assert (xy32 == truth).all()
+    truth = fp.raster_to_spatial(rxy.astype('float64'))
+    rxy = rxy.astype('float64')
+    assert fp.raster_to_spatial(rxy, out=rxy) is rxy
+    assert (rxy == truth).all()
+
+    with pytest.raises(ValueError):
+        fp.spatial_to_raster(xy, out=np.empty(xy.shape, 'int32'), dtype='int64')
+    with pytest.raises(ValueError):
+        fp.spatial_to_raster(xy, out=np.empty(xy.shape[:-1] + (3,), 'int32'))
+    with pytest.raises(ValueError):
+        fp.raster_to_spatial(xy, out=np.empty(xy.shape[::-1], 'float64')[..., ::-1])
+    with pytest.raises(TypeError):
+        fp.raster_to_spatial(xy, out=xy.tolist())
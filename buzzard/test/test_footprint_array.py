@@ -0,0 +1,158 @@
+"""Tests for FootprintArray"""
+
+# pylint: disable=redefined-outer-name
+
+from __future__ import division, print_function
+import itertools
+
+import numpy as np
+import pytest
+import shapely.geometry as sg
+from affine import Affine
+
+import buzzard as buzz
+from buzzard.test.tools import fpeq, assert_tiles_eq
+
+@pytest.fixture(scope='module')
+def fp():
+    return buzz.Footprint(tl=(100, 250), size=(10, 15), rsize=(100, 150))
+
+@pytest.fixture(scope='module')
+def rotated():
+    aff = Affine.translation(103, 242) * Affine.rotation(25) * Affine.scale(0.1, -0.1)
+    with buzz.Env(warnings=False, allow_complex_footprint=True):
+        return buzz.Footprint(gt=aff.to_gdal(), rsize=(40, 30))
+
+@pytest.mark.parametrize('boundary_effect,boundary_effect_locus', list(itertools.product(
+    ['extend', 'exclude', 'overlap', 'shrink'], ['br', 'tr', 'tl', 'bl'],
+)))
+def test_tile(fp, boundary_effect, boundary_effect_locus):
+    kwargs = dict(boundary_effect=boundary_effect, boundary_effect_locus=boundary_effect_locus)
+    tiles = fp.tile((30, 40), 3, 2, **kwargs)
+    arr = fp.tile((30, 40), 3, 2, as_footprint_array=True, **kwargs)
+    assert isinstance(arr, buzz.FootprintArray)
+    assert arr.shape == tiles.shape
+    assert_tiles_eq(np.asarray(arr), tiles)
+    assert (arr.rsize == [[tile.rsize for tile in line] for line in tiles]).all()
+
+    assert_tiles_eq(
+        np.asarray(fp.tile_count(3, 4, 1, 1, as_footprint_array=True, **kwargs)),
+        fp.tile_count(3, 4, 1, 1, **kwargs),
+    )
+    if boundary_effect == 'extend':
+        assert_tiles_eq(
+            np.asarray(fp.tile_occurrence((30, 40), 3, 2, as_footprint_array=True, **kwargs)),
+            fp.tile_occurrence((30, 40), 3, 2, **kwargs),
+        )
+
+def test_indexing(fp):
+    tiles = fp.tile((30, 40))
+    arr = fp.tile((30, 40), as_footprint_array=True)
+
+    assert len(arr) == len(tiles)
+    assert arr.ndim == 2
+    assert arr.size == tiles.size
+    assert fpeq(arr[1, 2], tiles[1, 2])
+    assert fpeq(arr[-1, -1], tiles[-1, -1])
+    assert fpeq(arr[1][2], tiles[1, 2])
+    assert_tiles_eq(np.asarray(arr[1:, ::2]), tiles[1:, ::2])
+    assert_tiles_eq(np.asarray(arr[..., 0]), tiles[..., 0])
+    assert_tiles_eq(np.asarray(arr.ravel()[[0, 5, 3]]), tiles.flatten()[[0, 5, 3]])
+    assert_tiles_eq(np.asarray(list(arr)), tiles)
+
+    mask = np.zeros(arr.shape, dtype=bool)
+    mask[0, 1] = True
+    mask[2, 3] = True
+    assert_tiles_eq(np.asarray(arr[mask]), tiles[mask])
+    assert arr[~np.ones(arr.shape, dtype=bool)].shape == (0,)
+
+    assert_tiles_eq(np.asarray(buzz.FootprintArray(tiles)), tiles)
+    with pytest.raises(IndexError):
+        arr[0, 0, 0]
+    with pytest.raises(TypeError):
+        buzz.FootprintArray([fp, 42])
+
+def test_accessors(fp, rotated):
+    for arr in [fp.tile((30, 40), 3, 2, as_footprint_array=True), buzz.FootprintArray([rotated])]:
+        fps = np.asarray(arr).flatten()
+        assert np.allclose(arr.gt.reshape(-1, 6), [x.gt for x in fps])
+        assert np.allclose(arr.aff6.reshape(-1, 6), [x.aff6 for x in fps])
+        assert np.allclose(arr.tl.reshape(-1, 2), [x.tl for x in fps])
+        assert np.allclose(arr.coords.reshape(-1, 4, 2), [x.coords for x in fps])
+        assert np.allclose(arr.bounds.reshape(-1, 4), [x.bounds for x in fps])
+        assert np.allclose(arr.extent.reshape(-1, 4), [x.extent for x in fps])
+        assert np.allclose(arr.pxsize.reshape(-1, 2), [x.pxsize for x in fps])
+
+def test_share_area(fp, rotated):
+    arr = buzz.FootprintArray(list(fp.tile((7, 9), 2, 1).flatten()) + [rotated])
+    fps = np.asarray(arr)
+
+    hole = sg.Point(105, 243).buffer(2)
+    poly = sg.Polygon(
+        [(101, 249), (109, 247), (107, 237), (104.4, 240.6), (100.2, 238)],
+        [hole.exterior.coords],
+    )
+    others = [
+        fp.erode(20), fp.clip(40, 60, 47, 69), rotated, rotated.dilate(10),
+        poly, sg.MultiPolygon([poly, sg.Point(95, 235).buffer(3)]), hole,
+        sg.LineString([(100, 250), (110, 235)]), sg.box(100, 235, 110, 250),
+    ]
+    for other in others:
+        if isinstance(other, sg.base.BaseGeometry):
+            truth = [not x.poly.disjoint(other) and not x.poly.touches(other) for x in fps]
+        else:
+            truth = [x.share_area(other) for x in fps]
+        assert (arr.share_area(other) == truth).all()
+    assert not arr.share_area(sg.Point(0, 0).buffer(1)).any()
+
+def test_intersection(fp, rotated):
+    arr = fp.tile((30, 40), 3, 2, as_footprint_array=True)
+    other = fp.clip(45, 50, 70, 95)
+    mask = arr.share_area(other)
+    with pytest.raises(ValueError):
+        arr.intersection(other)
+    assert_tiles_eq(
+        np.asarray(arr[mask].intersection(other)),
+        [x.intersection(other) for x in np.asarray(arr[mask])],
+    )
+
+    other = buzz.Footprint(tl=(101.03, 248.97), size=(5.5, 8.8), rsize=(11, 11))
+    mask = arr.share_area(other)
+    assert_tiles_eq(
+        np.asarray(arr[mask].intersection(other)),
+        [x.intersection(other) for x in np.asarray(arr[mask])],
+    )
+
+    with buzz.Env(warnings=False, allow_complex_footprint=True):
+        mask = arr.share_area(rotated)
+        assert_tiles_eq(
+            np.asarray(arr[mask].intersection(rotated)),
+            [x.intersection(rotated) for x in np.asarray(arr[mask])],
+        )
+
+def test_slice_in_and_conversions(fp):
+    arr = fp.tile((30, 40), 3, 2, boundary_effect='extend', as_footprint_array=True)
+    fps = np.asarray(arr)
+    for clip in [False, True]:
+        slices = arr.slice_in(fp, clip=clip)
+        assert slices.shape == arr.shape + (2, 2)
+        for (ystart, ystop), (xstart, xstop), x in zip(
+                slices[..., 0, :].reshape(-1, 2), slices[..., 1, :].reshape(-1, 2), fps.flat):
+            yslice, xslice = x.slice_in(fp, clip=clip)
+            assert (ystart, ystop, xstart, xstop) == (
+                yslice.start, yslice.stop, xslice.start, xslice.stop
+            )
+
+    xy = np.asarray([103.33, 246.66])
+    assert (
+        arr.spatial_to_raster(xy).reshape(-1, 2) == [x.spatial_to_raster(xy) for x in fps.flat]
+    ).all()
+    assert np.allclose(
+        arr.spatial_to_raster(xy, dtype='float64').reshape(-1, 2),
+        [x.spatial_to_raster(xy, dtype='float64') for x in fps.flat],
+    )
+    assert np.allclose(
+        arr.raster_to_spatial([5, 6]).reshape(-1, 2),
+        [x.raster_to_spatial([5, 6]) for x in fps.flat],
+    )
+    assert (arr.spatial_to_raster(arr.tl) == 0).all()
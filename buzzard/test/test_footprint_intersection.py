@@ -347,3 +347,27 @@ def test_corner_cases(fps1px):
         fps.A.intersection(fps.C)
     with pytest.raises(ValueError, match='touch'):
         fps.A.intersection(fps.D)
+
+def test_axis_aligned_same_as_shapely(fps):
+    """Footprints with edges parallel to the axes are handled without shapely, the results should
+    match the ones obtained through shapely
+    """
+    for a, b in itertools.product(fps.values(), repeat=2):
+        apoly, bpoly = a.poly, b.poly
+        assert a.share_area(b) == (not apoly.disjoint(bpoly) and not apoly.touches(bpoly))
+        assert a.share_area(b) == a.share_area(bpoly)
+        assert a._poly_contains(b) == apoly.contains(bpoly)
+
+        for kwargs in [{}, dict(scale=0.05), dict(scale=[-0.1, 0.1]), dict(rotation='fit')]:
+            truth = _intersection_or_error(a, _FtPoly(b.__geo_interface__), **kwargs)
+            res = _intersection_or_error(a, b, **kwargs)
+            if isinstance(truth, str):
+                assert truth == res
+            else:
+                assert fpeq(truth, res)
+
+def _intersection_or_error(fp, other, **kwargs):
+    try:
+        return fp.intersection(other, **kwargs)
+    except ValueError as e:
+        return str(e)
@@ -0,0 +1,85 @@
+"""Tests for Footprint.iter_tile, Footprint.iter_tile_count and Footprint.iter_tile_occurrence"""
+
+# pylint: disable=redefined-outer-name
+
+from __future__ import division, print_function
+import itertools
+import types
+
+import numpy as np
+import pytest
+
+import buzzard as buzz
+from buzzard._footprint_tile import _iter_grid_indices, _hilbert_curve, _z_order_curve
+
+ORDERS = ['row_major', 'column_major', 'z_order', 'hilbert']
+
+@pytest.fixture(scope='module')
+def fp():
+    return buzz.Footprint(tl=(100, 250), size=(10, 15), rsize=(100, 150))
+
+def _positions(tiles, iterated):
+    """Position in `tiles` of each Footprint of `iterated`"""
+    def _key(tile):
+        return tuple(np.around(tile.gt, 6)) + tuple(tile.rsize)
+    indices = {_key(tile): i for i, tile in enumerate(tiles.flat)}
+    assert len(indices) == tiles.size
+    return [indices[_key(tile)] for tile in iterated]
+
+@pytest.mark.parametrize('boundary_effect,boundary_effect_locus,order', list(itertools.product(
+    ['extend', 'exclude', 'overlap', 'shrink'], ['br', 'tr', 'tl', 'bl'], ORDERS,
+)))
+def test_same_tiles(fp, boundary_effect, boundary_effect_locus, order):
+    kwargs = dict(
+        boundary_effect=boundary_effect, boundary_effect_locus=boundary_effect_locus,
+    )
+    for tiles, iterated in [
+            (fp.tile((13, 7), 3, 2, **kwargs),
+             fp.iter_tile((13, 7), 3, 2, order=order, **kwargs)),
+            (fp.tile_count(3, 5, 1, 1, **kwargs),
+             fp.iter_tile_count(3, 5, 1, 1, order=order, **kwargs)),
+    ]:
+        assert isinstance(iterated, types.GeneratorType)
+        positions = _positions(tiles, iterated)
+        assert sorted(positions) == list(range(tiles.size))
+        if order == 'row_major':
+            assert positions == list(range(tiles.size))
+        if order == 'column_major':
+            assert positions == list(np.arange(tiles.size).reshape(tiles.shape).T.flat)
+
+    if boundary_effect == 'extend':
+        tiles = fp.tile_occurrence((30, 40), 3, 2, **kwargs)
+        iterated = fp.iter_tile_occurrence((30, 40), 3, 2, order=order, **kwargs)
+        assert sorted(_positions(tiles, iterated)) == list(range(tiles.size))
+
+def test_errors(fp):
+    with pytest.raises(ValueError):
+        fp.iter_tile((10, 10), order='spiral')
+    with pytest.raises(ValueError):
+        fp.iter_tile((200, 10), boundary_effect='overlap')
+    with pytest.raises(ValueError):
+        fp.iter_tile_count(3, 3, boundary_effect='exception')
+    assert list(fp.iter_tile((200, 10), boundary_effect='exclude')) == []
+
+@pytest.mark.parametrize('order', ORDERS)
+@pytest.mark.parametrize('rowcount,colcount', [(1, 1), (1, 5000), (7, 3), (64, 64), (100, 9000)])
+def test_grid_indices(order, rowcount, colcount):
+    chunks = list(_iter_grid_indices(rowcount, colcount, order))
+    rows = np.concatenate([rows for rows, _ in chunks])
+    cols = np.concatenate([cols for _, cols in chunks])
+    assert len(rows) == rowcount * colcount
+    assert len(set(zip(rows.tolist(), cols.tolist()))) == rowcount * colcount
+    assert max(len(rows) for rows, _ in chunks) <= 4096
+
+@pytest.mark.parametrize('side', [1, 2, 8, 64])
+def test_curves(side):
+    d = np.arange(side * side)
+    x, y = _hilbert_curve(side, d)
+    assert len(set(zip(x.tolist(), y.tolist()))) == side * side
+    assert (np.abs(np.diff(x)) + np.abs(np.diff(y)) == 1).all()
+
+    x, y = _z_order_curve(side, d)
+    assert len(set(zip(x.tolist(), y.tolist()))) == side * side
+    if side > 1:
+        assert x[:4].tolist() == [0, 1, 0, 1]
+        assert y[:4].tolist() == [0, 0, 1, 1]
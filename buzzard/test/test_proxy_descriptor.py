@@ -0,0 +1,95 @@
+"""Tests for ProxyDescriptor"""
+
+# pylint: disable=redefined-outer-name
+
+from __future__ import division, print_function
+import concurrent.futures
+import pickle
+import tempfile
+import uuid
+
+import numpy as np
+import pytest
+
+import buzzard as buzz
+
+@pytest.fixture(scope='module')
+def fp():
+    return buzz.Footprint(tl=(100, 250), size=(40, 30), rsize=(40, 30))
+
+@pytest.fixture(scope='module')
+def values(fp):
+    return np.arange(fp.rarea * 2, dtype='float32').reshape(tuple(fp.shape) + (2,))
+
+def _path(ext):
+    return '{}/{}.{}'.format(tempfile.gettempdir(), uuid.uuid4(), ext)
+
+def _read(desc, fp):
+    return desc.open().get_data(fp=fp, band=-1)
+
+def test_pickle():
+    params = dict(sr_work=None, max_active=np.inf, block_cache_size=1024)
+    desc = buzz.ProxyDescriptor(
+        'raster', '/a/b.tif', None, 'GTiff', ['NUM_THREADS=2'], 'r', params, dict(nodata=[0]),
+    )
+    desc2 = pickle.loads(pickle.dumps(desc))
+    assert desc2 == desc
+    assert hash(desc2) == hash(desc)
+    assert desc2.open_options == ('NUM_THREADS=2',)
+    assert desc2.band_schema == dict(nodata=[0])
+    assert dict(desc2.ds_params) == params
+
+    desc3 = buzz.ProxyDescriptor(
+        'raster', '/a/b.tif', None, 'GTiff', ['NUM_THREADS=2'], 'w', params, dict(nodata=[0]),
+    )
+    assert desc3 != desc
+    assert desc3.read_only() == desc
+    assert desc3.read_only().band_schema == desc.band_schema
+    assert desc.read_only() == desc
+
+    assert desc != buzz.ProxyDescriptor(
+        'raster', '/a/b.tif', None, 'GTiff', ['NUM_THREADS=2'], 'w', params,
+    )
+    assert desc != buzz.ProxyDescriptor(
+        'raster', '/a/b.tif', None, 'GTiff', ['NUM_THREADS=2'], 'r', dict(params, max_active=2),
+    )
+
+def test_raster(fp, values):
+    ds = buzz.DataSource(allow_interpolation=True, block_cache_size=1024 ** 2)
+    with ds.acreate_raster(_path('tif'), fp, 'float32', 2, dict(nodata=-1), sr=None).delete as r:
+        r.set_data(values, band=-1)
+        r.deactivate()
+        desc = pickle.loads(pickle.dumps(r.descriptor))
+        assert desc.band_schema == r.band_schema
+        assert dict(desc.ds_params)['block_cache_size'] == 1024 ** 2
+
+        r2 = desc.open()
+        assert isinstance(r2, buzz.GDALFileRaster)
+        assert r2 is not r
+        assert r2 is desc.open()
+        assert r2.mode == 'w'
+        assert r2.fp == fp
+        assert (r2.get_data(band=-1) == values).all()
+
+        tiles = list(fp.tile((15, 10)).flat)
+        with concurrent.futures.ProcessPoolExecutor(2) as ex:
+            arrays = list(ex.map(_read, [desc] * len(tiles), tiles))
+        for tile, arr in zip(tiles, arrays):
+            assert (arr == values[tile.slice_in(fp)]).all()
+        r2.close()
+
+def test_vector():
+    ds = buzz.DataSource()
+    fields = [{'name': 'id', 'type': int}]
+    with ds.acreate_vector(_path('shp'), 'point', fields, sr=None).delete as v:
+        for i in range(10):
+            v.insert_data([i, i], [i])
+        v.deactivate()
+        desc = pickle.loads(pickle.dumps(v.descriptor))
+        v2 = desc.open()
+        assert isinstance(v2, buzz.GDALFileVector)
+        assert v2.layer == v.layer
+        assert len(v2) == 10
+        assert [pt.x for pt in v2.iter_data(None)] == list(range(10))
+        assert [i for _, i in v2.iter_data('id')] == list(range(10))
+        v2.close()
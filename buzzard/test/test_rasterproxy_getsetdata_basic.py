@@ -12,6 +12,7 @@ import numpy as np
 import pytest
 
 from buzzard import Footprint, DataSource
+from buzzard import _tools
 
 @pytest.fixture(scope='module')
 def ds():
@@ -203,3 +204,15 @@ def test_set_data_mask(rast, dst_arr):
         arr = rast.get_data(band=[-1])
         assert np.all(arr[mask] == dst_arr[mask])
         assert np.all(arr[~mask] == 0)
+
+def test_set_data_mask_irregular(rast, dst_arr):
+    mask = np.random.RandomState(42).rand(*rast.fp.shape) > 0.5
+    mask[:2] = False
+    mask[:, -1] = False
+    assert len(_tools.rects_of_matrix(mask)) > 16
+
+    rast.fill(band=-1, value=0)
+    rast.set_data(dst_arr, band=-1, mask=mask)
+    arr = rast.get_data(band=[-1])
+    assert np.all(arr[mask] == dst_arr[mask])
+    assert np.all(arr[~mask] == 0)
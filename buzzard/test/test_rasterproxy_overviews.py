@@ -0,0 +1,111 @@
+"""Tests for the reading of raster overviews in get_data"""
+
+# pylint: disable=redefined-outer-name
+
+from __future__ import division, print_function
+import os
+import tempfile
+import uuid
+
+import numpy as np
+import pytest
+from osgeo import gdal
+
+import buzzard as buzz
+
+OVR_VALUES = [21, 42]
+
+@pytest.fixture(scope='module')
+def fp():
+    return buzz.Footprint(tl=(100, 110), size=(128, 96), rsize=(128, 96))
+
+@pytest.fixture(scope='module')
+def path(fp):
+    """Raster of zeros, with 2 overview levels (factors 2 and 4) filled with marker values"""
+    path = '{}/{}.tif'.format(tempfile.gettempdir(), uuid.uuid4())
+    ds = buzz.DataSource()
+    with ds.acreate_raster(path, fp, 'float32', 2, options=['TILED=YES']).close as r:
+        r.fill(0)
+
+    gdal_ds = gdal.OpenEx(path, gdal.OF_UPDATE | gdal.OF_RASTER)
+    gdal_ds.BuildOverviews('NEAREST', [2, 4])
+    for i in range(2):
+        for band_id in [1, 2]:
+            gdal_ds.GetRasterBand(band_id).GetOverview(i).Fill(OVR_VALUES[i])
+    gdal_ds.FlushCache()
+    del gdal_ds
+
+    yield path
+    os.remove(path)
+
+@pytest.mark.parametrize('block_cache_size', [0, 1024 ** 2])
+def test_overview_selection(fp, path, block_cache_size):
+    ds = buzz.DataSource(allow_interpolation=True, block_cache_size=block_cache_size)
+    r = ds.aopen_raster(path)
+    assert [ovrfp.rsize.tolist() for ovrfp, _ in r._back.overviews] == [[64, 48], [32, 24]]
+
+    # Same grid, full resolution
+    assert (r.get_data(band=-1) == 0).all()
+
+    # Too fine for overviews
+    fp2 = fp.intersection(fp, scale=fp.scale * 1.5)
+    assert (r.get_data(fp=fp2, band=-1) == 0).all()
+
+    # Overview levels
+    for i, factor in enumerate([2, 4]):
+        fp2 = fp.intersection(fp, scale=fp.scale * factor)
+        assert (r.get_data(fp=fp2, band=-1) == OVR_VALUES[i]).all()
+        assert (r.get_data(fp=fp2.erode(2), band=[2]) == OVR_VALUES[i]).all()
+    fp2 = fp.intersection(fp, scale=fp.scale * 3)
+    assert (r.get_data(fp=fp2.erode(1), band=-1) == OVR_VALUES[0]).all()
+    fp2 = fp.intersection(fp, scale=fp.scale * 8)
+    assert (r.get_data(fp=fp2.erode(1), band=-1) == OVR_VALUES[1]).all()
+
+    # Mask bands are not read from overviews
+    fp2 = fp.intersection(fp, scale=fp.scale * 2)
+    assert (r.get_data(fp=fp2, band=[1, 1j]) != OVR_VALUES[0]).any()
+
+@pytest.mark.parametrize('interpolation', ['cv_area', 'cv_nearest'])
+def test_build_overviews(fp, interpolation):
+    values = np.add(*fp.meshgrid_raster).astype('float32')
+    values[10:30, 20:50] = -99
+
+    ds = buzz.DataSource(allow_interpolation=True)
+    path = '{}/{}.tif'.format(tempfile.gettempdir(), uuid.uuid4())
+    r = ds.acreate_raster(path, fp, 'float32', 1, {'nodata': -99}, options=['TILED=YES'])
+    r.set_data(values)
+    r.build_overviews([2, 4], interpolation=interpolation, tile_size=(20, 15), max_workers=3)
+    fp2, fp4 = [ovrfp for ovrfp, _ in r._back.overviews]
+    assert tuple(fp2.rsize) == (64, 48)
+    assert tuple(fp4.rsize) == (32, 24)
+
+    # Same results as a remap of the full array
+    ovr2 = r.get_data(fp=fp2)
+    ovr4 = r.get_data(fp=fp4)
+    expected2 = r._back.remap(
+        fp, fp2, values, None, -99, -99, 'erode', interpolation,
+    )
+    expected4 = r._back.remap(
+        fp2, fp4, expected2.copy(), None, -99, -99, 'erode', interpolation,
+    )
+    assert np.allclose(ovr2, expected2)
+    assert np.allclose(ovr4, expected4)
+    assert (ovr2 == -99).any()
+
+    # Overviews are stored in the file
+    r.close()
+    with ds.aopen_raster(path, mode='w').delete as reopened:
+        assert len(reopened._back.overviews) == 2
+        assert np.allclose(reopened.get_data(fp=fp4), expected4)
+
+def test_build_overviews_bulk(fp):
+    ds = buzz.DataSource(allow_interpolation=True)
+    paths = ['{}/{}.tif'.format(tempfile.gettempdir(), uuid.uuid4()) for _ in range(2)]
+    for i, path in enumerate(paths):
+        ds.create_raster(i, path, fp, 'uint8', 3).fill(i + 1, band=-1)
+    ds.build_overviews([2, 4, 8])
+    for i, path in enumerate(paths):
+        assert len(ds[i]._back.overviews) == 3
+        fp8 = ds[i]._back.overviews[-1][0]
+        assert (ds[i].get_data(fp=fp8, band=-1) == i + 1).all()
+        ds[i].delete()
@@ -0,0 +1,214 @@
+"""Tests for the concurrent reads and writes of rasters"""
+
+# pylint: disable=redefined-outer-name
+
+from __future__ import division, print_function
+import os
+import asyncio
+import gc
+import tempfile
+import uuid
+
+import numpy as np
+import pytest
+
+import buzzard as buzz
+
+@pytest.fixture(scope='module')
+def fp():
+    return buzz.Footprint(tl=(100, 1310), size=(1300, 1200), rsize=(1300, 1200))
+
+@pytest.fixture(scope='module')
+def values(fp):
+    x, y = fp.meshgrid_raster
+    return np.dstack([
+        (np.sin(x / 50) + np.cos(y / 70)) * (i + 1)
+        for i in range(2)
+    ]).astype('float32')
+
+@pytest.fixture(scope='module')
+def path(fp, values):
+    path = '{}/{}.tif'.format(tempfile.gettempdir(), uuid.uuid4())
+    ds = buzz.DataSource()
+    options = ['TILED=YES', 'BLOCKXSIZE=128', 'BLOCKYSIZE=128', 'COMPRESS=DEFLATE']
+    with ds.acreate_raster(path, fp, 'float32', 2, options=options).close as r:
+        r.set_data(values, band=-1)
+    yield path
+    os.remove(path)
+
+@pytest.mark.parametrize('interpolation', ['cv_area', 'cv_nearest', 'cv_cubic'])
+def test_parallel_get_data(fp, values, path, interpolation):
+    ds_serial = buzz.DataSource(allow_interpolation=True)
+    ds_parallel = buzz.DataSource(allow_interpolation=True, max_read_workers=4)
+    r_serial = ds_serial.aopen_raster(path)
+    r_parallel = ds_parallel.aopen_raster(path)
+
+    fps = [
+        fp,
+        fp.clip(100, 50, 1250, 1190),
+        fp.dilate(300),
+        fp.intersection(fp, scale=fp.scale * 1.3),
+        fp.intersection(fp, scale=fp.scale / 2).clip(600, 400, 2200, 2000),
+        fp.move(fp.tl + fp.pxvec / 3),
+    ]
+    for fp2 in fps:
+        assert len(r_parallel._back._split_footprint(fp2, [1, 2], interpolation)) > 1
+        a = r_serial.get_data(fp=fp2, band=-1, interpolation=interpolation)
+        b = r_parallel.get_data(fp=fp2, band=-1, interpolation=interpolation)
+        assert np.allclose(a, b)
+    assert (r_parallel.get_data(band=-1) == values).all()
+
+def test_async_numpy(fp, values):
+    ds = buzz.DataSource(max_async_workers=3)
+    r = ds.awrap_numpy_raster(fp, np.zeros_like(values))
+    tiles = list(fp.tile((200, 300), boundary_effect='shrink').flat)
+
+    futures = [
+        r.set_data_async(values[tile.slice_in(fp)], fp=tile, band=-1)
+        for tile in tiles
+    ]
+    for future in futures:
+        assert future.result() is None
+    futures = [r.get_data_async(fp=tile, band=-1) for tile in tiles]
+    for tile, future in zip(tiles, futures):
+        assert (future.result() == values[tile.slice_in(fp)]).all()
+
+    # Errors are raised by the futures
+    with pytest.raises(ValueError):
+        r.get_data_async(fp=42).result()
+
+def test_shutdown_executors(fp, values):
+    ds = buzz.DataSource(max_async_workers=3)
+    r = ds.awrap_numpy_raster(fp, values)
+    tile = fp.clip(10, 20, 300, 200)
+    assert (r.get_data_async(fp=tile, band=-1).result() == values[tile.slice_in(fp)]).all()
+    ex = ds._back._async_executor
+    threads = list(ex._threads)
+    assert threads
+
+    ds.shutdown_executors()
+    assert ds._back._async_executor is None
+    assert not any(t.is_alive() for t in threads)
+
+    # The pool is created again
+    assert (r.get_data_async(fp=tile, band=-1).result() == values[tile.slice_in(fp)]).all()
+    ex = ds._back._async_executor
+    threads = list(ex._threads)
+
+    # The pools are shut down with the DataSource
+    r.close()
+    del ds, r
+    gc.collect()
+    for t in threads:
+        t.join(10)
+    assert ex._shutdown
+    assert not any(t.is_alive() for t in threads)
+
+def test_async_asyncio(fp, values, path):
+    ds = buzz.DataSource(max_active=2)
+    r = ds.aopen_raster(path)
+    tiles = list(fp.tile((200, 300), boundary_effect='shrink').flat)
+
+    async def _read_all():
+        return await asyncio.gather(*[
+            asyncio.wrap_future(r.get_data_async(fp=tile, band=-1))
+            for tile in tiles
+        ])
+
+    loop = asyncio.new_event_loop()
+    arrays = loop.run_until_complete(_read_all())
+    loop.close()
+    assert ds._back.async_workers == 2
+    for tile, arr in zip(tiles, arrays):
+        assert (arr == values[tile.slice_in(fp)]).all()
+
+@pytest.mark.parametrize('prefetch', [0, 1, 5, 100])
+def test_iter_data(fp, values, prefetch):
+    ds = buzz.DataSource(max_async_workers=2)
+    r = ds.awrap_numpy_raster(fp, values)
+    tiles = fp.tile((200, 300), boundary_effect='shrink')
+
+    pairs = list(r.iter_data(tiles, band=-1, prefetch=prefetch))
+    assert [tile for tile, _ in pairs] == list(tiles.flat)
+    for tile, arr in pairs:
+        assert (arr == values[tile.slice_in(fp)]).all()
+
+    # FootprintArray input
+    tiles_arr = fp.tile((200, 300), boundary_effect='shrink', as_footprint_array=True)
+    pairs = list(r.iter_data(tiles_arr, band=-1, prefetch=prefetch))
+    assert [tile for tile, _ in pairs] == list(tiles.flat)
+    for tile, arr in pairs:
+        assert (arr == values[tile.slice_in(fp)]).all()
+
+    # Generator input and early exit
+    it = r.iter_data((tile for tile in tiles.flat), band=1, prefetch=prefetch)
+    tile, arr = next(it)
+    assert tile == tiles.flat[0]
+    assert (arr == values[tile.slice_in(fp)][..., 0]).all()
+    it.close()
+
+def test_write_behind(fp, values):
+    ds = buzz.DataSource(write_queue_size=4)
+    path = '{}/{}.tif'.format(tempfile.gettempdir(), uuid.uuid4())
+    with ds.acreate_raster(path, fp, 'float32', 2, options=['TILED=YES']).delete as r:
+        for tile in fp.tile((200, 300), boundary_effect='shrink').flat:
+            r.set_data(values[tile.slice_in(fp)], fp=tile, band=-1)
+        assert (r.get_data(band=-1) == values).all()
+
+        r.set_data(values[..., 0] * 2, mask=values[..., 0] > 0)
+        r.flush()
+        expected = np.where(values[..., 0] > 0, values[..., 0] * 2, values[..., 0])
+        assert (r.get_data() == expected).all()
+
+@pytest.mark.parametrize('options', [['TILED=YES', 'BLOCKXSIZE=128', 'BLOCKYSIZE=64'], []])
+def test_write_behind_blocks(fp, values, monkeypatch, options):
+    ds = buzz.DataSource(write_queue_size=4)
+    path = '{}/{}.tif'.format(tempfile.gettempdir(), uuid.uuid4())
+    with ds.acreate_raster(path, fp, 'float32', 2, options=options).delete as r:
+        bw, bh = r._back.block_size
+        write_data = r._back.write_data
+        rects = []
+        def _write_data(array, fp_, *args):
+            x, y = np.around(fp.spatial_to_raster(fp_.tl)).astype(int)
+            rects.append((x, y, x + fp_.rsizex, y + fp_.rsizey))
+            write_data(array, fp_, *args)
+        monkeypatch.setattr(r._back, 'write_data', _write_data)
+
+        # Tiles not aligned on the blocks are written by whole blocks
+        for tile in fp.tile((150, 110), boundary_effect='shrink').flat:
+            r.set_data(values[tile.slice_in(fp)], fp=tile, band=-1)
+        r.flush()
+        for x0, y0, x1, y1 in rects:
+            assert x0 % bw == 0 and y0 % bh == 0
+            assert x1 % bw == 0 or x1 == fp.rsizex
+            assert y1 % bh == 0 or y1 == fp.rsizey
+        assert (r.get_data(band=-1) == values).all()
+
+        # The partially covered blocks are written by `flush`
+        del rects[:]
+        tile = fp.clip(5, 7, 50, 60)
+        r.set_data(values[tile.slice_in(fp)] * 2, fp=tile, band=-1)
+        r.flush()
+        assert all(
+            x0 >= 5 and y0 >= 7 and x1 <= 50 and y1 <= 60
+            for x0, y0, x1, y1 in rects
+        )
+        assert sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in rects) == tile.rarea
+        expected = values.copy()
+        expected[tile.slice_in(fp)] *= 2
+        assert (r.get_data(band=-1) == expected).all()
+
+def test_write_behind_errors(fp, values, monkeypatch):
+    ds = buzz.DataSource(write_queue_size=4)
+    path = '{}/{}.tif'.format(tempfile.gettempdir(), uuid.uuid4())
+    with ds.acreate_raster(path, fp, 'float32', 2).delete as r:
+        def _write_data(*_):
+            raise IOError('Disk full')
+        monkeypatch.setattr(r._back, 'write_data', _write_data)
+        r.set_data(values, band=-1)
+        with pytest.raises(IOError):
+            r.flush()
+        r.flush()
+        r.set_data(values, band=-1)
+        with pytest.raises(IOError):
+            r.get_data()
@@ -0,0 +1,69 @@
+"""Tests for the reading of several bands at once in *GDALRaster.get_data"""
+
+# pylint: disable=redefined-outer-name
+
+from __future__ import division, print_function
+import tempfile
+import uuid
+
+import numpy as np
+import pytest
+
+import buzzard as buzz
+
+@pytest.fixture(scope='module')
+def fp():
+    return buzz.Footprint(tl=(100, 250), size=(60, 45), rsize=(60, 45))
+
+@pytest.fixture(params=['MEM', 'GTiff-band', 'GTiff-pixel'])
+def driver_options(request):
+    if request.param == 'MEM':
+        return 'MEM', []
+    return 'GTiff', ['INTERLEAVE=' + request.param.split('-')[1].upper(), 'TILED=YES']
+
+@pytest.fixture(params=['uint8', 'int16', 'float32'])
+def dtype(request):
+    return request.param
+
+@pytest.fixture(params=[0, 1024 ** 2])
+def block_cache_size(request):
+    return request.param
+
+@pytest.mark.parametrize('band', [
+    -1, [1, 2, 3, 4], [4, 2, 1], [3, 1, 4, 2], [1, 3], [2],
+    [1, 1j, 2], [3, 1j, 1], [1j, 4, 2, 1j, 3], [4, 1j, 1, 2],
+])
+def test_band_ids(fp, driver_options, dtype, block_cache_size, band):
+    driver, options = driver_options
+    path = '' if driver == 'MEM' else '{}/{}.tif'.format(tempfile.gettempdir(), uuid.uuid4())
+    values = np.add.outer(
+        np.add(*fp.meshgrid_raster) % 50 + 1, np.arange(4) * 60,
+    ).astype(dtype)
+    values[10:20, 5:40, 0] = 0
+
+    ds = buzz.DataSource(block_cache_size=block_cache_size)
+    r = ds.acreate_raster(path, fp, dtype, 4, {'nodata': 0}, driver=driver, options=options)
+    with r.close if driver == 'MEM' else r.delete:
+        r.set_data(values, band=-1)
+        band_ids = [1, 2, 3, 4] if band == -1 else band
+        truth = np.stack([
+            values[..., b - 1] if isinstance(b, int) else (values[..., 0] != 0) * 255
+            for b in band_ids
+        ], axis=-1).astype(dtype)
+
+        # Full raster, the first read populates the block cache, the second one hits it
+        for _ in range(2):
+            arr = r.get_data(band=band)
+            assert arr.dtype == dtype
+            assert (arr.reshape(truth.shape) == truth).all()
+
+        # Windows inside of the raster and crossing its edges
+        for fp2 in [fp.erode(7), fp.dilate(5).move((103, 247))]:
+            arr = r.get_data(fp=fp2, band=band, dst_nodata=0)
+            arr = arr.reshape(tuple(fp2.shape) + (len(band_ids),))
+            fp3 = fp2.intersection(fp)
+            assert (arr[fp3.slice_in(fp2)] == truth[fp3.slice_in(fp)]).all()
+
+        # The single RasterIO call reads the same pixels as the band by band calls
+        per_band = np.stack([r.get_data(band=b) for b in band_ids], axis=-1)
+        assert (per_band == truth).all()
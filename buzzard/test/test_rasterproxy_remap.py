@@ -0,0 +1,183 @@
+"""Tests for the remapping engine of the rasters (`ABackProxyRasterRemapMixin`)"""
+
+# pylint: disable=redefined-outer-name
+
+from __future__ import division, print_function
+
+import numpy as np
+import pytest
+
+import buzzard as buzz
+from buzzard._a_proxy_raster_remap import ABackProxyRasterRemapMixin
+
+remap = ABackProxyRasterRemapMixin.remap
+
+@pytest.fixture(autouse=True)
+def env():
+    with buzz.Env(allow_complex_footprint=True):
+        yield
+
+@pytest.fixture(scope='module')
+def fp():
+    return buzz.Footprint(tl=(100, 1110), size=(500, 400), rsize=(500, 400))
+
+@pytest.fixture(scope='module')
+def values(fp):
+    x, y = fp.meshgrid_raster
+    arr = np.dstack([np.sin(x / 13) + np.cos(y / 7), x * 0.1]).astype('float32')
+    arr[50:80, 100:120] = -99
+    return arr
+
+def _remap_tiles(fp, values, dst, interpolation):
+    out = np.empty(np.r_[dst.shape, values.shape[-1]], values.dtype)
+    for tile in dst.tile((64, 48), boundary_effect='shrink').flat:
+        samplefp = ABackProxyRasterRemapMixin.dilate_sampling_footprint(tile, interpolation, fp)
+        out[tile.slice_in(dst)] = remap(
+            samplefp, tile, values[samplefp.slice_in(fp)].copy(), None, -99, -99, 'erode',
+            interpolation,
+        )
+    return out
+
+def _rotate90(fp):
+    """Rotate a Footprint by 90 degrees around its top left corner, the resampling from a north-up
+    Footprint then requires per-pixel maps.
+    """
+    return buzz.Footprint(
+        gt=(fp.tlx, 0, fp.pxsizex, fp.tly, -fp.pxsizex, 0),
+        rsize=fp.rsize[::-1],
+    )
+
+@pytest.mark.parametrize('interpolation', ['cv_area', 'cv_nearest', 'cv_linear', 'cv_lanczos4'])
+@pytest.mark.parametrize('scale', [2, 0.5, 1.3])
+@pytest.mark.parametrize('shift', [1 / 3, 1 / 4])
+def test_remap_cache(fp, values, interpolation, scale, shift):
+    # With `scale=2` and `shift=1/4`, the source coordinates fall exactly between two pixels, cv2
+    # rounds those ties to the even pixel
+    dst = fp.intersection(fp, scale=fp.scale * scale)
+    dst = dst.move(dst.tl + dst.pxvec * shift)
+    dst = _rotate90(dst)
+
+    buzz.clear_remap_cache()
+    with buzz.Env(remap_cache_size=0):
+        expected = _remap_tiles(fp, values, dst, interpolation)
+    assert buzz.remap_cache_info() == (0, 0, buzz.env.remap_cache_size, 0)
+
+    res = _remap_tiles(fp, values, dst, interpolation)
+    hits, misses, maxsize, currsize = buzz.remap_cache_info()
+    assert (res == expected).all()
+    if (np.asarray([64, 48]) * scale % 1 == 0).all() and interpolation != 'cv_nearest':
+        # All tiles share the same subpixel offset, at most one map per tile shape
+        assert misses <= 4
+        assert hits > misses
+    assert maxsize == buzz.env.remap_cache_size
+    assert 0 < currsize <= maxsize
+
+    # Size limit
+    buzz.clear_remap_cache()
+    with buzz.Env(remap_cache_size=64 * 48 * 6):
+        res = _remap_tiles(fp, values, dst, interpolation)
+        assert (res == expected).all()
+        assert buzz.remap_cache_info().currsize <= 64 * 48 * 6
+
+@pytest.mark.parametrize('interpolation', [
+    'cv_area', 'cv_nearest', 'cv_linear', 'cv_cubic', 'cv_lanczos4',
+])
+@pytest.mark.parametrize('scale,shift,fast', [
+    # Coordinates on the 1/32 grid of cv2, `cv2.warpAffine` is used except with 'cv_nearest'
+    (2, 1 / 4, 'interpolated'),
+    (0.5, 1 / 2, 'interpolated'),
+    (0.5, 0, 'interpolated'),
+    # Integer coordinates, `cv2.warpAffine` is also used with 'cv_nearest'
+    (2, 0, 'all'),
+    (4, 1, 'all'),
+    (-1, 0, 'all'),
+    # Coordinates rounded by cv2, the maps of `cv2.remap` are used
+    (2, 1 / 3, 'none'),
+    (0.5, 1 / 3, 'none'),
+    (1.3, 1 / 3, 'none'),
+    (20 / 53, 0.37, 'none'),
+])
+def test_remap_affine(fp, values, interpolation, scale, shift, fast, monkeypatch):
+    if scale == -1:
+        dst = fp.move(fp.bl, fp.br, fp.tr)
+    else:
+        dst = fp.intersection(fp, scale=fp.scale * scale)
+        dst = dst.move(dst.tl + dst.pxvec * shift)
+
+    buzz.clear_remap_cache()
+    res = _remap_tiles(fp, values, dst, interpolation)
+    if fast == 'all' or (fast == 'interpolated' and interpolation != 'cv_nearest'):
+        assert buzz.remap_cache_info().misses == 0
+    else:
+        assert buzz.remap_cache_info().misses > 0
+
+    # Same result with the per-pixel maps
+    monkeypatch.setattr(
+        'buzzard._a_proxy_raster_remap._is_scale_translation', lambda aff: False,
+    )
+    buzz.clear_remap_cache()
+    expected = _remap_tiles(fp, values, dst, interpolation)
+    assert buzz.remap_cache_info().misses > 0
+    assert (res == expected).all()
+
+@pytest.mark.parametrize('interpolation', ['cv_area', 'cv_nearest', 'cv_cubic'])
+@pytest.mark.parametrize('workers', [1, 3])
+def test_remap_strips(fp, values, interpolation, workers):
+    dst_fps = [
+        fp.intersection(fp, scale=fp.scale * 0.7).dilate(20),
+        fp.move(fp.tl + fp.pxvec / 3).clip(50, 20, 450, 380),
+        _rotate90(fp.intersection(fp, scale=fp.scale * 2)),
+    ]
+    mask = values[..., 0] > 0
+    for dst in dst_fps:
+        with buzz.Env(remap_memory_budget=0):
+            expected = remap(fp, dst, values.copy(), mask, -99, -98, 'erode', interpolation)
+        with buzz.Env(remap_memory_budget=20000 * workers, remap_workers=workers):
+            assert ABackProxyRasterRemapMixin._remap_strip_height(
+                fp, dst, values, workers, buzz.env.remap_memory_budget,
+            ) < dst.rsizey / 4
+            res = remap(fp, dst, values.copy(), mask, -99, -98, 'erode', interpolation)
+        assert (res[0] == expected[0]).all()
+        assert (res[1] == expected[1]).all()
+
+@pytest.mark.parametrize('interpolation', ['cv_area', 'cv_nearest', 'cv_linear', 'cv_lanczos4'])
+def test_remap_dtypes(fp, values, interpolation):
+    dst = _rotate90(fp.intersection(fp, scale=fp.scale * 1.3))
+    dst = dst.move(dst.tl + dst.pxvec / 3)
+
+    # float64 keeps its precision, the kernels of cv_cubic and cv_lanczos4 are single precision
+    offset = 1e3 if interpolation in {'cv_cubic', 'cv_lanczos4'} else 1e9
+    expected = remap(fp, dst, values.copy(), None, -99, -99, 'erode', interpolation)
+    res = remap(
+        fp, dst, values.astype('float64') + offset, None, -99 + offset, -99, 'erode', interpolation,
+    )
+    assert res.dtype == np.float64
+    nodata = expected == -99
+    assert (nodata == (res == -99)).all()
+    assert np.allclose(res[~nodata] - offset, expected[~nodata], atol=1e-3)
+
+    # bool is remapped as uint8
+    arr = values[..., 0] > 0.5
+    expected = remap(fp, dst, arr.astype('uint8'), None, None, 0, 'erode', interpolation)
+    res = remap(fp, dst, arr, None, None, False, 'erode', interpolation)
+    assert res.dtype == np.bool_
+    assert (res == expected.astype(bool)).all()
+    assert res.view('uint8').max() == 1
+
+@pytest.mark.parametrize('interpolation', ['cv_area', 'cv_nearest', 'cv_linear', 'cv_lanczos4'])
+@pytest.mark.parametrize('shared', [True, False])
+def test_remap_nodata_bands(fp, values, interpolation, shared):
+    dst = fp.intersection(fp, scale=fp.scale * 0.7)
+    dst = dst.move(dst.tl + dst.pxvec / 3)
+    arr = (np.dstack([values] * 2) * 10 % 250 + 1).astype('uint8')
+    nodata = np.zeros(fp.shape, bool)
+    nodata[::7, ::5] = True
+    nodata[100:150, 200:300] = True
+    arr[nodata] = 0
+    if not shared:
+        arr[300:320, 100:400, 2] = 0
+
+    res = remap(fp, dst, arr.copy(), None, 0, 255, 'erode', interpolation)
+    for i in range(arr.shape[-1]):
+        expected = remap(fp, dst, arr[..., i].copy(), None, 0, 255, 'erode', interpolation)
+        assert (res[..., i] == expected).all()
@@ -0,0 +1,111 @@
+"""Tests for *Raster.sample_points"""
+
+# pylint: disable=redefined-outer-name
+
+from __future__ import division, print_function
+import tempfile
+import uuid
+
+import numpy as np
+import pytest
+
+import buzzard as buzz
+
+@pytest.fixture(scope='module')
+def fp():
+    return buzz.Footprint(tl=(100, 250), size=(300, 200), rsize=(300, 200))
+
+@pytest.fixture(scope='module')
+def values(fp):
+    x, y = fp.meshgrid_raster
+    arr = np.dstack([
+        (np.sin(x / 20) + np.cos(y / 30)) * 50 + 100 * (i + 1)
+        for i in range(2)
+    ]).astype('float32')
+    arr[50:60, 70:80] = -1
+    return arr
+
+@pytest.fixture(scope='module')
+def ds():
+    return buzz.DataSource(block_cache_size=1024 ** 2)
+
+@pytest.fixture(scope='module', params=['numpy', 'MEM', 'GTiff'])
+def rast(request, ds, fp, values):
+    if request.param == 'numpy':
+        rast = ds.awrap_numpy_raster(fp, values.copy(), band_schema=dict(nodata=-1), sr=None)
+    elif request.param == 'MEM':
+        rast = ds.acreate_raster('', fp, 'float32', 2, band_schema=dict(nodata=-1), driver='MEM')
+    else:
+        path = '{}/{}.tif'.format(tempfile.gettempdir(), uuid.uuid4())
+        rast = ds.acreate_raster(
+            path, fp, 'float32', 2, band_schema=dict(nodata=-1),
+            options=['TILED=YES', 'BLOCKXSIZE=64', 'BLOCKYSIZE=64'],
+        )
+    if request.param != 'numpy':
+        rast.set_data(values, band=-1)
+    yield rast
+    if request.param == 'GTiff':
+        rast.delete()
+    else:
+        rast.close()
+
+@pytest.fixture(scope='module')
+def xy(fp):
+    rng = np.random.RandomState(42)
+    xy = fp.tl + rng.uniform(-0.1, 1.1, (5000, 2)) * (fp.size * [1, -1])
+    return np.r_[xy, [fp.tl, fp.br, fp.tr - [1e-3, 1e-3], fp.bl + [1e-3, 1e-3]]]
+
+def test_nearest(fp, values, rast, xy):
+    ix, iy = fp.spatial_to_raster(xy).T
+    inside = (ix >= 0) & (ix < fp.rsizex) & (iy >= 0) & (iy < fp.rsizey)
+    truth = np.full((len(xy), 2), -1, 'float32')
+    truth[inside] = values[iy[inside], ix[inside]]
+
+    assert (rast.sample_points(xy, band=-1) == truth).all()
+    assert (rast.sample_points(xy) == truth[:, 0]).all()
+    assert (rast.sample_points(xy.reshape(-1, 1, 2), band=2) == truth[:, 1, None]).all()
+    assert (rast.sample_points(xy, band=-1, dst_nodata=-42) == np.where(
+        truth == -1, -42, truth
+    )).all()
+    assert rast.sample_points(np.empty((0, 2)), band=-1).shape == (0, 2)
+
+def test_bilinear(fp, values, rast, xy):
+    rxy = fp.spatial_to_raster(xy, dtype='float64', op=None)
+    inside = ((rxy >= 0) & (rxy < fp.rsize)).all(axis=-1)
+    x, y = (rxy[inside] - 0.5).T
+    x0, y0 = np.floor(x).astype(int), np.floor(y).astype(int)
+    tx, ty = (x - x0)[:, None], (y - y0)[:, None]
+
+    def _px(dx, dy):
+        return values[
+            (y0 + dy).clip(0, fp.rsizey - 1), (x0 + dx).clip(0, fp.rsizex - 1)
+        ].astype('float64')
+
+    truth = np.full((len(xy), 2), -1, 'float32')
+    truth[inside] = (
+        _px(0, 0) * (1 - tx) * (1 - ty) + _px(1, 0) * tx * (1 - ty) +
+        _px(0, 1) * (1 - tx) * ty + _px(1, 1) * tx * ty
+    )
+    near_nodata = np.zeros(len(xy), bool)
+    near_nodata[inside] = (
+        ((_px(0, 0) == -1) & ((1 - tx) * (1 - ty) > 0)) |
+        ((_px(1, 0) == -1) & (tx * (1 - ty) > 0)) |
+        ((_px(0, 1) == -1) & ((1 - tx) * ty > 0)) |
+        ((_px(1, 1) == -1) & (tx * ty > 0))
+    ).any(axis=-1)
+    truth[near_nodata] = -1
+
+    arr = rast.sample_points(xy, band=-1, interpolation='bilinear')
+    assert np.allclose(arr, truth, atol=1e-3)
+    assert near_nodata.any()
+
+def test_block_cache(ds, rast, xy):
+    if not isinstance(rast, buzz.GDALFileRaster):
+        pytest.skip()
+    block_count = 2 * 5 * 4
+    ds.clear_block_cache()
+    rast.sample_points(xy, band=-1)
+    info = ds.block_cache_info()
+    assert info.misses == block_count
+    rast.sample_points(xy, band=-1)
+    assert ds.block_cache_info().hits == info.hits + block_count
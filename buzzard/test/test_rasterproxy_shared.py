@@ -0,0 +1,99 @@
+"""Tests for SharedNumpyRaster"""
+
+# pylint: disable=redefined-outer-name
+
+from __future__ import division, print_function
+import concurrent.futures
+import pickle
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+import buzzard as buzz
+
+@pytest.fixture(scope='module')
+def fp():
+    return buzz.Footprint(tl=(100, 250), size=(60, 40), rsize=(60, 40))
+
+@pytest.fixture(scope='module')
+def values(fp):
+    return np.arange(fp.rarea * 2, dtype='float32').reshape(tuple(fp.shape) + (2,))
+
+def _write_tile(desc, tile, value):
+    desc.open().set_data(np.full(tuple(tile.shape) + (2,), value, 'float32'), fp=tile, band=-1)
+    return desc.open().name
+
+def _negate(tile, arr):
+    return -arr
+
+def test_same_process(fp, values):
+    ds = buzz.DataSource()
+    r = ds.acreate_shared_raster(fp, 'float32', 2, dict(nodata=-1))
+    assert isinstance(r, buzz.SharedNumpyRaster)
+    assert (r.get_data(band=-1) == 0).all()
+    r.set_data(values, band=-1)
+
+    ds.attach_shared_raster('r2', r.name, fp, 'float32', 2, dict(nodata=-1), mode='r')
+    assert ds.r2.fp == fp
+    assert ds.r2.nodata == -1
+    assert (ds.r2.get_data(band=-1) == values).all()
+    with pytest.raises(RuntimeError):
+        ds.r2.set_data(values, band=-1)
+
+    r3 = buzz.DataSource().aattach_shared_raster(r.name, fp, 'float32', 2)
+    tile = fp.clip(10, 5, 30, 15)
+    r3.set_data(np.full(tuple(tile.shape) + (2,), 42, 'float32'), fp=tile, band=-1)
+    values = values.copy()
+    values[tile.slice_in(fp)] = 42
+    assert (r.get_data(band=-1) == values).all()
+    assert (r.array == values).all()
+
+    desc = pickle.loads(pickle.dumps(r.descriptor))
+    assert (desc.open().get_data(band=-1) == values).all()
+
+    name = r.name
+    r3.close()
+    ds.r2.close()
+    r.close()
+    with pytest.raises(FileNotFoundError):
+        buzz.DataSource().aattach_shared_raster(name, fp, 'float32', 2)
+
+def test_process_pool(fp, values):
+    ds = buzz.DataSource()
+    with ds.acreate_shared_raster(fp, 'float32', 2).close as r:
+        tiles = list(fp.tile((20, 20)).flat)
+        with concurrent.futures.ProcessPoolExecutor(2) as ex:
+            names = list(ex.map(
+                _write_tile, [r.descriptor] * len(tiles), tiles, range(len(tiles)),
+            ))
+        assert names == [r.name] * len(tiles)
+        for i, tile in enumerate(tiles):
+            assert (r.get_data(fp=tile, band=-1) == i).all()
+
+        r.set_data(values, band=-1)
+        out = ds.awrap_numpy_raster(fp, np.zeros_like(values))
+        ds.map_tiles(_negate, [r], out, tile_size=(25, 15), halo=2, pool='process', workers=2)
+        assert (out.get_data(band=-1) == -values).all()
+
+def test_subprocess(fp):
+    ds = buzz.DataSource()
+    r = ds.acreate_shared_raster(fp, 'float32', 2)
+    code = '; '.join([
+        'import buzzard as buzz',
+        'fp = buzz.Footprint(gt={!r}, rsize={!r})'.format(tuple(fp.gt), tuple(fp.rsize)),
+        'r = buzz.DataSource().aattach_shared_raster({!r}, fp, "float32", 2)'.format(r.name),
+        'r.fill(7, band=-1)',
+        'r.close()',
+    ])
+    res = subprocess.run([sys.executable, '-c', code], stderr=subprocess.PIPE)
+    assert res.returncode == 0, res.stderr.decode()
+    assert b'leaked' not in res.stderr
+
+    # The block outlived the subprocess
+    r2 = buzz.DataSource().aattach_shared_raster(r.name, fp, 'float32', 2)
+    assert (r2.get_data(band=-1) == 7).all()
+    r2.close()
+    assert (r.get_data(band=-1) == 7).all()
+    r.close()
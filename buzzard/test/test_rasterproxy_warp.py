@@ -0,0 +1,92 @@
+"""Tests for the warping of the rasters between spatial references (`ABackProxyRasterWarpMixin`)"""
+
+# pylint: disable=redefined-outer-name
+
+from __future__ import division, print_function
+
+import numpy as np
+import pytest
+
+import buzzard as buzz
+
+SR_STORED = 'EPSG:32631'
+SR_WORK = 'EPSG:32632'
+
+@pytest.fixture(scope='module')
+def fp():
+    # In UTM 32N, the raster stored in UTM 31N is rotated by ~4 degrees
+    return buzz.Footprint(tl=(700000, 5000000), size=(3000, 2400), rsize=(1500, 1200))
+
+@pytest.fixture(scope='module')
+def values(fp):
+    x, y = fp.meshgrid_raster
+    arr = np.dstack([3. * x + 5. * y, x * 0.5])
+    arr[100:200, 100:300] = -99
+    return arr
+
+def _expected(r, dst):
+    """Values of the linear first band at the exact location of the pixels of `dst`"""
+    xy = r._back.to_virtual(np.dstack(dst.meshgrid_spatial))
+    x, y = ~r.fp_stored.affine * (xy[..., 0], xy[..., 1])
+    return 3 * x + 5 * y, x, y
+
+def _error(r, dst, res):
+    """Maximum error of the first band of `res` read on `dst`, away from the edges and nodata"""
+    expected, x, y = _expected(r, dst)
+    fp = r.fp_stored
+    inner = (
+        (x > 5) & (y > 5) & (x < fp.rsizex - 5) & (y < fp.rsizey - 5) &
+        ~((x > 90) & (x < 310) & (y > 90) & (y < 210))
+    )
+    assert inner.mean() > 0.5
+    assert (res[inner, 0] != -1).all()
+    return np.abs(res[inner, 0] - expected[inner]).max()
+
+def _check(r, dst, interpolation, tolerance):
+    res = r.get_data(fp=dst, band=-1, interpolation=interpolation, dst_nodata=-1)
+    assert _error(r, dst, res) < tolerance
+    return res
+
+@pytest.fixture()
+def env():
+    with buzz.Env(allow_complex_footprint=True, warnings=False):
+        yield
+
+@pytest.mark.parametrize('interpolation', ['cv_nearest', 'cv_linear', 'cv_cubic'])
+def test_warp_osr(fp, values, interpolation, env):
+    ds = buzz.DataSource(sr_work=SR_WORK, allow_interpolation=True, warp_rasters=True)
+    r = ds.awrap_numpy_raster(fp, values, band_schema={'nodata': -99}, sr=SR_STORED)
+
+    # A north-up Footprint in `sr_work`, while `r.fp_stored` is rotated in `sr_stored`
+    assert abs(r.fp_stored.angle - 4.27) < 0.01
+    minx, maxx, miny, maxy = r.fp.extent
+    dst = buzz.Footprint(tl=(minx, maxy), size=(maxx - minx, maxy - miny), rsize=(1300, 1100))
+
+    buzz.clear_remap_cache()
+    tolerance = 4.1 if interpolation == 'cv_nearest' else 0.75
+    res = _check(r, dst, interpolation, tolerance)
+    misses = buzz.remap_cache_info().misses
+    assert (r.get_data(fp=dst, band=-1, interpolation=interpolation, dst_nodata=-1) == res).all()
+    assert buzz.remap_cache_info().misses == misses
+
+    # Without warping, the raster is only moved by an affine transformation, which is less
+    # accurate (the nearest neighbour picks the same pixels at this scale)
+    ds = buzz.DataSource(sr_work=SR_WORK, allow_interpolation=True)
+    r2 = ds.awrap_numpy_raster(fp, values, band_schema={'nodata': -99}, sr=SR_STORED)
+    res2 = r2.get_data(fp=dst, band=-1, interpolation=interpolation, dst_nodata=-1)
+    if interpolation != 'cv_nearest':
+        assert _error(r, dst, res2) > _error(r, dst, res)
+
+@pytest.mark.parametrize('interpolation', ['cv_nearest', 'cv_linear', 'cv_area', 'cv_lanczos4'])
+def test_warp_transformation(fp, values, interpolation, monkeypatch):
+    ds = buzz.DataSource(allow_interpolation=True, warp_rasters=True)
+    r = ds.awrap_numpy_raster(fp, values, band_schema={'nodata': -99})
+
+    def _to_virtual(xy):
+        x, y = np.moveaxis(np.asarray(xy), -1, 0)
+        return np.stack([x + 1e-4 * (y - 5e6 + 1200) ** 2, y + 20 * np.sin(x / 200)], -1)
+    monkeypatch.setattr(r._back, 'to_virtual', _to_virtual)
+
+    dst = fp.intersection(fp, scale=fp.scale * 1.2345).dilate(40)
+    tolerance = 4.5 if interpolation == 'cv_nearest' else 0.75
+    _check(r, dst, interpolation, tolerance)
@@ -126,3 +126,41 @@ def test_band_parameters():
             f(l)
     with pytest.raises(ValueError):
         f([])
+
+def test_slices_of_matrix():
+    """Tests for _tools.slices_of_matrix"""
+
+    def _naive(mask):
+        # One rectangle per run of True in each row, then merge identical consecutive rows
+        rows = []
+        for y, row in enumerate(mask):
+            runs = []
+            x = 0
+            while x < len(row):
+                if row[x]:
+                    start = x
+                    while x < len(row) and row[x]:
+                        x += 1
+                    runs.append((start, x))
+                x += 1
+            if rows and (mask[rows[-1][1] - 1] == row).all():
+                rows[-1][1] = y + 1
+            else:
+                rows.append([y, y + 1, runs])
+        return [
+            (slice(ystart, yend), slice(xstart, xend))
+            for ystart, yend, runs in rows
+            for xstart, xend in runs
+        ]
+
+    rng = np.random.RandomState(42)
+    for shape in [(1, 1), (1, 13), (13, 1), (17, 23)]:
+        for p in [0, 0.1, 0.5, 0.9, 1]:
+            mask = rng.rand(*shape) < p
+            mask[1::3] = mask[::3][:len(mask[1::3])]
+            assert list(buzz._tools.slices_of_matrix(mask)) == _naive(mask)
+            for sl in buzz._tools.slices_of_matrix(mask):
+                assert mask[sl].all()
+
+    assert list(buzz._tools.slices_of_matrix(None)) == [(slice(0, None), slice(0, None))]
+    assert buzz._tools.rects_of_matrix(np.zeros((0, 3), bool)).shape == (0, 4)